@@ -0,0 +1,225 @@
+"""Retention and archival for the activity log.
+
+Entries older than RETENTION_DAYS are moved out of alyson_house.db into
+gzip-compressed JSON Lines segments, one or more per month, in an
+activity_log_archive folder next to the database. Segments are written once
+and never modified; manifest.json lists them with a SHA-256 checksum each so
+tampering or corruption can be detected before they are read back.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+import db_connection
+from db_connection import get_connection, transaction
+
+# Entries older than this many days are moved out of the database
+RETENTION_DAYS = 365
+# archive_old_entries() is cheap to call on every exit; it only does work this often
+ARCHIVE_INTERVAL_DAYS = 1
+
+ARCHIVE_FOLDER = "activity_log_archive"
+MANIFEST_FILE = "manifest.json"
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def archive_dir():
+    return os.path.join(os.path.dirname(db_connection.DB_PATH), ARCHIVE_FOLDER)
+
+
+def _load_manifest():
+    path = os.path.join(archive_dir(), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"version": 1, "segments": [], "pending_delete": None, "last_run": None}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest):
+    # Write-then-rename so a crash never leaves a half-written manifest
+    folder = archive_dir()
+    tmp_path = os.path.join(folder, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(folder, MANIFEST_FILE))
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _finish_pending_delete(manifest):
+    """Completes a run that wrote its segments but stopped before deleting the rows."""
+    pending = manifest.get("pending_delete")
+    if not pending:
+        return
+    with transaction() as cur:
+        cur.execute("DELETE FROM activity_log WHERE timestamp < ? AND id <= ?", (pending["cutoff"], pending["max_id"]))
+    manifest["pending_delete"] = None
+    _save_manifest(manifest)
+
+
+class _SegmentWriter:
+    """Streams one month's rows into a new segment file."""
+
+    def __init__(self, folder, month, sequence):
+        self.file_name = f"activity_log_{month}_{sequence:04d}.jsonl.gz"
+        self.path = os.path.join(folder, self.file_name)
+        self.tmp_path = self.path + ".tmp"
+        self.month = month
+        self.rows = 0
+        self.first = None
+        self.last = None
+        self._raw = open(self.tmp_path, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+
+    def write(self, row):
+        self._gzip.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.rows += 1
+        self.first = self.first or row
+        self.last = row
+
+    def close(self):
+        self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self.tmp_path, self.path)
+        return {
+            "file": self.file_name, "month": self.month, "rows": self.rows,
+            "first_id": self.first[0], "last_id": self.last[0],
+            "first_timestamp": self.first[1], "last_timestamp": self.last[1],
+            "sha256": _sha256(self.path),
+        }
+
+
+def archive_old_entries(retention_days=RETENTION_DAYS, force=False):
+    """Moves activity log entries older than `retention_days` into monthly archive segments.
+
+    Segments and the manifest are made durable before any row is deleted, and
+    the delete is recorded in the manifest first, so an interrupted run is
+    finished on the next call without losing or duplicating entries.
+    Returns the number of entries archived.
+    """
+    os.makedirs(archive_dir(), exist_ok=True)
+    manifest = _load_manifest()
+    _finish_pending_delete(manifest)
+
+    # activity_log timestamps come from CURRENT_TIMESTAMP, which is UTC
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    if not force and manifest.get("last_run"):
+        last_run = datetime.datetime.strptime(manifest["last_run"], _TIMESTAMP_FORMAT)
+        if now - last_run < datetime.timedelta(days=ARCHIVE_INTERVAL_DAYS):
+            return 0
+
+    cutoff = (now - datetime.timedelta(days=retention_days)).strftime(_TIMESTAMP_FORMAT)
+    con = get_connection()
+    max_id = con.execute("SELECT MAX(id) FROM activity_log").fetchone()[0]
+    archived = 0
+    if max_id is not None:
+        sequences = {}
+        for segment in manifest["segments"]:
+            sequences[segment["month"]] = sequences.get(segment["month"], 0) + 1
+
+        new_segments = []
+        writer = None
+        # Ordered by timestamp, so each month's rows arrive together and only one segment is open at a time
+        cur = con.execute(
+            "SELECT id, timestamp, user, action, details FROM activity_log "
+            "WHERE timestamp < ? AND id <= ? ORDER BY timestamp, id", (cutoff, max_id)
+        )
+        for row in cur:
+            month = row[1][:7]
+            if writer is None or writer.month != month:
+                if writer is not None:
+                    new_segments.append(writer.close())
+                sequences[month] = sequences.get(month, 0) + 1
+                writer = _SegmentWriter(archive_dir(), month, sequences[month])
+            writer.write(list(row))
+            archived += 1
+        if writer is not None:
+            new_segments.append(writer.close())
+
+        if new_segments:
+            manifest["segments"].extend(new_segments)
+            manifest["pending_delete"] = {"cutoff": cutoff, "max_id": max_id}
+            _save_manifest(manifest)
+            _finish_pending_delete(manifest)
+
+    manifest["last_run"] = now.strftime(_TIMESTAMP_FORMAT)
+    _save_manifest(manifest)
+    return archived
+
+
+def has_archived_entries():
+    return any(segment["rows"] for segment in _load_manifest()["segments"])
+
+
+def verify_archive():
+    """Returns the file names of segments that are missing or fail their checksum."""
+    folder = archive_dir()
+    bad = []
+    for segment in _load_manifest()["segments"]:
+        path = os.path.join(folder, segment["file"])
+        if not os.path.exists(path) or _sha256(path) != segment["sha256"]:
+            bad.append(segment["file"])
+    return bad
+
+
+def _read_segment(segment):
+    path = os.path.join(archive_dir(), segment["file"])
+    if not os.path.exists(path):
+        raise ValueError(f"Archive segment {segment['file']} is missing")
+    if _sha256(path) != segment["sha256"]:
+        raise ValueError(f"Archive segment {segment['file']} failed its integrity check")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [tuple(json.loads(line)) for line in f]
+
+
+def _matches(row, user, action, date_from, date_to, text):
+    log_id, timestamp, row_user, row_action, details = row
+    if user and row_user != user:
+        return False
+    if action and row_action != action:
+        return False
+    if date_from and timestamp < date_from:
+        return False
+    if date_to and timestamp[:10] > date_to:
+        return False
+    if text:
+        details = (details or "").lower()
+        return all(word in details for word in text.lower().split())
+    return True
+
+
+def iter_archived_entries(user=None, action=None, date_from=None, date_to=None, text=None):
+    """Yields archived entries newest first, in the same shape as get_activity_log_page rows.
+
+    Months are decompressed one at a time, only when the caller reads that far,
+    and months outside the date range are never opened. Raises ValueError if a
+    segment is missing or fails its checksum.
+    """
+    by_month = {}
+    for segment in _load_manifest()["segments"]:
+        by_month.setdefault(segment["month"], []).append(segment)
+
+    for month in sorted(by_month, reverse=True):
+        if date_to and month > date_to[:7]:
+            continue
+        if date_from and month < date_from[:7]:
+            break
+        rows = []
+        for segment in by_month[month]:
+            rows.extend(_read_segment(segment))
+        rows.sort(key=lambda r: (r[1], r[0]), reverse=True)
+        for row in rows:
+            if _matches(row, user, action, date_from, date_to, text):
+                yield row
@@ -1,7 +1,19 @@
 import customtkinter as ctk
+import datetime
+import itertools
+from tkinter import ttk
 import database_utils as db_manager
+import activity_log_archive
 
 class ActivityLogWindow(ctk.CTkToplevel):
+    PAGE_SIZE = 200
+    # Fetch the next page once the visible part of the list passes this fraction of what is loaded
+    PREFETCH_AT = 0.85
+    # Milliseconds to wait after the last keystroke before re-running the query
+    FILTER_DELAY = 250
+    ALL_USERS = "All users"
+    ALL_ACTIONS = "All actions"
+
     def __init__(self, parent):
         super().__init__(parent)
         self.title("Activity Log")
@@ -9,51 +21,153 @@ class ActivityLogWindow(ctk.CTkToplevel):
         self.grab_set()
 
         self.main_font = ctk.CTkFont(size=14)
-        self.header_font = ctk.CTkFont(size=14, weight="bold")
 
-        # Create a scrollable frame to hold the table
-        self.scrollable_frame = ctk.CTkScrollableFrame(self)
-        self.scrollable_frame.pack(expand=True, fill="both", padx=10, pady=10)
+        # Keyset cursor: (timestamp, id) of the oldest entry loaded so far
+        self.last_loaded = None
+        self.all_loaded = False
+        self.loaded_count = 0
+        self.page_pending = False
+        self.filters = {}
+        self.filter_job = None
+        # Set once the user asks for entries older than the retention period
+        self.archive_rows = None
+
+        self._create_filter_bar()
+
+        # A Treeview only draws the rows currently on screen, so it stays fast however many pages are loaded
+        style = ttk.Style(self)
+        style.configure("ActivityLog.Treeview", font=("Arial", 12), rowheight=28)
+        style.configure("ActivityLog.Treeview.Heading", font=("Arial", 12, "bold"))
+
+        table_frame = ctk.CTkFrame(self)
+        table_frame.pack(expand=True, fill="both", padx=10, pady=10)
+        table_frame.grid_columnconfigure(0, weight=1)
+        table_frame.grid_rowconfigure(0, weight=1)
+
+        columns = ("timestamp", "user", "action", "details")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", style="ActivityLog.Treeview")
+        for column, header, width in zip(columns, ["Timestamp", "User", "Action", "Details"], [170, 130, 170, 400]):
+            self.tree.heading(column, text=header, anchor="w")
+            self.tree.column(column, width=width, anchor="w", stretch=(column == "details"))
 
-        # Configure the grid layout for the table
-        self.scrollable_frame.grid_columnconfigure(0, weight=2) # Timestamp
-        self.scrollable_frame.grid_columnconfigure(1, weight=2) # User
-        self.scrollable_frame.grid_columnconfigure(2, weight=2) # Action
-        self.scrollable_frame.grid_columnconfigure(3, weight=3) # Details
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_scrolled)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        status_frame = ctk.CTkFrame(self, fg_color="transparent")
+        status_frame.pack(fill="x", padx=10, pady=(0, 10))
+        self.status_label = ctk.CTkLabel(status_frame, text="", font=self.main_font, anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True)
+        self.archive_button = ctk.CTkButton(status_frame, text="Load Archived History", font=self.main_font, command=self.load_archived_logs)
 
         self.load_logs()
 
+    def _create_filter_bar(self):
+        filter_frame = ctk.CTkFrame(self)
+        filter_frame.pack(fill="x", padx=10, pady=(10, 0))
+        filter_frame.grid_columnconfigure(4, weight=1)
+
+        users = [self.ALL_USERS] + db_manager.get_activity_log_filter_values("user")
+        self.user_filter = ctk.CTkComboBox(filter_frame, values=users, font=self.main_font, width=150, command=lambda _: self._schedule_filter())
+        self.user_filter.set(self.ALL_USERS)
+        self.user_filter.grid(row=0, column=0, padx=5, pady=5)
+        self.user_filter.bind("<KeyRelease>", self._schedule_filter)
+
+        actions = [self.ALL_ACTIONS] + db_manager.get_activity_log_filter_values("action")
+        self.action_filter = ctk.CTkOptionMenu(filter_frame, values=actions, font=self.main_font, width=170, command=lambda _: self._schedule_filter())
+        self.action_filter.set(self.ALL_ACTIONS)
+        self.action_filter.grid(row=0, column=1, padx=5, pady=5)
+
+        self.date_from_entry = ctk.CTkEntry(filter_frame, placeholder_text="From YYYY-MM-DD", font=self.main_font, width=140)
+        self.date_from_entry.grid(row=0, column=2, padx=5, pady=5)
+        self.date_to_entry = ctk.CTkEntry(filter_frame, placeholder_text="To YYYY-MM-DD", font=self.main_font, width=140)
+        self.date_to_entry.grid(row=0, column=3, padx=5, pady=5)
+        self.search_entry = ctk.CTkEntry(filter_frame, placeholder_text="Search details...", font=self.main_font)
+        self.search_entry.grid(row=0, column=4, padx=5, pady=5, sticky="ew")
+        for entry in (self.date_from_entry, self.date_to_entry, self.search_entry):
+            entry.bind("<KeyRelease>", self._schedule_filter)
+
+    def _schedule_filter(self, event=None):
+        """Re-runs the query once the user pauses typing."""
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(self.FILTER_DELAY, self._apply_filters)
+
+    def _apply_filters(self):
+        self.filter_job = None
+
+        def _valid_date(text):
+            try:
+                return datetime.datetime.strptime(text.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+            except ValueError:
+                return None  # Ignore partly typed or invalid dates
+
+        user = self.user_filter.get().strip()
+        action = self.action_filter.get()
+        filters = {
+            "user": None if user in ("", self.ALL_USERS) else user,
+            "action": None if action == self.ALL_ACTIONS else action,
+            "date_from": _valid_date(self.date_from_entry.get()),
+            "date_to": _valid_date(self.date_to_entry.get()),
+            "text": self.search_entry.get().strip() or None,
+        }
+        if filters != self.filters:
+            self.filters = filters
+            self.load_logs()
+
     def load_logs(self):
-        # --- Create Table Headers ---
-        headers = ["Timestamp", "User", "Action", "Details"]
-        for i, header in enumerate(headers):
-            header_label = ctk.CTkLabel(self.scrollable_frame, text=header, font=self.header_font)
-            header_label.grid(row=0, column=i, padx=10, pady=5, sticky="w")
-        
-        # Add a separator line
-        separator = ctk.CTkFrame(self.scrollable_frame, height=2)
-        separator.grid(row=1, column=0, columnspan=4, sticky="ew", pady=(0, 5))
-
-        # --- Populate Table with Log Data ---
-        logs = db_manager.get_activity_log()
-        if not logs:
-            no_logs_label = ctk.CTkLabel(self.scrollable_frame, text="No activities have been logged yet.", font=self.main_font)
-            no_logs_label.grid(row=2, column=0, columnspan=4, pady=20)
+        """Loads the first page of the log."""
+        self.tree.delete(*self.tree.get_children())
+        self.last_loaded = None
+        self.all_loaded = False
+        self.loaded_count = 0
+        self.archive_rows = None
+        self._load_next_page()
+        if not self.loaded_count:
+            message = "No activities match these filters." if any(self.filters.values()) else "No activities have been logged yet."
+            self.status_label.configure(text=message)
+
+    def _load_next_page(self):
+        self.page_pending = False
+        if self.all_loaded:
+            return
+        if self.archive_rows is not None:
+            try:
+                logs = list(itertools.islice(self.archive_rows, self.PAGE_SIZE))
+            except (OSError, ValueError) as e:
+                # A segment is missing, unreadable or failed its checksum; show that rather than a silently short history
+                self.all_loaded = True
+                self.archive_button.pack_forget()
+                self.status_label.configure(text=str(e))
+                return
+        else:
+            logs = db_manager.get_activity_log_page(before=self.last_loaded, limit=self.PAGE_SIZE, **self.filters)
+        for log_id, timestamp, user, action, details in logs:
+            # Format the timestamp nicely
+            formatted_time = (timestamp or "").split('.')[0]
+            self.tree.insert("", "end", values=(formatted_time, user, action, details or ""))
+        self.loaded_count += len(logs)
+        if logs:
+            self.last_loaded = (logs[-1][1], logs[-1][0])
+        if len(logs) < self.PAGE_SIZE:
+            self.all_loaded = True
+        self.status_label.configure(text=f"Showing {self.loaded_count} entries" + ("" if self.all_loaded else " (scroll down for older entries)"))
+        # Archived entries are only decompressed when asked for
+        if self.all_loaded and self.archive_rows is None and activity_log_archive.has_archived_entries():
+            self.archive_button.pack(side="right")
         else:
-            for row_index, log_entry in enumerate(logs, start=2):
-                timestamp, user, action, details = log_entry
-                
-                # Format the timestamp nicely
-                formatted_time = timestamp.split('.')[0]
-
-                # Create labels for each piece of data
-                timestamp_label = ctk.CTkLabel(self.scrollable_frame, text=formatted_time, font=self.main_font, anchor="w")
-                user_label = ctk.CTkLabel(self.scrollable_frame, text=user, font=self.main_font, anchor="w")
-                action_label = ctk.CTkLabel(self.scrollable_frame, text=action, font=self.main_font, anchor="w")
-                details_label = ctk.CTkLabel(self.scrollable_frame, text=details, font=self.main_font, anchor="w", wraplength=300, justify="left")
-
-                # Place labels in the grid
-                timestamp_label.grid(row=row_index, column=0, padx=10, pady=5, sticky="w")
-                user_label.grid(row=row_index, column=1, padx=10, pady=5, sticky="w")
-                action_label.grid(row=row_index, column=2, padx=10, pady=5, sticky="w")
-                details_label.grid(row=row_index, column=3, padx=10, pady=5, sticky="w")
+            self.archive_button.pack_forget()
+
+    def load_archived_logs(self):
+        """Continues the list with entries that were moved to the archive."""
+        self.archive_rows = activity_log_archive.iter_archived_entries(**self.filters)
+        self.all_loaded = False
+        self._load_next_page()
+
+    def _on_tree_scrolled(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self.all_loaded and not self.page_pending and float(last) >= self.PREFETCH_AT:
+            # Let the current scroll finish drawing before touching the database
+            self.page_pending = True
+            self.after_idle(self._load_next_page)
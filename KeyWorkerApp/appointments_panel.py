@@ -0,0 +1,65 @@
+import customtkinter as ctk
+import datetime
+from tkinter import ttk
+import database_utils as db_manager
+
+
+def due_status(next_due, today):
+    """Describes a YYYY-MM-DD next_due relative to `today`, e.g. "Overdue 3 days" or "In 12 days",
+    or "Invalid date" if it is not one."""
+    try:
+        days = (datetime.date.fromisoformat(next_due) - today).days
+    except (ValueError, TypeError):
+        return "Invalid date"
+    if days == 0:
+        return "Due today"
+    plural = "" if abs(days) == 1 else "s"
+    return f"Overdue {-days} day{plural}" if days < 0 else f"In {days} day{plural}"
+
+
+class AppointmentsPanel(ctk.CTkFrame):
+    """Main-menu list of every service user's overdue appointments and those due in the next UPCOMING_DAYS."""
+    UPCOMING_DAYS = 30
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=(10, 5))
+        self.title_label = ctk.CTkLabel(header, text="Appointments", font=ctk.CTkFont(size=16, weight="bold"))
+        self.title_label.pack(side="left")
+        ctk.CTkButton(header, text="Refresh", width=80, command=self.refresh).pack(side="right")
+
+        style = ttk.Style(self)
+        style.configure("Appointments.Treeview", font=("Arial", 11), rowheight=24)
+        style.configure("Appointments.Treeview.Heading", font=("Arial", 11, "bold"))
+
+        columns = ("service_user", "appointment", "next_due", "booked", "status")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", style="Appointments.Treeview")
+        for column, heading, width in zip(columns, ["Service User", "Appointment", "Next Due", "Booked", "Status"], [140, 130, 90, 60, 120]):
+            self.tree.heading(column, text=heading, anchor="w")
+            self.tree.column(column, width=width, anchor="w", stretch=(column == "appointment"))
+        self.tree.tag_configure("overdue", foreground="#c0392b")
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=1, column=0, sticky="nsew", padx=(10, 0), pady=(0, 10))
+        scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 10), pady=(0, 10))
+
+        self.refresh()
+
+    def refresh(self):
+        """Re-reads overdue and upcoming appointments: one indexed query."""
+        today = datetime.date.today()
+        due_to = (today + datetime.timedelta(days=self.UPCOMING_DAYS)).isoformat()
+        rows = db_manager.get_due_appointments(due_to)
+        self.tree.delete(*self.tree.get_children())
+        overdue = 0
+        for _, service_user_name, _, name, _, next_due, booked in rows:
+            status = due_status(next_due, today)
+            is_overdue = next_due < today.isoformat()
+            overdue += is_overdue
+            self.tree.insert("", "end", values=(service_user_name, name, db_manager.display_date(next_due), booked, status),
+                             tags=("overdue",) if is_overdue else ())
+        self.title_label.configure(text=f"Appointments: {overdue} overdue, {len(rows) - overdue} in the next {self.UPCOMING_DAYS} days")
@@ -0,0 +1,153 @@
+"""Background writer for the activity log.
+
+log() puts an entry on a bounded queue and returns straight away; a single
+writer thread inserts queued entries in batches of up to BATCH_SIZE, or
+whatever has arrived after BATCH_INTERVAL_MS, in one transaction each. If the
+database cannot be written (for example it stays locked past the busy
+timeout) the batch is appended to a journal file next to the database and
+replayed into activity_log on the next successful write or start-up.
+
+Each entry is timestamped when it is logged, not when it is written, so the
+log still shows when things actually happened.
+"""
+import atexit
+import datetime
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+import db_connection
+from db_connection import transaction
+
+BATCH_SIZE = 100
+BATCH_INTERVAL_MS = 200
+QUEUE_SIZE = 10000
+# Seconds log() may wait for room on a full queue before journalling the entry itself
+QUEUE_FULL_WAIT = 1.0
+JOURNAL_FILE = "activity_log_pending.jsonl"
+
+_INSERT_SQL = "INSERT INTO activity_log (timestamp, user, action, details) VALUES (?, ?, ?, ?)"
+
+_queue = None
+_thread = None
+_journal_lock = threading.Lock()
+
+
+def _journal_path():
+    return os.path.join(os.path.dirname(db_connection.DB_PATH), JOURNAL_FILE)
+
+
+def _timestamp():
+    # Same UTC format as the column's CURRENT_TIMESTAMP default
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _append_to_journal(entries):
+    with _journal_lock:
+        with open(_journal_path(), "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _replay_journal():
+    """Moves any journalled entries into activity_log. Returns the number replayed."""
+    path = _journal_path()
+    with _journal_lock:
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        with transaction() as cur:
+            cur.executemany(_INSERT_SQL, entries)
+        os.remove(path)
+    return len(entries)
+
+
+def write_entries(entries):
+    """Inserts (timestamp, user, action, details) entries in one transaction, journalling them on failure."""
+    try:
+        _replay_journal()
+        with transaction() as cur:
+            cur.executemany(_INSERT_SQL, entries)
+    except sqlite3.Error as e:
+        print(f"Database error while logging activity, saved to {JOURNAL_FILE}: {e}")
+        _append_to_journal(entries)
+
+
+def _run():
+    timeout = BATCH_INTERVAL_MS / 1000
+    while True:
+        item = _queue.get()
+        batch, waiters, stopping = [], [], False
+        while True:
+            if item is None:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                batch.append(item)
+            if stopping or waiters or len(batch) >= BATCH_SIZE:
+                break
+            try:
+                item = _queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+        if batch:
+            write_entries(batch)
+        for waiter in waiters:
+            waiter.set()
+        if stopping:
+            return
+
+
+def start():
+    """Starts the writer thread and replays anything left in the journal by a previous session."""
+    global _queue, _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    try:
+        _replay_journal()
+    except sqlite3.Error as e:
+        print(f"Database error replaying {JOURNAL_FILE}: {e}")
+    _queue = queue.Queue(maxsize=QUEUE_SIZE)
+    _thread = threading.Thread(target=_run, name="audit-writer", daemon=True)
+    _thread.start()
+    # Safety net for exits that skip the normal shutdown path
+    atexit.register(stop)
+
+
+def is_running():
+    return _thread is not None and _thread.is_alive()
+
+
+def log(user, action, details=""):
+    """Queues an activity log entry. Returns True if the writer thread took it."""
+    if not is_running():
+        return False
+    entry = (_timestamp(), user, action, details)
+    try:
+        _queue.put(entry, timeout=QUEUE_FULL_WAIT)
+    except queue.Full:
+        _append_to_journal([entry])
+    return True
+
+
+def flush():
+    """Blocks until everything logged so far has been written."""
+    if is_running():
+        done = threading.Event()
+        _queue.put(done)
+        done.wait()
+
+
+def stop():
+    """Writes any queued entries and stops the writer thread."""
+    global _thread
+    if is_running():
+        _queue.put(None)
+        _thread.join()
+    _thread = None
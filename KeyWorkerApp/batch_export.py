@@ -0,0 +1,129 @@
+"""Exports every service user's key worker form for one month as PDFs.
+
+Form data is read from the database in this process; the ReportLab rendering
+runs on a process pool, one form per task, so a month's reports are built in
+parallel. Used by the main menu's "Export Month's PDFs" button and from the
+command line:
+
+    python batch_export.py March 2025 C:\\Reports
+    python batch_export.py March 2025 C:\\Reports --merged --workers 4
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import database_utils as db_manager
+import pdf_generator
+
+
+def form_to_pdf_data(form_data, appointments, service_user_name, dob, month, year):
+    """Turns a forms row and its appointments into the dict generate_pdf expects (as FormWindow builds it)."""
+    data = {key: ("" if value is None else value) for key, value in form_data.items()}
+    data.update({"service_user_name": service_user_name, "dob": dob or "", "month": month, "year": year})
+    # The database keeps the session and appointment dates as YYYY-MM-DD; the PDF shows DD/MM/YYYY
+    session_date = data.get("session_datetime", "")
+    if len(session_date) == 10 and session_date[4] == "-":
+        data["session_datetime"] = f"{session_date[8:10]}/{session_date[5:7]}/{session_date[0:4]}"
+    data["appointments"] = [
+        {"name": a[0] or "", "last_seen": db_manager.display_date(a[1] or ""), "next_due": db_manager.display_date(a[2] or ""), "booked": a[3] or ""}
+        for a in appointments
+    ]
+    return data
+
+
+def collect_month_forms(month, year):
+    """Returns generate_pdf data for every service user who has a form for `month` `year`, ordered by name."""
+    forms = []
+    for service_user_id, name, dob in db_manager.get_all_service_users():
+        form_data = db_manager.get_form_data(service_user_id, f"{month} {year}")
+        if form_data:
+            appointments = db_manager.get_appointments(form_data["id"])
+            forms.append(form_to_pdf_data(form_data, appointments, name, dob, month, year))
+    return forms
+
+
+def _render_form(data, file_path):
+    # Runs in a worker process
+    success, error_message = pdf_generator.generate_pdf(data, file_path=file_path, open_when_done=False)
+    return data["service_user_name"], file_path, success, error_message
+
+
+def _merge_pdfs(paths, merged_path):
+    import pymupdf  # only needed for merged exports
+    merged = pymupdf.open()
+    for path in paths:
+        with pymupdf.open(path) as part:
+            merged.insert_pdf(part)
+    merged.save(merged_path, garbage=3, deflate=True)
+    merged.close()
+
+
+def export_month(month, year, output_folder, merged=False, workers=None, forms=None, progress=None):
+    """Renders every form for `month` `year` into `output_folder`.
+
+    Writes one PDF per service user, or a single Key_Worker_Forms_<month>_<year>.pdf
+    when `merged` is set. `workers` defaults to the number of CPUs. `progress`
+    is called as progress(done, total) in this process as each form finishes.
+    Returns (written_paths, failures) where failures is a list of (service_user_name, error_message).
+    """
+    if forms is None:
+        forms = collect_month_forms(month, year)
+    os.makedirs(output_folder, exist_ok=True)
+    if not forms:
+        return [], []
+
+    render_folder = tempfile.mkdtemp(prefix="keyworker_export_") if merged else output_folder
+    jobs = [(data, os.path.join(render_folder, pdf_generator.pdf_file_name(data))) for data in forms]
+    rendered, failures = {}, []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_form, data, file_path) for data, file_path in jobs]
+            for done, future in enumerate(as_completed(futures), start=1):
+                name, file_path, success, error_message = future.result()
+                if success:
+                    rendered[file_path] = name
+                else:
+                    failures.append((name, error_message))
+                if progress:
+                    progress(done, len(futures))
+
+        # Keep the output in service user order whatever order the workers finished in
+        written = [file_path for _, file_path in jobs if file_path in rendered]
+        if merged and written:
+            merged_path = os.path.join(output_folder, f"Key_Worker_Forms_{month}_{year}.pdf")
+            _merge_pdfs(written, merged_path)
+            written = [merged_path]
+    finally:
+        if merged:
+            shutil.rmtree(render_folder, ignore_errors=True)
+    return written, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export every service user's key worker form for a month as PDFs.")
+    parser.add_argument("month", help="Month name, e.g. March")
+    parser.add_argument("year", help="Four-digit year, e.g. 2025")
+    parser.add_argument("output_folder", help="Folder to write the PDFs to")
+    parser.add_argument("--merged", action="store_true", help="Write one combined PDF instead of one per service user")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of CPUs)")
+    args = parser.parse_args(argv)
+
+    import database
+    database.initialize_db()
+    month = args.month.capitalize()
+    written, failures = export_month(
+        month, args.year, args.output_folder, merged=args.merged, workers=args.workers,
+        progress=lambda done, total: print(f"Rendered {done}/{total}")
+    )
+    for name, error_message in failures:
+        print(f"Failed for {name}: {error_message}")
+    print(f"Wrote {len(written)} PDF(s) to {os.path.abspath(args.output_folder)}")
+    db_manager.log_activity("cli", "BATCH EXPORT", f"Exported {month} {args.year} forms ({len(written)} PDF(s), {len(failures)} failed)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
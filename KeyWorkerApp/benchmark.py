@@ -0,0 +1,563 @@
+"""Micro-benchmarks for the database layer.
+
+Runs against a throwaway copy of the schema in a temp folder, never against
+alyson_house.db. Usage:
+
+    python benchmark.py            # run every benchmark
+    python benchmark.py pool       # run one by name
+"""
+import multiprocessing
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+
+import db_connection
+
+
+def _setup_temp_db():
+    tmp_dir = tempfile.mkdtemp(prefix="keyworker_bench_")
+    db_connection.set_db_path(os.path.join(tmp_dir, "bench.db"))
+    import database
+    database.initialize_db()
+    return tmp_dir
+
+
+def _timeit(label, func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / repeat * 1e6
+    print(f"  {label:<40} {per_call_us:10.1f} us/call")
+    return per_call_us
+
+
+def bench_pool(repeat=2000):
+    """Per-call cost of a fresh sqlite3.connect() versus the pooled connection."""
+    import database_utils as db_manager
+    db_manager.add_service_user_db("Bench User", "01/01/1960")
+    user_id = db_manager.get_all_service_users()[0][0]
+    form_id = db_manager.save_form_data_db({"service_user_id": user_id, "form_month_year": "January 2025"})
+    path = db_connection.DB_PATH
+
+    def legacy_get_form_data():
+        con = sqlite3.connect(path)
+        con.row_factory = sqlite3.Row
+        row = con.execute("SELECT * FROM forms WHERE service_user_id = ? AND form_month_year = ?", (user_id, "January 2025")).fetchone()
+        con.close()
+        return dict(row)
+
+    def legacy_get_appointments():
+        con = sqlite3.connect(path)
+        rows = con.execute("SELECT name, last_seen, next_due, booked FROM appointments WHERE form_id = ?", (form_id,)).fetchall()
+        con.close()
+        return rows
+
+    def legacy_log_activity():
+        con = sqlite3.connect(path)
+        con.execute("INSERT INTO activity_log (user, action, details) VALUES (?, ?, ?)", ("bench", "BENCH", ""))
+        con.commit()
+        con.close()
+
+    cases = [
+        ("get_form_data", legacy_get_form_data, lambda: db_manager.get_form_data(user_id, "January 2025")),
+        ("get_appointments", legacy_get_appointments, lambda: db_manager.get_appointments(form_id)),
+        ("log_activity", legacy_log_activity, lambda: db_manager.log_activity("bench", "BENCH", "")),
+    ]
+    for name, legacy, pooled in cases:
+        print(f"{name}:")
+        before = _timeit("connect per call", legacy, repeat)
+        after = _timeit("pooled connection", pooled, repeat)
+        print(f"  {'saving':<40} {before - after:10.1f} us/call ({before / after:.1f}x)")
+
+
+def _stress_writer(path, profile, duration, ready):
+    db_connection.JOURNAL_PROFILE = profile
+    db_connection.set_db_path(path)
+    import database_utils as db_manager
+    ready.wait()
+    end = time.perf_counter() + duration
+    batches = 0
+    while time.perf_counter() < end:
+        # A large save: enough rows to spill the page cache, which is when a
+        # rollback-journal writer takes the exclusive lock and shuts readers out.
+        with db_connection.transaction() as cur:
+            cur.executemany(
+                "INSERT INTO activity_log (user, action, details) VALUES (?, ?, ?)",
+                [("writer", "SAVE FORM", "x" * 500)] * 20000
+            )
+        db_manager.save_form_data_db({"service_user_id": 1, "form_month_year": f"Batch {batches}"})
+        batches += 1
+    return batches
+
+
+def _stress_reader(path, profile, duration, ready, results):
+    db_connection.JOURNAL_PROFILE = profile
+    db_connection.set_db_path(path)
+    import database_utils as db_manager
+    ready.wait()
+    end = time.perf_counter() + duration
+    latencies = []
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        db_manager.get_all_service_users()
+        db_connection.get_connection().execute("SELECT * FROM activity_log ORDER BY id DESC LIMIT 50").fetchall()
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def bench_wal(readers=4, duration=5.0):
+    """One writer process saving large batches while reader processes poll; reports reader latency per journal profile."""
+    import database
+    for profile in ("rollback", "wal"):
+        tmp_dir = tempfile.mkdtemp(prefix="keyworker_stress_")
+        path = os.path.join(tmp_dir, "stress.db")
+        db_connection.JOURNAL_PROFILE = profile
+        db_connection.set_db_path(path)
+        database.initialize_db()
+        import database_utils as db_manager
+        db_manager.add_service_user_db("Stress User", "01/01/1960")
+        db_connection.close_all()
+
+        ready = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_stress_writer, args=(path, profile, duration, ready))]
+        procs += [multiprocessing.Process(target=_stress_reader, args=(path, profile, duration, ready, results)) for _ in range(readers)]
+        for proc in procs:
+            proc.start()
+        ready.set()
+        latencies = []
+        for _ in range(readers):
+            latencies.extend(results.get())
+        for proc in procs:
+            proc.join()
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{profile}: {len(latencies)} reads, "
+              f"median {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"p99 {p99 * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    db_connection.JOURNAL_PROFILE = "wal"
+
+
+def bench_saves(repeat=300):
+    """Form saves per second: separate commits for form, audit and appointments versus save_complete_form."""
+    import database
+    import database_utils as db_manager
+    appointments = [("GP", "01/01/2025", "01/07/2025", "Yes"), ("Dentist", "02/02/2025", "02/08/2025", "No")]
+    for profile in ("rollback", "wal"):
+        tmp_dir = tempfile.mkdtemp(prefix="keyworker_saves_")
+        db_connection.JOURNAL_PROFILE = profile
+        db_connection.set_db_path(os.path.join(tmp_dir, "saves.db"))
+        database.initialize_db()
+        db_manager.add_service_user_db("Bench User", "01/01/1960")
+        form = {"service_user_id": 1, "service_user_name": "Bench User", "form_month_year": "January 2025", "weight": "70kg"}
+
+        def three_commits():
+            form_id = db_manager.save_form_data(form, "bench")
+            db_manager.save_appointments(form_id, appointments)
+
+        def one_commit():
+            db_manager.save_complete_form(form, appointments, "bench")
+
+        print(f"{profile}:")
+        before = _timeit("save_form_data + save_appointments", three_commits, repeat)
+        after = _timeit("save_complete_form", one_commit, repeat)
+        print(f"  {'saves/s':<40} {1e6 / before:10.0f} -> {1e6 / after:.0f}")
+    db_connection.JOURNAL_PROFILE = "wal"
+
+
+def bench_audit(repeat=2000):
+    """Time a UI action spends in log_activity: a direct commit versus handing it to the audit writer."""
+    import audit_writer
+    import database
+    import database_utils as db_manager
+    for profile in ("rollback", "wal"):
+        tmp_dir = tempfile.mkdtemp(prefix="keyworker_audit_")
+        db_connection.JOURNAL_PROFILE = profile
+        db_connection.set_db_path(os.path.join(tmp_dir, "audit.db"))
+        database.initialize_db()
+        log = lambda: db_manager.log_activity("bench", "BENCH", "audit benchmark")
+
+        print(f"{profile}:")
+        before = _timeit("direct commit per entry", log, repeat)
+        audit_writer.start()
+        after = _timeit("queued to audit writer", log, repeat)
+        start = time.perf_counter()
+        audit_writer.stop()
+        print(f"  {'drain remaining queue':<40} {(time.perf_counter() - start) * 1000:10.1f} ms")
+        print(f"  {'saving':<40} {before - after:10.1f} us/call ({before / after:.0f}x)")
+    db_connection.JOURNAL_PROFILE = "wal"
+
+
+def bench_drafts(repeat=500):
+    """Time an autosave keeps the Tk thread: writing the draft directly versus queueing it to the drafts thread."""
+    import database_utils as db_manager
+    import form_drafts
+    db_manager.add_service_user_db("Draft Bench", "01/01/1960")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    form = {col: "x" * 40 for col in db_manager.FORM_COLUMNS}
+    appointments = [("GP", "01/01/2025", "01/07/2025", "Yes")] * 4
+    direct = lambda: form_drafts._write_draft(service_user_id, "2025-03", "bench", form, appointments)
+    queued = lambda: form_drafts.save_draft(service_user_id, "2025-03", "bench", form, appointments)
+    before = _timeit("draft written on the calling thread", direct, repeat)
+    after = _timeit("draft queued to the drafts thread", queued, repeat)
+    start = time.perf_counter()
+    form_drafts.flush()
+    print(f"  {'drain remaining queue':<40} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    print(f"  {'saving':<40} {before - after:10.1f} us/call ({before / after:.0f}x)")
+
+
+def bench_form_cache(repeat=500):
+    """Opening the forms either side of the current month: database reads versus the prefetched form cache."""
+    import database_utils as db_manager
+    import form_cache
+    db_manager.add_service_user_db("Cache Bench", "01/01/1960")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    months = ("February 2025", "March 2025", "April 2025")
+    for month_year in months:
+        form = {col: "x" * 40 for col in db_manager.FORM_COLUMNS}
+        form.update(service_user_id=service_user_id, form_month_year=month_year)
+        db_manager.save_complete_form(form, [("GP", "01/01/2025", "01/07/2025", "Yes")] * 4, "bench")
+
+    def uncached():
+        for month_year in months:
+            db_manager._load_form_with_appointments(service_user_id, db_manager.form_period(month_year))
+
+    def cached():
+        for month_year in months:
+            db_manager.get_form_with_appointments(service_user_id, month_year)
+
+    form_cache.clear()
+    db_manager.get_form_with_appointments(service_user_id, "March 2025")
+    db_manager.prefetch_adjacent_forms(service_user_id, "March", "2025").result()
+    _timeit("3 months from the database", uncached, repeat)
+    _timeit("3 months through the cache", cached, repeat)
+    stats = form_cache.stats()
+    print(f"  hits {stats['hits']}, misses {stats['misses']}, prefetched {stats['prefetched']}, hit rate {stats['hit_rate']:.1%}")
+
+
+def bench_vitals_trend(residents=20, months=36, repeat=200):
+    """Loading one resident's 36-month weight and BP trend: a get_form_data call per month versus get_vitals_trend."""
+    import database_utils as db_manager
+    periods = [db_manager.shift_period("2023-01", offset) for offset in range(months)]
+    with db_connection.transaction() as cur:
+        for resident in range(residents):
+            cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES (?, ?)", (f"Trend Bench {resident}", "01/01/1960"))
+            form = {col: "x" * 40 for col in db_manager.FORM_COLUMNS}
+            form["service_user_id"] = cur.lastrowid
+            for index, period in enumerate(periods):
+                form.update(form_month_year=db_manager.period_label(period), weight=f"{70 + index % 5}.5kg", bp=f"{120 + index % 10}/80")
+                cols = [col for col in db_manager.FORM_COLUMNS if col in form]
+                cur.execute(f"INSERT INTO forms ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", [form[col] for col in cols])
+    service_user_id = db_manager.get_all_service_users()[0][0]
+
+    def per_month():
+        for period in periods:
+            form = db_manager.get_form_data(service_user_id, db_manager.period_label(period))
+            float(form["weight"].rstrip("kg")), [int(part) for part in form["bp"].split("/")]
+
+    _timeit(f"{months} get_form_data calls", per_month, repeat)
+    _timeit("get_vitals_trend", lambda: db_manager.get_vitals_trend(service_user_id, periods[0], periods[-1]), repeat)
+
+
+def bench_compliance(residents=200, years=10, repeat=3):
+    """Every compliance report over the whole history of a large home, and the same through per-form reads."""
+    import compliance_report
+    import database_utils as db_manager
+    periods = [db_manager.shift_period("2016-01", offset) for offset in range(years * 12)]
+    checks = [column for column, _, _ in compliance_report.CHECKS]
+    with db_connection.transaction() as cur:
+        for resident in range(residents):
+            cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES (?, ?)", (f"Report Bench {resident}", "01/01/1960"))
+            service_user_id = cur.lastrowid
+            for index, period in enumerate(periods):
+                answers = [ok if (resident + index + offset) % 7 else ("Yes" if ok == "No" else "No")
+                           for offset, (_, _, ok) in enumerate(compliance_report.CHECKS)]
+                cur.execute(
+                    f"INSERT INTO forms (service_user_id, form_month_year, {', '.join(checks)}) VALUES (?, ?, {', '.join('?' * len(checks))})",
+                    [service_user_id, db_manager.period_label(period)] + answers
+                )
+                form_id = cur.lastrowid
+                cur.executemany(
+                    "INSERT INTO appointments (form_id, name, last_seen, next_due, booked) VALUES (?, ?, ?, ?, ?)",
+                    [(form_id, name, "", f"{int(period[:4]) + 1}-{period[5:7]}-{1 + resident % 28:02d}", "No") for name in ("GP", "Dentist", "Optician", "Chiropodist")]
+                )
+    print(f"  {residents} residents x {len(periods)} months, {residents * len(periods)} forms")
+
+    def per_form():
+        for service_user_id, _, _ in db_manager.get_all_service_users():
+            for form in db_manager.get_service_user_forms(service_user_id, periods[0], periods[-1]):
+                [form[column] == "Yes" for column in checks]
+                db_manager.get_appointments(form["id"])
+
+    _timeit("every form and its appointments", per_form, repeat)
+    _timeit("build_reports", lambda: compliance_report.build_reports(periods[0], periods[-1], as_of="2026-06-01"), repeat)
+
+
+def bench_due_appointments(residents=200, months=125, repeat=200):
+    """The main menu's overdue/upcoming appointments panel over 100k appointments, against reading every latest form."""
+    import database_utils as db_manager
+    periods = [db_manager.shift_period("2016-01", offset) for offset in range(months)]
+    with db_connection.transaction() as cur:
+        for resident in range(residents):
+            cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES (?, ?)", (f"Due Bench {resident}", "01/01/1960"))
+            service_user_id = cur.lastrowid
+            for period in periods:
+                cur.execute("INSERT INTO forms (service_user_id, form_month_year) VALUES (?, ?)", (service_user_id, db_manager.period_label(period)))
+                form_id = cur.lastrowid
+                cur.executemany(
+                    "INSERT INTO appointments (form_id, name, last_seen, next_due, booked) VALUES (?, ?, ?, ?, ?)",
+                    [(form_id, name, f"{period}-01", f"{period}-{1 + (resident + offset * 7) % 28:02d}", "No")
+                     for offset, name in enumerate(("GP", "Dentist", "Optician", "Chiropodist"))]
+                )
+    count = db_connection.get_connection().execute("SELECT count(*) FROM appointments").fetchone()[0]
+    print(f"  {residents} residents, {count} appointments")
+    due_to = db_manager.shift_period(periods[-1], 1) + "-01"
+
+    def every_latest_form():
+        for service_user_id, _, _ in db_manager.get_all_service_users():
+            latest = db_manager.get_service_user_forms(service_user_id)[-1]
+            [appt for appt in db_manager.get_appointments(latest["id"]) if appt[2] <= due_to]
+
+    _timeit("latest form per service user", every_latest_form, repeat)
+    _timeit("get_due_appointments", lambda: db_manager.get_due_appointments(due_to), repeat)
+
+
+def bench_bulk_import(sizes=(20_000, 100_000)):
+    """Bulk import throughput in rows per second, and peak Python memory, for CSV files of growing size."""
+    import csv
+    import tracemalloc
+    import bulk_import
+    import database_utils as db_manager
+    tmp_dir = tempfile.mkdtemp(prefix="keyworker_import_")
+    for size in sizes:
+        path = os.path.join(tmp_dir, f"import_{size}.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["service_user_name", "date_of_birth", "form_month_year", "key_worker_name", "weight", "bp",
+                             "nails_check", "other_notes", "appointment_1_name", "appointment_1_last_seen",
+                             "appointment_1_next_due", "appointment_1_booked", "appointment_2_name", "appointment_2_next_due"])
+            for row in range(size):
+                period = db_manager.shift_period("2000-01", row % 300)
+                writer.writerow([f"Import Bench {size} {row // 300}", "01/01/1960", db_manager.period_label(period), "Key Worker",
+                                 f"{60 + row % 30}kg", "120/80", "Yes", "Settled month, no concerns.", "GP",
+                                 f"{period}-01", f"10/{period[5:7]}/{period[:4]}", "Yes", "Dentist", f"{period}-20"])
+        start = time.perf_counter()
+        result = bulk_import.import_file(path)
+        elapsed = time.perf_counter() - start
+        # Memory is measured on a second import of the same file (every form is updated in place); tracing slows the run down
+        tracemalloc.start()
+        bulk_import.import_file(path)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {size:>7} rows ({os.path.getsize(path) / 1e6:5.1f} MB): {result.rows / elapsed:8.0f} rows/s, "
+              f"peak {peak / 1e6:5.1f} MB, {result.forms} forms, {result.bad_rows} bad")
+
+
+def bench_database_archive(scales=(1, 4)):
+    """Full-database export and restore times as the data grows; per-row cost should stay flat."""
+    import database
+    import database_archive
+    import database_utils as db_manager
+    for scale in scales:
+        tmp_dir = tempfile.mkdtemp(prefix="keyworker_archive_")
+        db_connection.set_db_path(os.path.join(tmp_dir, "archive.db"))
+        database.initialize_db()
+        generate_activity_log(100_000 * scale)
+        with db_connection.transaction() as cur:
+            for resident in range(50 * scale):
+                cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES (?, ?)", (f"Archive Bench {resident}", "1960-01-01"))
+                service_user_id = cur.lastrowid
+                for offset in range(120):
+                    cur.execute("INSERT INTO forms (service_user_id, form_month_year, weight, bp, other_notes) VALUES (?, ?, ?, ?, ?)",
+                                (service_user_id, db_manager.period_label(db_manager.shift_period("2015-01", offset)), "70kg", "120/80", "Settled month, no concerns."))
+                    cur.executemany("INSERT INTO appointments (form_id, name, last_seen, next_due, booked) VALUES (?, ?, ?, ?, ?)",
+                                    [(cur.lastrowid, name, "2025-01-01", "2025-07-01", "No") for name in ("GP", "Dentist", "Optician")])
+        db_connection.checkpoint()
+        rows = sum(db_connection.get_connection().execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                   for table in ("activity_log", "service_users", "forms", "appointments"))
+        path = os.path.join(tmp_dir, "archive.zip")
+        start = time.perf_counter()
+        database_archive.export_archive(path)
+        exported = time.perf_counter() - start
+        start = time.perf_counter()
+        database_archive.restore_archive(path)
+        restored = time.perf_counter() - start
+        print(f"  {rows:>8} rows ({os.path.getsize(db_connection.DB_PATH) / 1e6:5.1f} MB db, {os.path.getsize(path) / 1e6:5.1f} MB archive): "
+              f"export {exported:5.2f} s ({exported / rows * 1e6:4.1f} us/row), restore {restored:5.2f} s ({restored / rows * 1e6:4.1f} us/row)")
+
+
+def bench_pdf(repeat=10):
+    """Build time and file size of a single form PDF."""
+    import pdf_generator
+    data = {"service_user_name": "Bench User", "month": "March", "year": "2025", "feeling_icons_selected": "Happy"}
+    file_path = os.path.join(tempfile.mkdtemp(prefix="keyworker_pdf_"), "bench.pdf")
+    build = lambda: pdf_generator.generate_pdf(data, file_path=file_path, open_when_done=False)
+    _timeit("first build in this process", build, 1)
+    _timeit("generate_pdf", build, repeat)
+    print(f"  {'file size':<40} {os.path.getsize(file_path) / 1024:10.1f} KB")
+
+
+FORM_ICONS = ["Happy Emoji.png", "Sad emoji.jpg", "thumbs up emoji.jpg", "thumbds down emoji.png",
+              "Art Work.jpg", "Healthy-Food-Choices.png", "Medicine.jpeg", "Shower.jpg", "Happy Emoji.png", "Sad emoji.jpg"]
+
+
+def bench_form_icons(repeat=20):
+    """Image work per FormWindow open: decoding and resizing every icon versus the icon cache."""
+    import shutil
+    from PIL import Image
+    import icon_assets
+
+    def decode_and_resize():
+        for icon in FORM_ICONS:
+            Image.open(os.path.join(icon_assets.IMAGES_DIR, icon)).resize((60, 60), Image.Resampling.LANCZOS)
+
+    def load_from_disk_cache():
+        for icon in FORM_ICONS:
+            with Image.open(icon_assets.prescaled_icon(icon, 60, 60)) as cached:
+                cached.copy()
+
+    def build_disk_cache():
+        shutil.rmtree(icon_assets.CACHE_DIR, ignore_errors=True)
+        icon_assets._digests.clear()
+        load_from_disk_cache()
+
+    _timeit("decode + resize originals (before)", decode_and_resize, repeat)
+    _timeit("first run, building icon_cache", build_disk_cache, 3)
+    _timeit("new process, icon_cache on disk", load_from_disk_cache, repeat)
+    # Within one process every later window gets the CTkImage from icon_assets._ctk_images: a dict lookup
+
+
+def bench_form_open(repeat=5):
+    """Wall-clock time to open (and draw) a new FormWindow and a pooled one. Needs customtkinter and a display."""
+    import customtkinter as ctk
+    import database_utils as db_manager
+    from form_window import FormWindow, FormWindowPool
+    db_manager.add_service_user_db("Form Bench", "01/01/1960")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    root = ctk.CTk()
+    root.withdraw()
+
+    def open_form():
+        window = FormWindow(root, service_user_id, "Form Bench", "01/01/1960", "March", "2025", current_user={"username": "bench"})
+        window.update()
+        window.destroy()
+
+    _timeit("first FormWindow", open_form, 1)
+    _timeit("later FormWindows", open_form, repeat)
+
+    pool = FormWindowPool(root)
+
+    def reopen_form():
+        window = pool.open(service_user_id, "Form Bench", "01/01/1960", "March", "2025", current_user={"username": "bench"})
+        window.update()
+        window.close()
+
+    reopen_form()  # builds the window the pool hands out from then on
+    _timeit("pooled FormWindow reopened", reopen_form, repeat)
+    root.destroy()
+
+
+def bench_batch_pdf(forms=48):
+    """Batch PDF export throughput in PDFs per second for 1, 2, 4 ... worker processes up to the CPU count."""
+    import batch_export
+    base = {"key_worker_name": "Bench Worker", "session_datetime": "07/03/2025", "weight": "70kg", "bp": "120/80",
+            "feeling_icons_selected": "Happy", "care_icons_selected": "Food,Shower", "other_notes": "Benchmark notes. " * 20}
+    appointments = [{"name": "GP", "last_seen": "01/01/2025", "next_due": "01/07/2025", "booked": "Yes"}] * 4
+    month_forms = [dict(base, service_user_name=f"Resident {n}", dob="01/01/1950", month="March", year="2025", appointments=appointments)
+                   for n in range(forms)]
+    worker_counts = sorted({1, os.cpu_count() or 1} | {n for n in (2, 4, 8, 16) if n < (os.cpu_count() or 1)})
+    for workers in worker_counts:
+        output_folder = tempfile.mkdtemp(prefix="keyworker_batch_")
+        start = time.perf_counter()
+        written, failures = batch_export.export_month("March", "2025", output_folder, workers=workers, forms=month_forms)
+        elapsed = time.perf_counter() - start
+        print(f"  {f'{workers} worker(s), {len(written)} PDFs':<40} {len(written) / elapsed:10.1f} PDFs/s ({elapsed:.1f} s)")
+
+
+def generate_activity_log(rows=1_000_000):
+    """Fills activity_log with `rows` synthetic entries spread over roughly a year."""
+    actions = ["LOGIN", "SAVE FORM", "ADD SERVICE USER", "UPDATE SERVICE USER", "LOGIN FAILED", "PASSWORD CHANGE"]
+    users = [f"staff{n}" for n in range(25)]
+    seconds_per_row = max(1, 365 * 24 * 3600 // rows)
+    start = time.perf_counter()
+    with db_connection.transaction() as cur:
+        cur.executemany(
+            "INSERT INTO activity_log (timestamp, user, action, details) "
+            "VALUES (datetime('2025-01-01', ? || ' seconds'), ?, ?, ?)",
+            ((n * seconds_per_row, users[n % len(users)], actions[n % len(actions)], f"Synthetic entry {n} for resident {n % 200}")
+             for n in range(rows))
+        )
+    print(f"  generated {rows} log rows in {time.perf_counter() - start:.1f} s")
+
+
+def bench_activity_log(rows=1_000_000, pages=500):
+    """Opening and scrolling the activity log: full fetch versus keyset pages."""
+    import database_utils as db_manager
+    generate_activity_log(rows)
+    start = time.perf_counter()
+    db_manager.get_activity_log()
+    print(f"  {'get_activity_log (every row)':<40} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    _timeit("first page (200 rows)", db_manager.get_activity_log_page, 100)
+
+    cursor = None
+    timings = []
+    for _ in range(pages):
+        start = time.perf_counter()
+        page = db_manager.get_activity_log_page(before=cursor)
+        timings.append(time.perf_counter() - start)
+        cursor = (page[-1][1], page[-1][0])
+    print(f"  {f'next page, {pages} pages deep':<40} {sum(timings) / len(timings) * 1e6:10.1f} us/call (last page {timings[-1] * 1e6:.1f} us)")
+
+
+def bench_activity_log_search(rows=2_000_000):
+    """Filtered and full-text activity log queries on a multi-million-row log."""
+    import database_utils as db_manager
+    generate_activity_log(rows)
+    cases = [
+        ("unfiltered first page", {}),
+        ("user", {"user": "staff7"}),
+        ("action", {"action": "SAVE FORM"}),
+        ("date range", {"date_from": "2025-03-01", "date_to": "2025-03-31"}),
+        ("user + action + date range", {"user": "staff7", "action": "LOGIN", "date_from": "2025-06-01", "date_to": "2025-06-30"}),
+        ("text, common word", {"text": "synthetic"}),
+        ("text, rare word", {"text": "entry 1234567"}),
+        ("text while typing (prefix)", {"text": "resid"}),
+        ("text + user", {"text": "resident 42", "user": "staff3"}),
+    ]
+    for label, filters in cases:
+        _timeit(label, lambda: db_manager.get_activity_log_page(**filters), 20)
+    _timeit("filter dropdown values (user)", lambda: db_manager.get_activity_log_filter_values("user"), 20)
+
+
+BENCHMARKS = {
+    "pool": bench_pool,
+    "wal": bench_wal,
+    "saves": bench_saves,
+    "audit": bench_audit,
+    "drafts": bench_drafts,
+    "form_cache": bench_form_cache,
+    "vitals_trend": bench_vitals_trend,
+    "compliance": bench_compliance,
+    "due_appointments": bench_due_appointments,
+    "bulk_import": bench_bulk_import,
+    "database_archive": bench_database_archive,
+    "form_icons": bench_form_icons,
+    "form_open": bench_form_open,
+    "pdf": bench_pdf,
+    "batch_pdf": bench_batch_pdf,
+    "activity_log": bench_activity_log,
+    "activity_log_search": bench_activity_log_search,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    _setup_temp_db()
+    for name in names:
+        print(f"=== {name} ===")
+        BENCHMARKS[name]()
+    db_connection.close_all()
@@ -0,0 +1,350 @@
+"""Bulk import of service users and their historical forms from CSV or XLSX files.
+
+Rows are streamed from the file, validated one at a time and written in
+batched transactions, so memory use stays flat however large the file is.
+Each row is a service user, optionally with one month's form and its
+appointments:
+
+    service_user_name, date_of_birth, form_month_year, <any forms column>...,
+    appointment_1_name, appointment_1_last_seen, appointment_1_next_due, appointment_1_booked,
+    appointment_2_name, ...
+
+Headers are matched case-insensitively ("Service User Name" works). A row
+without form_month_year only adds the service user, or updates their date of
+birth. Rows that fail validation are skipped and written, with the reason,
+to an errors CSV. Used by Manage Service Users' "Import From File" button and
+from the command line:
+
+    python bulk_import.py C:\\Records\\history.xlsx
+    python bulk_import.py C:\\Records\\history.csv --errors C:\\Records\\bad_rows.csv
+"""
+import argparse
+import csv
+import datetime
+import io
+import os
+import re
+import sqlite3
+import sys
+import zipfile
+from collections import namedtuple
+
+import database_utils as db_manager
+import form_cache
+from db_connection import transaction
+
+BATCH_SIZE = 5000
+# How many error messages ImportResult keeps; the errors CSV has them all
+KEEP_ERRORS = 20
+
+ImportResult = namedtuple(
+    "ImportResult",
+    "rows service_users_added service_users_updated forms appointments bad_rows errors errors_path ignored_columns"
+)
+
+HEADER_ALIASES = {
+    "name": "service_user_name", "service_user": "service_user_name", "resident": "service_user_name",
+    "dob": "date_of_birth", "month": "form_month_year", "form_month": "form_month_year", "month_year": "form_month_year",
+}
+# Columns the form shows as No/Yes switches
+YES_NO_COLUMNS = {
+    "health_concerns", "nails_check", "hair_check", "mar_sheets_check", "finance_top_up",
+    "shop_q1_toiletries", "shop_q2_clothes", "shop_q3_personal_items", "caredocs_contacts", "caredocs_careplan",
+    "caredocs_meds", "caredocs_bodymap", "caredocs_charts", "health_plan_file", "family_comm_made",
+}
+# Dates the form's date pickers keep as DD/MM/YYYY; session_datetime is stored as YYYY-MM-DD
+DISPLAY_DATE_COLUMNS = {"nails_date", "hair_date"}
+BOOKED_VALUES = ("Yes", "No", "N/A")
+_APPOINTMENT_COLUMN = re.compile(r"appointment_(\d+)_(name|last_seen|next_due|booked)$")
+_APPOINTMENT_FIELDS = ("name", "last_seen", "next_due", "booked")
+
+
+def _normalize_header(header):
+    key = re.sub(r"[^a-z0-9]+", "_", str(header or "").strip().lower()).strip("_")
+    return HEADER_ALIASES.get(key, key)
+
+
+def _cell_text(value):
+    # XLSX cells arrive typed; everything is validated as text
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _read_csv(path):
+    # Progress comes from how far into the file the reader has got, which costs nothing to ask
+    with open(path, "rb") as raw:
+        total = os.fstat(raw.fileno()).st_size or 1
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        try:
+            for values in reader:
+                yield values, raw.tell() / total
+        except csv.Error as e:
+            raise ValueError(f"not a readable CSV file ({e})") from e
+
+
+def _read_xlsx(path):
+    from openpyxl import load_workbook  # only needed for workbook imports
+    from openpyxl.utils.exceptions import InvalidFileException
+    # A renamed or damaged file fails as a zip (BadZipFile), a zip without the workbook parts (KeyError)
+    # or broken XML (SyntaxError, the base of both ElementTree's and lxml's parse errors)
+    unreadable = (zipfile.BadZipFile, InvalidFileException, KeyError, SyntaxError)
+    try:
+        # Read-only mode parses the sheet as it goes instead of loading every cell
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except unreadable as e:
+        raise ValueError(f"not a readable Excel workbook ({e})") from e
+    try:
+        sheet = workbook.active
+        total = sheet.max_row or 0
+        for row_number, values in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield [_cell_text(value) for value in values], (row_number / total if total else 0.0)
+    except unreadable as e:
+        raise ValueError(f"not a readable Excel workbook ({e})") from e
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    """Yields (values, fraction of the file read) for each row of a .csv or .xlsx file, header first.
+
+    A file that cannot be read as its type raises ValueError.
+    """
+    return _read_xlsx(path) if path.lower().endswith(".xlsx") else _read_csv(path)
+
+
+def _yes_no(value):
+    answer = {"yes": "Yes", "y": "Yes", "true": "Yes", "1": "Yes", "no": "No", "n": "No", "false": "No", "0": "No"}.get(value.lower())
+    if answer is None:
+        raise ValueError(f"expected Yes or No, got {value!r}")
+    return answer
+
+
+def _iso(value, column):
+    if not value:
+        return ""
+    iso = db_manager.iso_date(value)
+    try:
+        datetime.date.fromisoformat(iso)
+    except ValueError:
+        raise ValueError(f"{column} {value!r} is not a DD/MM/YYYY or YYYY-MM-DD date") from None
+    return iso
+
+
+class _RowValidator:
+    """Turns a row of cell text into a record for _BatchWriter, raising ValueError with the reason if it is invalid."""
+
+    def __init__(self, header):
+        self.columns = [_normalize_header(column) for column in header]
+        if "service_user_name" not in self.columns:
+            raise ValueError("the file has no service_user_name (or name) column")
+        self.form_columns = [column for column in self.columns if column in db_manager.FORM_COLUMNS
+                             and column not in db_manager.FORM_KEY_COLUMNS]
+        self.appointment_slots = sorted({int(match.group(1)) for column in self.columns
+                                         if (match := _APPOINTMENT_COLUMN.match(column))})
+        known = {"service_user_name", "date_of_birth", "form_month_year", *self.form_columns}
+        self.ignored_columns = [column for column in self.columns if column not in known and not _APPOINTMENT_COLUMN.match(column)]
+
+    def validate(self, values):
+        row = dict(zip(self.columns, (str(value).strip() for value in values)))
+        name = row.get("service_user_name", "")
+        if not name:
+            raise ValueError("service_user_name is empty")
+        dob = _iso(row.get("date_of_birth", ""), "date_of_birth")
+        record = {"service_user_name": name, "date_of_birth": dob, "form": None, "appointments": None}
+
+        month = row.get("form_month_year", "")
+        appointments = self._appointments(row)
+        if not month:
+            if appointments or any(row.get(column) for column in self.form_columns):
+                raise ValueError("form fields are filled in but form_month_year is empty")
+            return record
+        period = db_manager.form_period(month)
+        if period is None:
+            raise ValueError(f"form_month_year {month!r} is not a month like 'March 2025'")
+
+        form = {"form_month_year": db_manager.period_label(period)}
+        for column in self.form_columns:
+            value = row.get(column, "")
+            if column in YES_NO_COLUMNS:
+                value = _yes_no(value) if value else "No"
+            elif column == "session_datetime":
+                value = _iso(value, column)
+            elif column in DISPLAY_DATE_COLUMNS and value:
+                value = db_manager.display_date(_iso(value, column))
+            form[column] = value
+        record["form"] = form
+        record["appointments"] = appointments if self.appointment_slots else None
+        return record
+
+    def _appointments(self, row):
+        appointments = []
+        for slot in self.appointment_slots:
+            name, last_seen, next_due, booked = (row.get(f"appointment_{slot}_{field}", "") for field in _APPOINTMENT_FIELDS)
+            if not (name or last_seen or next_due or booked):
+                continue
+            if not name:
+                raise ValueError(f"appointment {slot} has details but no name")
+            booked = next((value for value in BOOKED_VALUES if value.lower() == booked.lower()), None) if booked else "N/A"
+            if booked is None:
+                raise ValueError(f"appointment {slot} booked must be Yes, No or N/A")
+            appointments.append((name, _iso(last_seen, f"appointment {slot} last_seen"), _iso(next_due, f"appointment {slot} next_due"), booked))
+        return appointments
+
+
+class _BatchWriter:
+    """Writes validated records a batch per transaction, creating service users as they are first seen."""
+
+    def __init__(self):
+        self.service_users = {}  # name -> (id, date_of_birth), so each service user is looked up once
+        self.counts = {"service_users_added": 0, "service_users_updated": 0, "forms": 0, "appointments": 0}
+
+    def _service_user_id(self, cur, name, dob):
+        if name not in self.service_users:
+            row = cur.execute("SELECT id, date_of_birth FROM service_users WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES (?, ?)", (name, dob))
+                row = (cur.lastrowid, dob)
+                self.counts["service_users_added"] += 1
+            self.service_users[name] = row
+        service_user_id, current_dob = self.service_users[name]
+        if dob and dob != current_dob:
+            cur.execute("UPDATE service_users SET date_of_birth = ? WHERE id = ?", (dob, service_user_id))
+            self.service_users[name] = (service_user_id, dob)
+            self.counts["service_users_updated"] += 1
+        return service_user_id
+
+    def write(self, records):
+        """Writes `records` in one transaction. On a database error nothing in the batch is kept and the error is raised.
+
+        The forms and appointments go in with a few executemany calls for the
+        whole batch, and the form cache is cleared once afterwards.
+        """
+        counts = dict(self.counts)
+        service_users = dict(self.service_users)
+        try:
+            with transaction() as cur:
+                forms = []
+                for record in records:
+                    service_user_id = self._service_user_id(cur, record["service_user_name"], record["date_of_birth"])
+                    if record["form"] is None:
+                        continue
+                    forms.append((dict(record["form"], service_user_id=service_user_id), record["appointments"]))
+                    self.counts["forms"] += 1
+                    self.counts["appointments"] += len(record["appointments"] or [])
+                db_manager.save_form_batch(forms)
+        except sqlite3.Error:
+            self.counts, self.service_users = counts, service_users
+            raise
+        finally:
+            form_cache.clear()
+
+
+def import_file(path, errors_path=None, batch_size=BATCH_SIZE, progress=None):
+    """Imports every row of the .csv or .xlsx file at `path`.
+
+    Bad rows are skipped; if `errors_path` is given they are written there as
+    CSV with the row number and reason. `progress` is called as
+    progress(rows_read, fraction_of_file_read) after each batch. Returns an
+    ImportResult. Raises ValueError if the file cannot be read or has no header
+    or no name column.
+    """
+    rows = read_rows(path)
+    try:
+        header, _ = next(rows)
+    except StopIteration:
+        raise ValueError("the file is empty") from None
+    validator = _RowValidator(header)
+    writer = _BatchWriter()
+    errors, bad_rows, row_number, fraction = [], 0, 1, 0.0
+    errors_file = errors_writer = None
+    batch, batch_rows = [], []
+
+    def record_error(number, values, message):
+        nonlocal bad_rows, errors_file, errors_writer
+        bad_rows += 1
+        if len(errors) < KEEP_ERRORS:
+            errors.append((number, message))
+        if errors_path:
+            if errors_writer is None:
+                errors_file = open(errors_path, "w", newline="", encoding="utf-8-sig")
+                errors_writer = csv.writer(errors_file)
+                errors_writer.writerow(["row", "error"] + list(header))
+            errors_writer.writerow([number, message] + list(values))
+
+    def flush():
+        try:
+            if batch:
+                writer.write(batch)
+        except sqlite3.Error as e:
+            for number, values in batch_rows:
+                record_error(number, values, f"database error: {e}")
+        batch.clear()
+        batch_rows.clear()
+        if progress:
+            progress(row_number - 1, fraction)
+
+    try:
+        for row_number, (values, fraction) in enumerate(rows, start=2):
+            if not any(str(value).strip() for value in values):
+                continue
+            try:
+                batch.append(validator.validate(values))
+            except ValueError as e:
+                record_error(row_number, values, str(e))
+                continue
+            batch_rows.append((row_number, values))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        rows.close()
+        if errors_file:
+            errors_file.close()
+
+    return ImportResult(rows=row_number - 1, bad_rows=bad_rows, errors=errors, ignored_columns=validator.ignored_columns,
+                        errors_path=errors_path if errors_writer else None, **writer.counts)
+
+
+def describe_result(result):
+    """A short summary of an ImportResult for messages and the activity log."""
+    return (f"{result.rows} row(s): {result.service_users_added} service user(s) added, "
+            f"{result.service_users_updated} updated, {result.forms} form(s), "
+            f"{result.appointments} appointment(s), {result.bad_rows} bad row(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import service users and historical forms from a CSV or XLSX file.")
+    parser.add_argument("path", help="The .csv or .xlsx file to import")
+    parser.add_argument("--errors", default=None, help="Where to write rejected rows (default: <file>_errors.csv)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"Rows per transaction (default: {BATCH_SIZE})")
+    args = parser.parse_args(argv)
+
+    import database
+    database.initialize_db()
+    errors_path = args.errors or f"{os.path.splitext(args.path)[0]}_errors.csv"
+    try:
+        result = import_file(args.path, errors_path, args.batch_size,
+                             progress=lambda rows, fraction: print(f"Imported {rows} rows ({fraction:.0%})"))
+    except (OSError, ValueError) as e:
+        print(f"Could not import {args.path}: {e}")
+        return 1
+    if result.ignored_columns:
+        print(f"Ignored unknown columns: {', '.join(result.ignored_columns)}")
+    print(describe_result(result))
+    for number, message in result.errors:
+        print(f"Row {number}: {message}")
+    if result.errors_path:
+        print(f"Every rejected row is in {os.path.abspath(result.errors_path)}")
+    db_manager.log_activity("cli", "BULK IMPORT", f"Imported {os.path.basename(args.path)}: {describe_result(result)}")
+    return 1 if result.bad_rows else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""Query-plan regression check for database_utils.
+
+Runs tests/test_query_plans.py, which calls every database_utils function
+against a temporary database and fails if EXPLAIN QUERY PLAN shows a full
+table scan or a temporary B-tree for sorting. It is part of the pytest suite;
+this script runs just that test after changing a query or the schema:
+
+    python check_query_plans.py
+"""
+import os
+import sys
+
+import pytest
+
+if __name__ == "__main__":
+    test_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "test_query_plans.py")
+    sys.exit(pytest.main(["-q", test_path]))
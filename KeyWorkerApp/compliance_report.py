@@ -0,0 +1,188 @@
+"""Home-wide compliance reports over every service user's forms.
+
+Each report is one aggregate query over forms (and appointments) for a range
+of months, so a supervisor no longer has to open every form to see who missed
+a check. build_reports() returns them as Report tuples and export_reports()
+writes them to a workbook (one sheet per report) or to CSV files. Used by the
+main menu's "Compliance Report" button and from the command line:
+
+    python compliance_report.py "January 2025" "March 2025" C:\\Reports\\compliance.xlsx
+    python compliance_report.py "March 2025" "March 2025" C:\\Reports\\compliance.csv
+"""
+import argparse
+import csv
+import datetime
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+
+import database_utils as db_manager
+from db_connection import get_connection
+
+Report = namedtuple("Report", "name title headers rows")
+
+# The Yes/No checks on every monthly form, as (forms column, label, answer that needs no follow-up).
+# The nails and hair questions ask whether a cut is needed, so for them Yes is the outstanding answer.
+CHECKS = (
+    ("nails_check", "Nails cut needed", "No"),
+    ("hair_check", "Hair cut needed", "No"),
+    ("mar_sheets_check", "MAR sheets", "Yes"),
+    ("health_plan_file", "Health plan", "Yes"),
+    ("family_comm_made", "Family contact", "Yes"),
+)
+
+def check_summary(period_from, period_to):
+    """Per month from `period_from` to `period_to` (YYYY-MM): forms saved and how many gave each check's no-follow-up answer."""
+    ok_counts = ", ".join(f"count(CASE WHEN {column} = '{ok}' THEN 1 END)" for column, _, ok in CHECKS)
+    rows = get_connection().execute(
+        f"SELECT period, count(*), {ok_counts} FROM forms WHERE period BETWEEN ? AND ? GROUP BY period ORDER BY period",
+        (period_from, period_to)
+    ).fetchall()
+    return Report(
+        "check_summary", "Checks Completed",
+        ["Month", "Forms"] + [f"{label} ({ok})" for _, label, ok in CHECKS],
+        [(db_manager.period_label(row[0]),) + tuple(row[1:]) for row in rows],
+    )
+
+
+def missed_checks(period_from, period_to):
+    """Every service user and month from `period_from` to `period_to` with a check left outstanding.
+
+    Months from a service user's first form onwards with no form at all are
+    listed as "No form saved".
+    """
+    missed = " || ".join(f"CASE WHEN f.{column} IS NOT '{ok}' THEN '{label}, ' ELSE '' END" for column, label, ok in CHECKS)
+    any_missed = " OR ".join(f"f.{column} IS NOT '{ok}'" for column, _, ok in CHECKS)
+    rows = get_connection().execute(f'''
+        WITH RECURSIVE months(period) AS (
+            SELECT ? UNION ALL
+            SELECT strftime('%Y-%m', period || '-01', '+1 month') FROM months WHERE period < ?
+        ),
+        first_forms AS (
+            SELECT service_user_id, min(period) AS first_period FROM forms GROUP BY service_user_id
+        )
+        SELECT months.period, su.name,
+               CASE WHEN f.id IS NULL THEN 'No form saved' ELSE rtrim({missed}, ', ') END
+        FROM months
+        JOIN first_forms ON first_forms.first_period <= months.period
+        JOIN service_users su ON su.id = first_forms.service_user_id
+        LEFT JOIN forms f ON f.service_user_id = su.id AND f.period = months.period
+        WHERE f.id IS NULL OR {any_missed}
+    ''', (period_from, period_to)).fetchall()
+    rows.sort(key=lambda row: (row[0], row[1].lower()))
+    return Report(
+        "missed_checks", "Missed Checks",
+        ["Month", "Service User", "Outstanding"],
+        [(db_manager.period_label(period), name, outstanding) for period, name, outstanding in rows],
+    )
+
+
+def overdue_appointments(period_to, as_of=None):
+    """Appointments on each service user's latest form up to `period_to` whose next_due is before `as_of`.
+
+    `as_of` is a YYYY-MM-DD date and defaults to today.
+    """
+    as_of = as_of or datetime.date.today().isoformat()
+    rows = get_connection().execute('''
+        WITH latest AS (
+            SELECT service_user_id, max(period) AS period FROM forms WHERE period <= ? GROUP BY service_user_id
+        )
+        SELECT su.name, f.form_month_year, a.name, a.next_due, a.booked,
+               CAST(julianday(?) - julianday(a.next_due) AS INTEGER)
+        FROM latest
+        JOIN forms f ON f.service_user_id = latest.service_user_id AND f.period = latest.period
+        JOIN service_users su ON su.id = f.service_user_id
+        JOIN appointments a ON a.form_id = f.id AND a.next_due BETWEEN '0000-01-01' AND date(?, '-1 day')
+                                AND a.next_due GLOB ?
+    ''', (period_to, as_of, as_of, db_manager.ISO_DATE_GLOB)).fetchall()
+    rows.sort(key=lambda row: (row[0].lower(), row[3]))
+    return Report(
+        "overdue_appointments", "Overdue Appointments",
+        ["Service User", "Form Month", "Appointment", "Next Due", "Booked", "Days Overdue"],
+        [row[:3] + (db_manager.display_date(row[3]),) + row[4:] for row in rows],
+    )
+
+
+def build_reports(period_from, period_to, as_of=None):
+    """Runs every report for `period_from` to `period_to` (YYYY-MM, inclusive). Returns a list of Reports,
+    or an empty list on a database error."""
+    try:
+        return [
+            check_summary(period_from, period_to),
+            missed_checks(period_from, period_to),
+            overdue_appointments(period_to, as_of),
+        ]
+    except sqlite3.Error as e:
+        print(f"Database error building compliance reports: {e}")
+        return []
+
+
+def _export_xlsx(reports, path):
+    from openpyxl import Workbook  # only needed for workbook exports
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    # Write-only mode streams rows to disk instead of building every cell in memory
+    workbook = Workbook(write_only=True)
+    for report in reports:
+        sheet = workbook.create_sheet(report.title[:31])
+        sheet.freeze_panes = "A2"
+        header = []
+        for text in report.headers:
+            cell = WriteOnlyCell(sheet, value=text)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+        for row in report.rows:
+            sheet.append(row)
+    workbook.save(path)
+    return [path]
+
+
+def _export_csv(reports, path):
+    # A CSV file holds one table, so each report goes to <name>_<report>.csv next to `path`
+    stem = os.path.splitext(path)[0]
+    written = []
+    for report in reports:
+        report_path = path if len(reports) == 1 else f"{stem}_{report.name}.csv"
+        with open(report_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(report.headers)
+            writer.writerows(report.rows)
+        written.append(report_path)
+    return written
+
+
+def export_reports(reports, path):
+    """Writes `reports` to `path`: an .xlsx workbook with a sheet per report, or CSV files
+    for any other extension. Returns the paths written."""
+    if path.lower().endswith(".xlsx"):
+        return _export_xlsx(reports, path)
+    return _export_csv(reports, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export home-wide compliance reports for a range of months.")
+    parser.add_argument("month_from", help='First month, e.g. "January 2025"')
+    parser.add_argument("month_to", help='Last month, e.g. "March 2025"')
+    parser.add_argument("output", help="File to write: .xlsx for a workbook, anything else for CSV")
+    args = parser.parse_args(argv)
+
+    period_from, period_to = db_manager.form_period(args.month_from), db_manager.form_period(args.month_to)
+    if not period_from or not period_to:
+        parser.error('months must look like "March 2025"')
+    import database
+    database.initialize_db()
+    reports = build_reports(min(period_from, period_to), max(period_from, period_to))
+    if not reports:
+        return 1
+    for report in reports:
+        print(f"{report.title}: {len(report.rows)} row(s)")
+    written = export_reports(reports, args.output)
+    print(f"Wrote {', '.join(os.path.abspath(path) for path in written)}")
+    db_manager.log_activity("cli", "COMPLIANCE REPORT", f"Exported compliance reports for {args.month_from} to {args.month_to}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import customtkinter as ctk
+import datetime
+import database_utils as db_manager
+
+
+def trend_months(months, today=None):
+    """Returns the YYYY-MM periods of the last `months` months, oldest first, ending with this month."""
+    today = today or datetime.date.today()
+    end = f"{today.year:04d}-{today.month:02d}"
+    return [db_manager.shift_period(end, offset) for offset in range(1 - months, 1)]
+
+
+def summarize(values):
+    """Returns the latest, lowest and highest of `values` and the change from the first to the latest,
+    ignoring None; None if there are no readings."""
+    readings = [value for value in values if value is not None]
+    if not readings:
+        return None
+    return {"latest": readings[-1], "min": min(readings), "max": max(readings), "change": readings[-1] - readings[0]}
+
+
+class ResidentDashboardWindow(ctk.CTkToplevel):
+    """Weight and blood pressure for one service user over the last 12-36 months."""
+    RANGES = {"12 months": 12, "24 months": 24, "36 months": 36}
+    CHART_HEIGHT = 220
+    PADDING = (50, 15, 20, 30)  # left, top, right, bottom
+    SERIES_COLOURS = {"Weight (kg)": "#1f6aa5", "Systolic": "#c0392b", "Diastolic": "#27ae60"}
+    # Milliseconds to wait after the last resize before redrawing
+    REDRAW_DELAY = 100
+
+    def __init__(self, parent, service_user_id, service_user_name):
+        super().__init__(parent)
+        self.title(f"Dashboard - {service_user_name}")
+        self.geometry("900x650")
+        self.grab_set()
+
+        self.service_user_id = service_user_id
+        self.main_font = ctk.CTkFont(size=14)
+        self.months = []
+        self.series = {}
+        self.redraw_job = None
+
+        top_frame = ctk.CTkFrame(self, fg_color="transparent")
+        top_frame.pack(fill="x", padx=10, pady=(10, 0))
+        ctk.CTkLabel(top_frame, text=service_user_name, font=ctk.CTkFont(size=16, weight="bold")).pack(side="left")
+        self.range_menu = ctk.CTkOptionMenu(top_frame, values=list(self.RANGES), font=self.main_font, command=lambda _: self.load_trend())
+        self.range_menu.set("12 months")
+        self.range_menu.pack(side="right")
+        ctk.CTkLabel(top_frame, text="Show last:", font=self.main_font).pack(side="right", padx=5)
+
+        self.weight_summary, self.weight_canvas = self._create_chart("Weight")
+        self.bp_summary, self.bp_canvas = self._create_chart("Blood Pressure")
+
+        self.load_trend()
+
+    def _create_chart(self, title):
+        frame = ctk.CTkFrame(self)
+        frame.pack(expand=True, fill="both", padx=10, pady=10)
+        ctk.CTkLabel(frame, text=title, font=ctk.CTkFont(size=15, weight="bold")).pack(anchor="w", padx=10, pady=(5, 0))
+        summary = ctk.CTkLabel(frame, text="", font=self.main_font, anchor="w", justify="left")
+        summary.pack(fill="x", padx=10)
+        canvas = ctk.CTkCanvas(frame, height=self.CHART_HEIGHT, background="white", highlightthickness=0)
+        canvas.pack(expand=True, fill="both", padx=10, pady=(0, 10))
+        canvas.bind("<Configure>", self._schedule_redraw)
+        return summary, canvas
+
+    def load_trend(self):
+        """Reads the selected range with one indexed query and redraws both charts."""
+        self.months = trend_months(self.RANGES[self.range_menu.get()])
+        by_period = {row[0]: row[1:] for row in db_manager.get_vitals_trend(self.service_user_id, self.months[0], self.months[-1])}
+        readings = [by_period.get(period, (None, None, None)) for period in self.months]
+        weights, systolic, diastolic = (list(column) for column in zip(*readings))
+        self.series = {"weight": {"Weight (kg)": weights}, "bp": {"Systolic": systolic, "Diastolic": diastolic}}
+
+        weight = summarize(weights)
+        self.weight_summary.configure(text=(
+            f"Latest {weight['latest']:.1f} kg   Range {weight['min']:.1f}-{weight['max']:.1f} kg   Change {weight['change']:+.1f} kg"
+            if weight else "No weights recorded in this period."
+        ))
+        high, low = summarize(systolic), summarize(diastolic)
+        self.bp_summary.configure(text=(
+            f"Latest {high['latest']}/{low['latest']}   Systolic {high['min']}-{high['max']}   Diastolic {low['min']}-{low['max']}"
+            if high and low else "No blood pressure readings recorded in this period."
+        ))
+        self._redraw()
+
+    def _schedule_redraw(self, event=None):
+        if self.redraw_job:
+            self.after_cancel(self.redraw_job)
+        self.redraw_job = self.after(self.REDRAW_DELAY, self._redraw)
+
+    def _redraw(self):
+        self.redraw_job = None
+        self._draw_chart(self.weight_canvas, self.series.get("weight", {}))
+        self._draw_chart(self.bp_canvas, self.series.get("bp", {}))
+
+    def _draw_chart(self, canvas, series):
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        left, top, right, bottom = self.PADDING
+        plot_width, plot_height = width - left - right, height - top - bottom
+        values = [value for points in series.values() for value in points if value is not None]
+        if not values or plot_width <= 0 or plot_height <= 0:
+            canvas.create_text(width / 2, height / 2, text="No data", fill="grey")
+            return
+
+        low, high = min(values), max(values)
+        margin = (high - low) * 0.1 or max(abs(high) * 0.05, 1)
+        low, high = low - margin, high + margin
+        step = plot_width / max(len(self.months) - 1, 1)
+        x_of = lambda index: left + index * step
+        y_of = lambda value: top + (high - value) / (high - low) * plot_height
+
+        canvas.create_line(left, top, left, top + plot_height, fill="grey")
+        canvas.create_line(left, top + plot_height, left + plot_width, top + plot_height, fill="grey")
+        for fraction in (0, 0.5, 1):
+            value = low + (high - low) * fraction
+            canvas.create_text(left - 5, y_of(value), text=f"{value:.0f}", anchor="e", fill="grey")
+        # Label every month for a year, every quarter beyond that, so labels never overlap
+        label_every = 1 if len(self.months) <= 12 else 3
+        for index, period in enumerate(self.months):
+            if index % label_every == 0 or index == len(self.months) - 1:
+                label = db_manager.period_label(period)
+                canvas.create_text(x_of(index), top + plot_height + 12, text=f"{label[:3]} {label[-2:]}", fill="grey")
+
+        for name, points in series.items():
+            colour = self.SERIES_COLOURS[name]
+            # Months without a reading break the line rather than being drawn as zero
+            segment = []
+            for index, value in enumerate(points + [None]):
+                if value is not None:
+                    x, y = x_of(index), y_of(value)
+                    segment.extend((x, y))
+                    canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill=colour, outline=colour)
+                elif segment:
+                    if len(segment) > 2:
+                        canvas.create_line(*segment, fill=colour, width=2)
+                    segment = []
+        legend_x = left + plot_width
+        for name in reversed(list(series)):
+            legend_x -= 8 * len(name) + 20
+            canvas.create_rectangle(legend_x, top, legend_x + 10, top + 10, fill=self.SERIES_COLOURS[name], outline="")
+            canvas.create_text(legend_x + 14, top + 5, text=name, anchor="w")
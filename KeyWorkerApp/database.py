@@ -1,13 +1,6 @@
-import os
-import sys
-import sqlite3
 import hashlib
-
-# Resolve path to DB next to the EXE when frozen, else next to this file
-def _app_dir():
-    return os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
-
-DB_PATH = os.path.join(_app_dir(), 'alyson_house.db')
+import sqlite3
+from db_connection import apply_journal_mode, get_connection, transaction
 
 
 def hash_password(password):
@@ -15,11 +8,23 @@ def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 
-def initialize_db():
-    """Creates the database file and tables if they don't exist, and migrates older schemas safely."""
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
+# ==============================================================================
+# SCHEMA MIGRATIONS
+# ==============================================================================
+# Each migration runs exactly once, in order, and the database records the
+# last one applied in PRAGMA user_version. Never edit a migration that has
+# shipped; append a new numbered one instead.
 
+def _add_missing_columns(cur, table, columns):
+    cur.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cur.fetchall()}
+    for name, declaration in columns:
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+
+
+def _migration_1_base_schema(cur):
+    """Creates the original tables and brings any pre-versioned database up to the same shape."""
     # Ensure 'users' table exists first
     cur.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -31,13 +36,11 @@ def initialize_db():
         )
     ''')
 
-    # Migrate: add missing columns in existing databases
-    cur.execute("PRAGMA table_info(users)")
-    user_cols = [row[1] for row in cur.fetchall()]
-    if 'role' not in user_cols:
-        cur.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'staff'")
-    if 'first_login' not in user_cols:
-        cur.execute("ALTER TABLE users ADD COLUMN first_login INTEGER NOT NULL DEFAULT 1")
+    # Older databases predate user roles and the forced first-login password change
+    _add_missing_columns(cur, "users", [
+        ("role", "TEXT NOT NULL DEFAULT 'staff'"),
+        ("first_login", "INTEGER NOT NULL DEFAULT 1"),
+    ])
 
     # Create default supervisor if missing
     cur.execute("SELECT 1 FROM users WHERE username = 'supervisor' LIMIT 1")
@@ -69,7 +72,7 @@ def initialize_db():
             hair_date TEXT, hair_comments TEXT, mar_sheets_check TEXT,
             mar_sheets_comments TEXT, finance_cash_box TEXT, finance_top_up TEXT,
             finance_take_out TEXT, finance_diary_datetime TEXT, finance_diary_staff TEXT,
-            shop_q1_toiletries TEXT, shop_q1_comments TEXT, shop_q2_clothes TEXT, shop_q2_comments TEXT, 
+            shop_q1_toiletries TEXT, shop_q1_comments TEXT, shop_q2_clothes TEXT, shop_q2_comments TEXT,
             shop_q3_personal_items TEXT, shop_q3_comments TEXT,
             caredocs_contacts TEXT, caredocs_careplan TEXT, caredocs_meds TEXT,
             caredocs_bodymap TEXT, caredocs_charts TEXT, health_plan_file TEXT,
@@ -82,29 +85,14 @@ def initialize_db():
         )
     ''')
 
-    # Add new shopping comment columns to existing databases
-    try:
-        cur.execute("ALTER TABLE forms ADD COLUMN shop_q1_comments TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    try:
-        cur.execute("ALTER TABLE forms ADD COLUMN shop_q2_comments TEXT") 
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    try:
-        cur.execute("ALTER TABLE forms ADD COLUMN shop_q3_comments TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-
-    # Add new icon selection columns for feelings and care sections
-    try:
-        cur.execute("ALTER TABLE forms ADD COLUMN feeling_icons_selected TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    try:
-        cur.execute("ALTER TABLE forms ADD COLUMN care_icons_selected TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+    # Shopping comments and the feelings/care icon selections were added after the first release
+    _add_missing_columns(cur, "forms", [
+        ("shop_q1_comments", "TEXT"),
+        ("shop_q2_comments", "TEXT"),
+        ("shop_q3_comments", "TEXT"),
+        ("feeling_icons_selected", "TEXT"),
+        ("care_icons_selected", "TEXT"),
+    ])
 
     # --- Appointments Table ---
     cur.execute('''
@@ -127,9 +115,227 @@ def initialize_db():
         )
     ''')
 
-    con.commit()
-    con.close()
 
+def _migration_2_secondary_indexes(cur):
+    """Indexes for appointment lookups by form and the activity log's timestamp ordering."""
+    # forms(service_user_id) lookups are already served by the UNIQUE(service_user_id, form_month_year) index.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_form_id ON appointments (form_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_log_timestamp ON activity_log (timestamp)")
+
+
+def _migration_3_activity_log_search(cur):
+    """Indexes for filtering the activity log by user and action, and an FTS5 index on its details."""
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_log_user ON activity_log (user, timestamp)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_log_action ON activity_log (action, timestamp)")
+    try:
+        cur.execute("CREATE VIRTUAL TABLE IF NOT EXISTS activity_log_fts USING fts5(details, content='activity_log', content_rowid='id', prefix='2 3 4')")
+    except sqlite3.OperationalError:
+        print("SQLite was built without FTS5; activity log text search will use LIKE.")
+        return
+    # prefix='2 3 4' keeps short search-as-you-type prefixes to a single index lookup.
+    # Keep the external-content FTS index in step with activity_log
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_log_fts_insert AFTER INSERT ON activity_log BEGIN
+            INSERT INTO activity_log_fts (rowid, details) VALUES (new.id, new.details);
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_log_fts_delete AFTER DELETE ON activity_log BEGIN
+            INSERT INTO activity_log_fts (activity_log_fts, rowid, details) VALUES ('delete', old.id, old.details);
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_log_fts_update AFTER UPDATE OF details ON activity_log BEGIN
+            INSERT INTO activity_log_fts (activity_log_fts, rowid, details) VALUES ('delete', old.id, old.details);
+            INSERT INTO activity_log_fts (rowid, details) VALUES (new.id, new.details);
+        END
+    ''')
+    cur.execute("INSERT INTO activity_log_fts (activity_log_fts) VALUES ('rebuild')")
+
+
+def _migration_4_form_drafts(cur):
+    """Autosaved form drafts, one per form, kept until the form is explicitly saved."""
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS form_drafts (
+            service_user_id INTEGER NOT NULL,
+            form_month_year TEXT NOT NULL,
+            saved_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            saved_by TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (service_user_id, form_month_year),
+            FOREIGN KEY (service_user_id) REFERENCES service_users (id)
+        )
+    ''')
+
+
+def _migration_5_unique_form_month(cur):
+    """Gives forms tables created before UNIQUE(service_user_id, form_month_year) the unique index saves rely on."""
+    for _, index_name, unique, *_ in cur.execute("PRAGMA index_list(forms)").fetchall():
+        columns = [row[2] for row in cur.execute(f"PRAGMA index_info({index_name})").fetchall()]
+        if unique and columns == ["service_user_id", "form_month_year"]:
+            return
+    # The app only ever read and updated the lowest-id row of a duplicated month; keep the others but out of the way
+    cur.execute('''
+        UPDATE forms SET form_month_year = form_month_year || ' (duplicate ' || id || ')'
+        WHERE id NOT IN (SELECT min(id) FROM forms GROUP BY service_user_id, form_month_year)
+    ''')
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_forms_user_month ON forms (service_user_id, form_month_year)")
+
+
+_MONTH_NUMBERS = " ".join(
+    f"WHEN '{name}' THEN '{number:02d}'"
+    for number, name in enumerate(("january", "february", "march", "april", "may", "june", "july",
+                                   "august", "september", "october", "november", "december"), start=1)
+)
+
+
+def _period_sql(month_year):
+    """SQL for the YYYY-MM period of a "March 2025" style value; NULL if it is not one."""
+    return (
+        f"CASE WHEN {month_year} GLOB '* [0-9][0-9][0-9][0-9]' THEN "
+        f"substr({month_year}, -4) || '-' || "
+        f"CASE lower(trim(substr({month_year}, 1, length({month_year}) - 5))) {_MONTH_NUMBERS} END END"
+    )
+
+
+def _migration_6_form_period(cur):
+    """A sortable YYYY-MM period on forms, backfilled from form_month_year and kept in step by triggers."""
+    _add_missing_columns(cur, "forms", [("period", "TEXT")])
+    cur.execute(f"UPDATE forms SET period = {_period_sql('form_month_year')}")
+    # Every writer (the app, imports, scripts) gets the period without having to compute it
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS forms_period_insert AFTER INSERT ON forms BEGIN
+            UPDATE forms SET period = {_period_sql('new.form_month_year')} WHERE id = new.id;
+        END
+    ''')
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS forms_period_update AFTER UPDATE OF form_month_year ON forms BEGIN
+            UPDATE forms SET period = {_period_sql('new.form_month_year')} WHERE id = new.id;
+        END
+    ''')
+    # One resident's forms over a range of months, and every resident's forms for a month
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_forms_user_period ON forms (service_user_id, period)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_forms_period ON forms (period)")
+
+
+def _weight_kg_sql(weight):
+    """SQL for a free-text weight in kg ("70", "70.5kg", "154 lbs", "11st 4lb"); NULL if it does not parse."""
+    text = f"lower(trim({weight}))"
+    # CAST reads the leading number and ignores the rest; what follows "st" is the pounds part
+    pounds = f"CAST(ltrim(substr({text}, instr({text}, 'st') + 2), 'one ') AS REAL)"
+    kg = (
+        f"CASE WHEN instr({text}, 'st') THEN (CAST({text} AS REAL) * 14 + {pounds}) * 0.45359237 "
+        f"WHEN instr({text}, 'lb') THEN CAST({text} AS REAL) * 0.45359237 "
+        f"ELSE CAST({text} AS REAL) END"
+    )
+    return f"CASE WHEN {text} GLOB '[0-9]*' OR {text} GLOB '.[0-9]*' THEN nullif(round({kg}, 1), 0) END"
+
+
+def _bp_sql(bp, part):
+    """SQL for the systolic (part 1) or diastolic (part 2) reading of a "120/80" style bp; NULL if it does not parse."""
+    text = f"trim({bp})"
+    reading = f"substr({text}, 1, instr({text}, '/') - 1)" if part == 1 else f"ltrim(substr({text}, instr({text}, '/') + 1))"
+    return f"CASE WHEN {text} GLOB '[0-9]*/*[0-9]*' THEN nullif(CAST({reading} AS INTEGER), 0) END"
+
+
+def _migration_7_form_vitals(cur):
+    """Numeric weight and blood pressure parsed from the free-text columns, for trends across months."""
+    _add_missing_columns(cur, "forms", [("weight_kg", "REAL"), ("bp_systolic", "INTEGER"), ("bp_diastolic", "INTEGER")])
+    vitals = (f"weight_kg = {_weight_kg_sql('{0}.weight')}, "
+              f"bp_systolic = {_bp_sql('{0}.bp', 1)}, bp_diastolic = {_bp_sql('{0}.bp', 2)}")
+    cur.execute(f"UPDATE forms SET {vitals.format('forms')}")
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS forms_vitals_insert AFTER INSERT ON forms BEGIN
+            UPDATE forms SET {vitals.format('new')} WHERE id = new.id;
+        END
+    ''')
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS forms_vitals_update AFTER UPDATE OF weight, bp ON forms BEGIN
+            UPDATE forms SET {vitals.format('new')} WHERE id = new.id;
+        END
+    ''')
+    # Covers the dashboard's trend query, so it never reads the wide form rows
+    cur.execute('''
+        CREATE INDEX IF NOT EXISTS idx_forms_user_vitals
+        ON forms (service_user_id, period, weight_kg, bp_systolic, bp_diastolic)
+    ''')
+
+
+def _iso_date_sql(date):
+    """SQL for a DD/MM/YYYY date as YYYY-MM-DD, '' for the date buttons' placeholder text, else the value unchanged."""
+    return (
+        f"CASE WHEN {date} GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]' "
+        f"THEN substr({date}, 7, 4) || '-' || substr({date}, 4, 2) || '-' || substr({date}, 1, 2) "
+        f"WHEN {date} IN ('Last Seen', 'Next Due', 'Select Date') THEN '' ELSE {date} END"
+    )
+
+
+def _migration_8_appointment_dates(cur):
+    """Appointment dates stored as sortable YYYY-MM-DD, and an index for finding due appointments."""
+    cur.execute(f"UPDATE appointments SET last_seen = {_iso_date_sql('last_seen')}, next_due = {_iso_date_sql('next_due')}")
+    # Due appointments are looked up per (latest) form, so next_due goes after form_id. Every form
+    # has its own copy of last month's appointments, so an index on next_due alone would walk all the
+    # stale ones. idx_appointments_form_id stays for reading a form's appointments in id order.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_form_next_due ON appointments (form_id, next_due)")
+
+
+def _migration_9_form_drafts_period(cur):
+    """Keys form drafts on (service_user_id, period) like forms, instead of the "March 2025" label."""
+    cur.execute("PRAGMA table_info(form_drafts)")
+    if "period" in {row[1] for row in cur.fetchall()}:
+        return
+    cur.execute('''
+        CREATE TABLE form_drafts_by_period (
+            service_user_id INTEGER NOT NULL,
+            period TEXT NOT NULL,
+            saved_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            saved_by TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (service_user_id, period),
+            FOREIGN KEY (service_user_id) REFERENCES service_users (id)
+        )
+    ''')
+    # Labels that spell the same month differently collapse to one key; the most recently saved draft wins.
+    # A draft whose label is not a month could never be opened again, so it is dropped.
+    cur.execute(f'''
+        INSERT OR REPLACE INTO form_drafts_by_period (service_user_id, period, saved_at, saved_by, data)
+        SELECT service_user_id, {_period_sql('form_month_year')} AS period, saved_at, saved_by, data
+        FROM form_drafts WHERE period IS NOT NULL ORDER BY saved_at
+    ''')
+    cur.execute("DROP TABLE form_drafts")
+    cur.execute("ALTER TABLE form_drafts_by_period RENAME TO form_drafts")
+
+
+MIGRATIONS = [
+    (1, _migration_1_base_schema),
+    (2, _migration_2_secondary_indexes),
+    (3, _migration_3_activity_log_search),
+    (4, _migration_4_form_drafts),
+    (5, _migration_5_unique_form_month),
+    (6, _migration_6_form_period),
+    (7, _migration_7_form_vitals),
+    (8, _migration_8_appointment_dates),
+    (9, _migration_9_form_drafts_period),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version():
+    return get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+
+def initialize_db():
+    """Creates the database if needed and applies any pending migrations.
+
+    On a database that is already current this is a single PRAGMA read.
+    """
+    version = get_schema_version()
+    if version >= SCHEMA_VERSION:
+        return
 
-# Initialize the database when the program starts
-initialize_db()
+    apply_journal_mode()
+    with transaction() as cur:
+        for number, migration in MIGRATIONS:
+            if number > version:
+                migration(cur)
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
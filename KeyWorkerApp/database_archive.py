@@ -0,0 +1,276 @@
+"""Full-database export to a portable archive, and restore from one.
+
+An archive is a zip file holding one JSON Lines member per table (one JSON
+array per row) and a manifest.json with the archive format version, the
+schema version, the CREATE statements and each table's columns, row count
+and SHA-256. Export first takes a consistent snapshot with SQLite's online
+backup API, so the app can keep running, then streams each table out of the
+snapshot; time grows linearly with the amount of data. Restore rebuilds the
+database in a scratch file and copies it over the live one with the backup
+API, then applies any migrations the archive predates. Used by the
+supervisor's "Export / Restore Data" button and from the command line:
+
+    python database_archive.py export C:\\Backups\\alyson_house_2025-03-01.zip
+    python database_archive.py restore C:\\Backups\\alyson_house_2025-03-01.zip
+"""
+import argparse
+import base64
+import datetime
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import zipfile
+
+import audit_writer
+import database
+import database_utils as db_manager
+import db_connection
+import form_cache
+from db_connection import get_connection
+
+ARCHIVE_FORMAT = "keyworker-database-archive"
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+# Rows are handed to executemany in batches of this size on restore
+RESTORE_BATCH_SIZE = 5000
+
+
+class ArchiveError(Exception):
+    """The file is not an archive this version of the app can restore."""
+
+
+def _encode_value(value):
+    # BLOBs are the only values JSON cannot carry as they are
+    if isinstance(value, bytes):
+        return {"base64": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"cannot archive {type(value).__name__} values")
+
+
+def _decode_row(row):
+    return [base64.b64decode(value["base64"]) if type(value) is dict else value for value in row]
+
+
+def _schema_objects(con):
+    """Returns (objects to recreate, tables to copy). FTS shadow tables and SQLite's own tables are left out;
+    sqlite_sequence is copied so AUTOINCREMENT ids carry on where they were."""
+    rows = con.execute("SELECT type, name, tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY rowid").fetchall()
+    virtual = [name for kind, name, _, sql in rows if kind == "table" and sql.upper().startswith("CREATE VIRTUAL TABLE")]
+    objects = [{"type": kind, "name": name, "tbl_name": tbl_name, "sql": sql} for kind, name, tbl_name, sql in rows
+               if not name.startswith("sqlite_") and not any(name.startswith(f"{table}_") and kind == "table" for table in virtual)]
+    tables = [item["name"] for item in objects if item["type"] == "table" and item["name"] not in virtual]
+    if any(name == "sqlite_sequence" for _, name, _, _ in rows):
+        tables.append("sqlite_sequence")
+    return objects, tables
+
+
+def _snapshot(folder):
+    """Copies the live database into `folder` with the backup API and returns a connection to the copy."""
+    snapshot = sqlite3.connect(os.path.join(folder, "snapshot.db"))
+    source = sqlite3.connect(db_connection.DB_PATH)
+    try:
+        # One step, so the copy is of a single point in time; under WAL writers carry on meanwhile
+        source.backup(snapshot)
+    finally:
+        source.close()
+    return snapshot
+
+
+def export_archive(path, progress=None):
+    """Writes the whole database to a new archive at `path` and returns its manifest.
+
+    `progress` is called as progress(table_name, rows_written) after each table.
+    """
+    folder = tempfile.mkdtemp(prefix="keyworker_export_")
+    tmp_path = path + ".tmp"
+    try:
+        snapshot = _snapshot(folder)
+        try:
+            objects, tables = _schema_objects(snapshot)
+            manifest = {
+                "format": ARCHIVE_FORMAT,
+                "format_version": FORMAT_VERSION,
+                "schema_version": snapshot.execute("PRAGMA user_version").fetchone()[0],
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "objects": objects,
+                "tables": [],
+            }
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for table in tables:
+                    manifest["tables"].append(_export_table(snapshot, archive, table))
+                    if progress:
+                        progress(table, manifest["tables"][-1]["rows"])
+                archive.writestr(MANIFEST_FILE, json.dumps(manifest, indent=1))
+        finally:
+            snapshot.close()
+        os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return manifest
+
+
+def _export_table(snapshot, archive, table):
+    cur = snapshot.execute(f'SELECT * FROM "{table}"')
+    columns = [column[0] for column in cur.description]
+    member = f"tables/{table}.jsonl"
+    digest = hashlib.sha256()
+    rows = 0
+    # Streams rows from the cursor into the compressed member; nothing is held in memory but the current row
+    with archive.open(member, "w", force_zip64=True) as raw:
+        for row in cur:
+            line = (json.dumps(row, ensure_ascii=False, separators=(",", ":"), default=_encode_value) + "\n").encode("utf-8")
+            raw.write(line)
+            digest.update(line)
+            rows += 1
+    return {"name": table, "file": member, "columns": columns, "rows": rows, "sha256": digest.hexdigest()}
+
+
+def read_manifest(path):
+    """Returns the manifest of the archive at `path`, raising ArchiveError if it cannot be restored here."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read(MANIFEST_FILE))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        raise ArchiveError(f"{os.path.basename(path)} is not a database archive ({e})") from None
+    if manifest.get("format") != ARCHIVE_FORMAT:
+        raise ArchiveError(f"{os.path.basename(path)} is not a database archive")
+    if manifest.get("format_version", 0) > FORMAT_VERSION:
+        raise ArchiveError("the archive was made by a newer version of the app (archive format "
+                           f"{manifest['format_version']}, this app reads up to {FORMAT_VERSION})")
+    if manifest.get("schema_version", 0) > database.SCHEMA_VERSION:
+        raise ArchiveError("the archive was made by a newer version of the app (schema "
+                           f"{manifest['schema_version']}, this app knows up to {database.SCHEMA_VERSION})")
+    return manifest
+
+
+def _rows(archive, table):
+    """Yields a table's decoded rows while checking the member against its manifest checksum."""
+    digest = hashlib.sha256()
+    with archive.open(table["file"]) as raw:
+        for line in io.BufferedReader(raw):
+            digest.update(line)
+            yield _decode_row(json.loads(line))
+    if digest.hexdigest() != table["sha256"]:
+        raise ArchiveError(f"{table['file']} is damaged (checksum mismatch)")
+
+
+def _build_database(archive, manifest, path, page_size, progress=None):
+    con = sqlite3.connect(path, isolation_level=None)
+    try:
+        # A scratch file that is thrown away on failure needs no journal; the page size must match for the backup
+        con.execute(f"PRAGMA page_size = {page_size}")
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        con.execute("BEGIN")
+        objects = manifest["objects"]
+        virtual = [item for item in objects if item["sql"].upper().startswith("CREATE VIRTUAL TABLE")]
+        # Tables first, then rows, then indexes and triggers, so triggers do not fire on restored rows
+        for item in objects:
+            if item["type"] == "table" and item not in virtual:
+                con.execute(item["sql"])
+        for table in manifest["tables"]:
+            columns = ", ".join(f'"{column}"' for column in table["columns"])
+            sql = f'INSERT INTO "{table["name"]}" ({columns}) VALUES ({", ".join("?" * len(table["columns"]))})'
+            if table["name"] == "sqlite_sequence":
+                # Inserting the other tables' rows has already filled it in; the archived counters replace those
+                con.execute("DELETE FROM sqlite_sequence")
+            batch = []
+            for row in _rows(archive, table):
+                batch.append(row)
+                if len(batch) >= RESTORE_BATCH_SIZE:
+                    con.executemany(sql, batch)
+                    batch.clear()
+            con.executemany(sql, batch)
+            if progress:
+                progress(table["name"], table["rows"])
+        for item in virtual:
+            con.execute(item["sql"])
+            # External-content full-text indexes are derived from their table, so they are rebuilt rather than archived
+            con.execute(f'INSERT INTO "{item["name"]}" ("{item["name"]}") VALUES (\'rebuild\')')
+        for item in objects:
+            if item["type"] != "table":
+                con.execute(item["sql"])
+        con.execute(f"PRAGMA user_version = {int(manifest['schema_version'])}")
+        con.execute("COMMIT")
+        problem = con.execute("PRAGMA quick_check").fetchone()[0]
+        if problem != "ok":
+            raise ArchiveError(f"the restored database failed its integrity check: {problem}")
+    finally:
+        con.close()
+
+
+def restore_archive(path, progress=None):
+    """Replaces the whole live database with the contents of the archive at `path` and returns its manifest.
+
+    The archive is rebuilt and checked in a scratch file first, so a damaged
+    archive leaves the live database untouched. Raises ArchiveError if the
+    archive cannot be restored.
+    """
+    manifest = read_manifest(path)
+    # Anything still queued belongs to the database being replaced; write it now rather than into the restored one
+    audit_writer.flush()
+    folder = tempfile.mkdtemp(prefix="keyworker_restore_")
+    try:
+        scratch_path = os.path.join(folder, "restore.db")
+        live = get_connection()
+        page_size = live.execute("PRAGMA page_size").fetchone()[0]
+        with zipfile.ZipFile(path) as archive:
+            _build_database(archive, manifest, scratch_path, page_size, progress)
+        scratch = sqlite3.connect(scratch_path)
+        try:
+            scratch.backup(live)
+        finally:
+            scratch.close()
+    except (KeyError, ValueError, zipfile.BadZipFile) as e:
+        raise ArchiveError(f"{os.path.basename(path)} is damaged ({e})") from None
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    # Other threads' connections still hold the old file's schema and state; they reconnect on next use
+    db_connection.close_all()
+    db_manager._fts_available.pop(db_connection.DB_PATH, None)
+    # The restored file keeps the scratch file's journal mode; put back the configured one, then migrate
+    db_connection.apply_journal_mode()
+    database.initialize_db()
+    form_cache.clear()
+    return manifest
+
+
+def describe_manifest(manifest):
+    """A short summary of an archive's contents for messages and the activity log."""
+    counts = {table["name"]: table["rows"] for table in manifest["tables"]}
+    return (f"{counts.get('service_users', 0)} service user(s), {counts.get('forms', 0)} form(s), "
+            f"{counts.get('appointments', 0)} appointment(s), {counts.get('activity_log', 0)} log entries "
+            f"(schema {manifest['schema_version']}, created {manifest['created']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the whole database to a portable archive, or restore it from one.")
+    parser.add_argument("action", choices=["export", "restore"])
+    parser.add_argument("path", help="The archive (.zip) to write or read")
+    args = parser.parse_args(argv)
+
+    database.initialize_db()
+    progress = lambda table, rows: print(f"{table}: {rows} rows")
+    try:
+        if args.action == "export":
+            manifest = export_archive(args.path, progress)
+            print(f"Wrote {os.path.abspath(args.path)}: {describe_manifest(manifest)}")
+            db_manager.log_activity("cli", "EXPORT DATABASE", f"Exported the database to {os.path.basename(args.path)}")
+        else:
+            manifest = restore_archive(args.path, progress)
+            print(f"Restored {os.path.abspath(args.path)}: {describe_manifest(manifest)}")
+            db_manager.log_activity("cli", "RESTORE DATABASE", f"Restored the database from {os.path.basename(args.path)}")
+    except (OSError, sqlite3.Error, ArchiveError) as e:
+        print(f"Could not {args.action} {args.path}: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,81 +1,165 @@
-import os
+import datetime
 import hashlib
 import sqlite3
-
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alyson_house.db')
+import threading
+from functools import lru_cache
+from itertools import groupby
+import audit_writer
+import db_connection
+import form_cache
+from db_connection import get_connection, transaction
 
 def log_activity(user, action, details=""):
+    # In the app the background writer batches entries off the Tk thread; scripts without it write directly
+    if audit_writer.log(user, action, details):
+        return
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("INSERT INTO activity_log (user, action, details) VALUES (?, ?, ?)", (user, action, details))
-        con.commit()
-        con.close()
+        with transaction() as cur:
+            cur.execute("INSERT INTO activity_log (user, action, details) VALUES (?, ?, ?)", (user, action, details))
     except sqlite3.Error as e:
         print(f"Database error while logging activity: {e}")
 
 def get_activity_log():
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("SELECT timestamp, user, action, details FROM activity_log ORDER BY timestamp DESC")
-        logs = cur.fetchall()
-        con.close()
-        return logs
+        cur = get_connection().execute("SELECT timestamp, user, action, details FROM activity_log ORDER BY timestamp DESC")
+        return cur.fetchall()
+    except sqlite3.Error as e:
+        print(f"Database error getting activity log: {e}")
+        return []
+
+FTS_MAX_PREFIX = 4  # longest prefix covered by the activity_log_fts prefix index
+
+def _fts_quote(word):
+    return '"' + word.replace('"', '""') + '"'
+
+def _fts_match_query(text):
+    """Turns free text into an FTS5 query: every word must match, the last one (still being typed) as a prefix.
+
+    Returns (match, like). A prefix longer than the prefix index would make FTS5
+    merge every matching row before it can return the newest page, so it is cut
+    to FTS_MAX_PREFIX characters and `like` holds a LIKE pattern that narrows
+    the rows back down to the whole word.
+    """
+    *complete, last = text.split()
+    like = None
+    if len(last) > FTS_MAX_PREFIX:
+        like = f"%{last}%"
+        last = last[:FTS_MAX_PREFIX]
+    terms = [_fts_quote(word) for word in complete]
+    terms.append(_fts_quote(last) + "*")
+    return " ".join(terms), like
+
+_fts_available = {}
+
+def _has_activity_log_fts(con):
+    # The FTS table is optional: it is skipped by the migration when SQLite lacks FTS5
+    if db_connection.DB_PATH not in _fts_available:
+        row = con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activity_log_fts'").fetchone()
+        _fts_available[db_connection.DB_PATH] = row is not None
+    return _fts_available[db_connection.DB_PATH]
+
+def get_activity_log_page(before=None, limit=200, user=None, action=None, date_from=None, date_to=None, text=None):
+    """Returns up to `limit` log entries older than `before`, newest first.
+
+    `before` is the (timestamp, id) of the last entry already shown, or None for
+    the first page. Keyset paging keeps every page an index range read, however
+    deep into the log the viewer scrolls. Rows are (id, timestamp, user, action, details).
+
+    Optional filters: exact `user` and `action`, an inclusive `date_from`/`date_to`
+    range as 'YYYY-MM-DD', and `text` searched in details through the FTS5 index.
+    Text searches are ordered by id, which follows insertion order.
+    """
+    where, params = [], []
+    if user:
+        where.append("l.user = ?"); params.append(user)
+    if action:
+        where.append("l.action = ?"); params.append(action)
+    if date_from:
+        where.append("l.timestamp >= ?"); params.append(date_from)
+    if date_to:
+        where.append("l.timestamp < date(?, '+1 day')"); params.append(date_to)
+
+    try:
+        con = get_connection()
+        if text and text.strip() and _has_activity_log_fts(con):
+            # Drive the query from the FTS index so common words still stop after one page
+            match, like = _fts_match_query(text)
+            where.insert(0, "activity_log_fts MATCH ?"); params.insert(0, match)
+            if like:
+                where.append("l.details LIKE ?"); params.append(like)
+            if before is not None:
+                where.append("f.rowid < ?"); params.append(before[1])
+            sql = ("SELECT l.id, l.timestamp, l.user, l.action, l.details FROM activity_log_fts f "
+                   "JOIN activity_log l ON l.id = f.rowid "
+                   f"WHERE {' AND '.join(where)} ORDER BY f.rowid DESC LIMIT ?")
+        else:
+            if text and text.strip():
+                where.append("l.details LIKE ?"); params.append(f"%{text.strip()}%")
+            if before is not None:
+                where.append("(l.timestamp, l.id) < (?, ?)"); params.extend(before)
+            where_clause = f"WHERE {' AND '.join(where)} " if where else ""
+            sql = ("SELECT l.id, l.timestamp, l.user, l.action, l.details FROM activity_log l "
+                   f"{where_clause}ORDER BY l.timestamp DESC, l.id DESC LIMIT ?")
+        return con.execute(sql, (*params, limit)).fetchall()
     except sqlite3.Error as e:
         print(f"Database error getting activity log: {e}")
         return []
 
+def get_activity_log_filter_values(column):
+    """Distinct users or actions in the log, for the filter dropdowns.
+
+    Walks the (column, timestamp) index one value at a time instead of reading
+    every row, so it stays fast on a multi-million-row log.
+    """
+    if column not in ("user", "action"):
+        raise ValueError(f"Cannot list values for column {column!r}")
+    try:
+        cur = get_connection().execute(f"""
+            WITH RECURSIVE vals(v) AS (
+                SELECT MIN({column}) FROM activity_log
+                UNION ALL
+                SELECT (SELECT MIN({column}) FROM activity_log WHERE {column} > vals.v) FROM vals WHERE vals.v IS NOT NULL
+            )
+            SELECT v FROM vals WHERE v IS NOT NULL
+        """)
+        return [row[0] for row in cur.fetchall()]
+    except sqlite3.Error as e:
+        print(f"Database error getting activity log filters: {e}")
+        return []
+
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 def verify_user(username, password):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT id, username, password_hash, role, first_login FROM users WHERE username = ?", (username,))
+    cur = get_connection().execute("SELECT id, username, password_hash, role, first_login FROM users WHERE username = ?", (username,))
     result = cur.fetchone()
-    con.close()
     if result and result[2] == hash_password(password):
         return {"id": result[0], "username": result[1], "role": result[3], "first_login": result[4]}
     return None
 
 def get_all_app_users():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT id, username, role FROM users ORDER BY username")
-    users = cur.fetchall()
-    con.close()
-    return users
+    cur = get_connection().execute("SELECT id, username, role FROM users ORDER BY username")
+    return cur.fetchall()
 
 def add_app_user(username, password, role):
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        # New users always start with first_login = 1
-        cur.execute("INSERT INTO users (username, password_hash, role, first_login) VALUES (?, ?, ?, 1)", (username, hash_password(password), role))
-        con.commit()
-        con.close()
+        with transaction() as cur:
+            # New users always start with first_login = 1
+            cur.execute("INSERT INTO users (username, password_hash, role, first_login) VALUES (?, ?, ?, 1)", (username, hash_password(password), role))
         return True
     except sqlite3.IntegrityError:
-        con.close()
         return False
 
 def delete_app_user(user_id):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("DELETE FROM users WHERE id = ?", (user_id,))
-    con.commit()
-    con.close()
+    with transaction() as cur:
+        cur.execute("DELETE FROM users WHERE id = ?", (user_id,))
 
 def reset_app_user_password(user_id, new_password):
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
         new_password_hash = hash_password(new_password)
-        # When resetting, force user to change password on next login
-        cur.execute("UPDATE users SET password_hash = ?, first_login = 1 WHERE id = ?", (new_password_hash, user_id))
-        con.commit()
-        con.close()
+        with transaction() as cur:
+            # When resetting, force user to change password on next login
+            cur.execute("UPDATE users SET password_hash = ?, first_login = 1 WHERE id = ?", (new_password_hash, user_id))
         return True
     except sqlite3.Error as e:
         print(f"Database error resetting password: {e}")
@@ -84,12 +168,9 @@ def reset_app_user_password(user_id, new_password):
 def change_user_password(user_id, new_password):
     """Changes a user's password and sets their first_login flag to 0."""
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
         new_password_hash = hash_password(new_password)
-        cur.execute("UPDATE users SET password_hash = ?, first_login = 0 WHERE id = ?", (new_password_hash, user_id))
-        con.commit()
-        con.close()
+        with transaction() as cur:
+            cur.execute("UPDATE users SET password_hash = ?, first_login = 0 WHERE id = ?", (new_password_hash, user_id))
         return True
     except sqlite3.Error as e:
         print(f"Database error changing password: {e}")
@@ -103,23 +184,15 @@ def add_service_user(name, dob, performed_by):
 
 def add_service_user_db(name, dob):
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES (?, ?)", (name, dob))
-        con.commit()
-        con.close()
+        with transaction() as cur:
+            cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES (?, ?)", (name, dob))
         return True
     except sqlite3.IntegrityError:
-        con.close()
         return False
 
 def get_all_service_users():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT id, name, date_of_birth FROM service_users ORDER BY name")
-    users = cur.fetchall()
-    con.close()
-    return users
+    cur = get_connection().execute("SELECT id, name, date_of_birth FROM service_users ORDER BY name")
+    return cur.fetchall()
 
 def update_service_user(user_id, new_name, new_dob, performed_by):
     if update_service_user_db(user_id, new_name, new_dob):
@@ -129,45 +202,179 @@ def update_service_user(user_id, new_name, new_dob, performed_by):
 
 def update_service_user_db(user_id, new_name, new_dob):
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("UPDATE service_users SET name = ?, date_of_birth = ? WHERE id = ?", (new_name, new_dob, user_id))
-        con.commit()
-        con.close()
+        with transaction() as cur:
+            cur.execute("UPDATE service_users SET name = ?, date_of_birth = ? WHERE id = ?", (new_name, new_dob, user_id))
         return True
     except sqlite3.IntegrityError:
-        con.close()
         return False
 
 def delete_service_user(user_id, performed_by):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT name FROM service_users WHERE id = ?", (user_id,))
-    user_to_delete = cur.fetchone()
+    with transaction() as cur:
+        cur.execute("SELECT name FROM service_users WHERE id = ?", (user_id,))
+        user_to_delete = cur.fetchone()
+        if user_to_delete:
+            cur.execute("DELETE FROM forms WHERE service_user_id = ?", (user_id,))
+            cur.execute("DELETE FROM form_drafts WHERE service_user_id = ?", (user_id,))
+            cur.execute("DELETE FROM service_users WHERE id = ?", (user_id,))
+    form_cache.invalidate_matching(lambda key, value: key[0] == user_id)
     if user_to_delete:
         user_name = user_to_delete[0]
-        cur.execute("DELETE FROM forms WHERE service_user_id = ?", (user_id,))
-        cur.execute("DELETE FROM service_users WHERE id = ?", (user_id,))
-        con.commit()
         log_activity(performed_by, "DELETE SERVICE USER", f"Deleted: {user_name} (ID: {user_id})")
-    con.close()
 
-def get_form_data(service_user_id, form_month_year):
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row 
-    cur = con.cursor()
-    cur.execute("SELECT * FROM forms WHERE service_user_id = ? AND form_month_year = ?", (service_user_id, form_month_year))
+MONTH_NAMES = ("January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December")
+
+def form_period(form_month_year):
+    """Returns the YYYY-MM period for a "March 2025" style form month, or None if it is not one."""
+    month, _, year = form_month_year.strip().rpartition(" ")
+    month = month.strip().capitalize()
+    if month not in MONTH_NAMES or not (len(year) == 4 and year.isdigit()):
+        return None
+    return f"{year}-{MONTH_NAMES.index(month) + 1:02d}"
+
+def period_label(period):
+    """Returns the "March 2025" form month for a YYYY-MM period."""
+    return f"{MONTH_NAMES[int(period[5:7]) - 1]} {period[:4]}"
+
+def shift_period(period, months):
+    """Returns the YYYY-MM period `months` after (or before, if negative) `period`."""
+    index = int(period[:4]) * 12 + int(period[5:7]) - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+# Matches the YYYY-MM-DD dates appointments are stored as; older free-text values do not
+ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+def iso_date(text):
+    """Returns a DD/MM/YYYY date (as the date pickers show it) as YYYY-MM-DD; blanks and anything
+    that is not a date, ISO dates included, are returned unchanged."""
+    try:
+        return datetime.datetime.strptime(text, "%d/%m/%Y").date().isoformat()
+    except (ValueError, TypeError):
+        return text
+
+def display_date(value):
+    """Returns a YYYY-MM-DD date as DD/MM/YYYY; anything else is returned unchanged."""
+    try:
+        return datetime.date.fromisoformat(value).strftime("%d/%m/%Y") if len(value) == 10 else value
+    except (ValueError, TypeError):
+        return value
+
+def _get_form_by_period(service_user_id, period):
+    cur = get_connection().cursor()
+    cur.row_factory = sqlite3.Row
+    cur.execute("SELECT * FROM forms WHERE service_user_id = ? AND period = ?", (service_user_id, period))
     form_data = cur.fetchone()
-    con.close()
     return dict(form_data) if form_data else None
 
+def get_form_data(service_user_id, form_month_year):
+    period = form_period(form_month_year)
+    return _get_form_by_period(service_user_id, period) if period else None
+
+def get_service_user_forms(service_user_id, period_from="0000-01", period_to="9999-12"):
+    """Returns a service user's forms from `period_from` to `period_to` (YYYY-MM, inclusive), oldest first."""
+    cur = get_connection().cursor()
+    cur.row_factory = sqlite3.Row
+    cur.execute(
+        "SELECT * FROM forms WHERE service_user_id = ? AND period BETWEEN ? AND ? ORDER BY period",
+        (service_user_id, period_from, period_to)
+    )
+    return [dict(row) for row in cur.fetchall()]
+
+def get_vitals_trend(service_user_id, period_from, period_to):
+    """Returns (period, weight_kg, bp_systolic, bp_diastolic) for each of a service user's forms
+    from `period_from` to `period_to` (YYYY-MM, inclusive), oldest first.
+
+    A single range scan of the covering idx_forms_user_vitals index. Forms with
+    neither a weight nor a BP that parsed from their free text are skipped; a
+    form with only one of them has None for the other.
+    """
+    try:
+        cur = get_connection().execute(
+            "SELECT period, weight_kg, bp_systolic, bp_diastolic FROM forms "
+            "WHERE service_user_id = ? AND period BETWEEN ? AND ? "
+            "AND coalesce(weight_kg, bp_systolic, bp_diastolic) IS NOT NULL ORDER BY period",
+            (service_user_id, period_from, period_to)
+        )
+        return cur.fetchall()
+    except sqlite3.Error as e:
+        print(f"Database error reading weight and BP trend: {e}")
+        return []
+
 def get_appointments(form_id):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT name, last_seen, next_due, booked FROM appointments WHERE form_id = ?", (form_id,))
-    appointments = cur.fetchall()
-    con.close()
-    return appointments
+    cur = get_connection().execute("SELECT name, last_seen, next_due, booked FROM appointments WHERE form_id = ? ORDER BY id", (form_id,))
+    return cur.fetchall()
+
+def get_due_appointments(due_to, due_from="0000-01-01"):
+    """Returns the appointments on each service user's latest form whose next_due is from `due_from`
+    to `due_to` (YYYY-MM-DD, inclusive), soonest first, as (service_user_id, service user name,
+    form_month_year, name, last_seen, next_due, booked).
+
+    Only next_due values that are YYYY-MM-DD dates are returned: free text left
+    unconverted by the date migration would otherwise sort into the range.
+
+    Earlier forms hold last month's copies of the same appointments, so only the
+    latest form counts. That is one index seek per service user, and each latest
+    form's appointments are read through the (form_id, next_due) index.
+    """
+    try:
+        # MATERIALIZED stops the planner flattening the CTE and scanning every appointment instead
+        rows = get_connection().execute('''
+            WITH latest AS MATERIALIZED (
+                SELECT su.id, su.name, (SELECT max(period) FROM forms WHERE service_user_id = su.id) AS period
+                FROM service_users su
+            )
+            SELECT latest.id, latest.name, f.form_month_year, a.name, a.last_seen, a.next_due, a.booked
+            FROM latest
+            JOIN forms f ON f.service_user_id = latest.id AND f.period = latest.period
+            JOIN appointments a ON a.form_id = f.id AND a.next_due BETWEEN ? AND ? AND a.next_due GLOB ?
+        ''', (due_from, due_to, ISO_DATE_GLOB)).fetchall()
+    except sqlite3.Error as e:
+        print(f"Database error reading due appointments: {e}")
+        return []
+    # A few rows at most per service user; sorting here avoids a temp B-tree in the query
+    return sorted(rows, key=lambda row: (row[5], row[1].lower(), row[3] or ""))
+
+def _load_form_with_appointments(service_user_id, period):
+    form_data = _get_form_by_period(service_user_id, period)
+    return form_data, (get_appointments(form_data["id"]) if form_data else [])
+
+_seen_data_version = threading.local()
+
+def _check_form_cache():
+    """Empties the form cache if anything was committed since this thread's connection last looked.
+
+    PRAGMA data_version only changes for commits made through other connections,
+    which covers other sessions on the shared database and this process's other
+    threads. A connection seen for the first time cannot tell what it missed, so
+    that clears the cache too.
+    """
+    con = get_connection()
+    version = con.execute("PRAGMA data_version").fetchone()[0]
+    if getattr(_seen_data_version, "con", None) is not con or _seen_data_version.version != version:
+        form_cache.clear()
+        _seen_data_version.con, _seen_data_version.version = con, version
+
+def get_form_with_appointments(service_user_id, form_month_year, fresh=False):
+    """Returns (form row dict or None, appointment tuples), read through the form cache.
+
+    Pass `fresh` when opening the form for editing: it is then always read from
+    the database, since saving a form believed missing would overwrite one another
+    session has since created.
+    """
+    period = form_period(form_month_year)
+    if period is None:
+        return None, []
+    return form_cache.get((service_user_id, period), _load_form_with_appointments, validate=_check_form_cache, refresh=fresh)
+
+def prefetch_adjacent_forms(service_user_id, month, year, months=1):
+    """Starts loading the forms up to `months` either side of `month` `year` into the form cache in the background.
+
+    Returns the prefetch's Future.
+    """
+    period = form_period(f"{month} {year}")
+    offsets = sorted(range(-months, months + 1), key=abs)[1:]
+    keys = [(service_user_id, shift_period(period, offset)) for offset in offsets]
+    return form_cache.prefetch(keys, _load_form_with_appointments, validate=_check_form_cache)
 
 def save_form_data(form_data_dict, performed_by):
     form_id = save_form_data_db(form_data_dict)
@@ -176,56 +383,159 @@ def save_form_data(form_data_dict, performed_by):
         log_activity(performed_by, "SAVE FORM", details)
     return form_id
 
-def save_form_data_db(form_data_dict):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    columns = [
-        'service_user_id', 'form_month_year', 'key_worker_name', 'session_datetime',
-        'weight', 'bp', 'weight_bp_comments', 'health_concerns', 'health_concerns_comments',
-        'nails_check', 'nails_date', 'nails_comments', 'hair_check', 'hair_date', 'hair_comments',
-        'mar_sheets_check', 'mar_sheets_comments', 'finance_cash_box', 'finance_top_up', 'finance_take_out',
-        'finance_diary_datetime', 'finance_diary_staff', 'shop_q1_toiletries', 'shop_q1_comments', 
-        'shop_q2_clothes', 'shop_q2_comments', 'shop_q3_personal_items', 'shop_q3_comments',
-        'caredocs_contacts', 'caredocs_careplan', 'caredocs_meds',
-        'caredocs_bodymap', 'caredocs_charts', 'health_plan_file', 'actions_required',
-        'family_comm_made', 'family_comm_datetime', 'family_comm_reason', 'family_comm_issues',
-        'current_goal', 'last_goal_progress', 'feeling_response', 'happy_response', 'other_notes',
-        'feeling_icons_selected', 'care_icons_selected'
-    ]
-    cur.execute(
-        "SELECT id FROM forms WHERE service_user_id = ? AND form_month_year = ?",
-        (form_data_dict['service_user_id'], form_data_dict['form_month_year'])
+def save_complete_form(form_data_dict, appointments_list, performed_by):
+    """Saves the form row, replaces its appointments, drops its draft and logs the save in one transaction.
+
+    Either all of it lands or none does. Returns the form id, or None on a database error.
+    """
+    try:
+        with transaction() as cur:
+            form_id = save_form_data_db(form_data_dict)
+            save_appointments(form_id, appointments_list)
+            _delete_form_draft(cur, form_data_dict)
+            details = f"Saved form for {form_data_dict.get('service_user_name')} for month {form_data_dict.get('form_month_year')}"
+            cur.execute("INSERT INTO activity_log (user, action, details) VALUES (?, ?, ?)", (performed_by, "SAVE FORM", details))
+        return form_id
+    except sqlite3.Error as e:
+        print(f"Database error saving form: {e}")
+        return None
+    finally:
+        # After the commit, so a concurrent load cannot cache the row as it was before it
+        _invalidate_cached_form(form_data_dict)
+
+def save_form_changes(form_id, form_data_dict, changed_columns, appointments_list, performed_by):
+    """Writes only what changed on a saved form and logs which fields those were, in one transaction.
+
+    `changed_columns` are the FORM_COLUMNS to update from `form_data_dict`;
+    `appointments_list` is the form's new appointments, or None if they did not
+    change. Nothing is written, not even the audit entry, when neither did.
+    Falls back to save_complete_form if the row has gone. Returns the form id,
+    or None on a database error.
+    """
+    if not changed_columns and appointments_list is None:
+        return form_id
+    try:
+        with transaction() as cur:
+            row_gone = False
+            if changed_columns:
+                cur.execute(_form_update_sql(tuple(changed_columns)), [form_data_dict[col] for col in changed_columns] + [form_id])
+                row_gone = cur.rowcount == 0
+            if not row_gone:
+                if appointments_list is not None:
+                    _update_appointments(cur, form_id, appointments_list)
+                _delete_form_draft(cur, form_data_dict)
+                changed = list(changed_columns) + (["appointments"] if appointments_list is not None else [])
+                details = (f"Saved form for {form_data_dict.get('service_user_name')} for month {form_data_dict.get('form_month_year')}"
+                           f" (changed: {', '.join(changed)})")
+                cur.execute("INSERT INTO activity_log (user, action, details) VALUES (?, ?, ?)", (performed_by, "SAVE FORM", details))
+        if row_gone:
+            return save_complete_form(form_data_dict, appointments_list or [], performed_by)
+        return form_id
+    except sqlite3.Error as e:
+        print(f"Database error saving form: {e}")
+        return None
+    finally:
+        _invalidate_cached_form(form_data_dict)
+
+def _invalidate_cached_form(form_data_dict):
+    form_cache.invalidate((form_data_dict.get('service_user_id'), form_period(form_data_dict.get('form_month_year') or "")))
+
+def _delete_form_draft(cur, form_data_dict):
+    # An explicit save supersedes the form's autosaved draft
+    cur.execute("DELETE FROM form_drafts WHERE service_user_id = ? AND period = ?",
+                (form_data_dict.get('service_user_id'), form_period(form_data_dict.get('form_month_year') or "")))
+
+def _update_appointments(cur, form_id, appointments_list):
+    # Rows are matched by position (id order, as get_appointments returns them); only differing rows are written
+    existing = cur.execute(
+        "SELECT id, name, last_seen, next_due, booked FROM appointments WHERE form_id = ? ORDER BY id", (form_id,)
+    ).fetchall()
+    for (appt_id, *old), new in zip(existing, appointments_list):
+        if tuple(old) != tuple(new):
+            cur.execute("UPDATE appointments SET name = ?, last_seen = ?, next_due = ?, booked = ? WHERE id = ?", (*new, appt_id))
+    if len(existing) > len(appointments_list):
+        cur.executemany("DELETE FROM appointments WHERE id = ?", [(row[0],) for row in existing[len(appointments_list):]])
+    elif len(appointments_list) > len(existing):
+        cur.executemany(
+            "INSERT INTO appointments (form_id, name, last_seen, next_due, booked) VALUES (?, ?, ?, ?, ?)",
+            [(form_id, *appt) for appt in appointments_list[len(existing):]]
+        )
+
+FORM_COLUMNS = (
+    'service_user_id', 'form_month_year', 'key_worker_name', 'session_datetime',
+    'weight', 'bp', 'weight_bp_comments', 'health_concerns', 'health_concerns_comments',
+    'nails_check', 'nails_date', 'nails_comments', 'hair_check', 'hair_date', 'hair_comments',
+    'mar_sheets_check', 'mar_sheets_comments', 'finance_cash_box', 'finance_top_up', 'finance_take_out',
+    'finance_diary_datetime', 'finance_diary_staff', 'shop_q1_toiletries', 'shop_q1_comments',
+    'shop_q2_clothes', 'shop_q2_comments', 'shop_q3_personal_items', 'shop_q3_comments',
+    'caredocs_contacts', 'caredocs_careplan', 'caredocs_meds',
+    'caredocs_bodymap', 'caredocs_charts', 'health_plan_file', 'actions_required',
+    'family_comm_made', 'family_comm_datetime', 'family_comm_reason', 'family_comm_issues',
+    'current_goal', 'last_goal_progress', 'feeling_response', 'happy_response', 'other_notes',
+    'feeling_icons_selected', 'care_icons_selected'
+)
+FORM_KEY_COLUMNS = ('service_user_id', 'form_month_year')
+
+@lru_cache(maxsize=None)
+def _form_upsert_sql(cols, returning=True):
+    """Builds the UPSERT statement for one column set. Cached so the text is
+    identical on every save and sqlite3's statement cache can reuse the
+    prepared statement on the pooled connection."""
+    update_cols = [col for col in cols if col not in FORM_KEY_COLUMNS] or list(FORM_KEY_COLUMNS)
+    return (
+        f"INSERT INTO forms ({', '.join(cols)}) VALUES ({', '.join(['?'] * len(cols))}) "
+        f"ON CONFLICT({', '.join(FORM_KEY_COLUMNS)}) DO UPDATE SET "
+        f"{', '.join(f'{col} = excluded.{col}' for col in update_cols)}"
+        f"{' RETURNING id' if returning else ''}"
     )
-    result = cur.fetchone()
-    existing_form_id = result[0] if result else None
-
-    if existing_form_id:
-        form_id = existing_form_id
-        update_cols = [col for col in columns if col in form_data_dict]
-        set_clause = ", ".join([f"{col} = ?" for col in update_cols])
-        values = [form_data_dict.get(col) for col in update_cols]
-        values.append(form_id)
-        cur.execute(f"UPDATE forms SET {set_clause} WHERE id = ?", values)
-    else:
-        insert_cols = [col for col in columns if col in form_data_dict]
-        placeholders = ", ".join(["?"] * len(insert_cols))
-        cols_clause = ", ".join(insert_cols)
-        values = [form_data_dict.get(col) for col in insert_cols]
-        cur.execute(f"INSERT INTO forms ({cols_clause}) VALUES ({placeholders})", values)
-        form_id = cur.lastrowid
-    
-    con.commit()
-    con.close()
+
+@lru_cache(maxsize=None)
+def _form_update_sql(cols):
+    """UPDATE of just `cols` on one form, cached for the same reason as _form_upsert_sql."""
+    return f"UPDATE forms SET {', '.join(f'{col} = ?' for col in cols)} WHERE id = ?"
+
+def save_form_data_db(form_data_dict):
+    cols = tuple(col for col in FORM_COLUMNS if col in form_data_dict)
+    values = [form_data_dict[col] for col in cols]
+    with transaction() as cur:
+        cur.execute(_form_upsert_sql(cols), values)
+        form_id = cur.fetchone()[0]
+    _invalidate_cached_form(form_data_dict)
     return form_id
 
 def save_appointments(form_id, appointments_list):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("DELETE FROM appointments WHERE form_id = ?", (form_id,))
-    if appointments_list:
+    with transaction() as cur:
+        cur.execute("DELETE FROM appointments WHERE form_id = ?", (form_id,))
+        if appointments_list:
+            cur.executemany(
+                "INSERT INTO appointments (form_id, name, last_seen, next_due, booked) VALUES (?, ?, ?, ?, ?)",
+                [(form_id, *appt) for appt in appointments_list]
+            )
+    form_cache.invalidate_matching(lambda key, value: value[0] is not None and value[0]["id"] == form_id)
+
+def save_form_batch(forms):
+    """Saves many (form_data_dict, appointments_list) pairs in one transaction, for bulk imports.
+
+    Each run of forms with the same columns is one executemany of the UPSERT,
+    and the appointments are replaced with one executemany each for the deletes
+    and the inserts. An appointments_list of None leaves that form's appointments
+    alone; a form listed twice ends up as its later entry, as with separate saves.
+    The form cache is left to the caller, to clear once the batch has committed.
+    """
+    form_columns = lambda pair: tuple(col for col in FORM_COLUMNS if col in pair[0])
+    appointments = {}
+    with transaction() as cur:
+        for cols, group in groupby(forms, key=form_columns):
+            cur.executemany(_form_upsert_sql(cols, returning=False), [[form[col] for col in cols] for form, _ in group])
+        for form, appointments_list in forms:
+            if appointments_list is not None:
+                appointments[(form['service_user_id'], form['form_month_year'])] = appointments_list
+        form_ids = {
+            key: cur.execute("SELECT id FROM forms WHERE service_user_id = ? AND form_month_year = ?", key).fetchone()[0]
+            for key in appointments
+        }
+        cur.executemany("DELETE FROM appointments WHERE form_id = ?", [(form_id,) for form_id in form_ids.values()])
         cur.executemany(
             "INSERT INTO appointments (form_id, name, last_seen, next_due, booked) VALUES (?, ?, ?, ?, ?)",
-            [(form_id, *appt) for appt in appointments_list]
+            [(form_ids[key], *appt) for key, appointments_list in appointments.items() for appt in appointments_list]
         )
-    con.commit()
-    con.close()
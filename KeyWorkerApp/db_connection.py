@@ -0,0 +1,145 @@
+import os
+import sys
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Resolve path to DB next to the EXE when frozen, else next to this file
+def _app_dir():
+    return os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
+
+DB_PATH = os.path.join(_app_dir(), 'alyson_house.db')
+
+# Journal/sync profiles. WAL lets sessions keep reading while another one
+# writes, but it needs shared memory and so must not be used when the database
+# lives on a network share; switch JOURNAL_PROFILE to "rollback" there. The
+# journal mode is stored in the database file, so an existing database only
+# changes mode when apply_journal_mode() runs (initialize_db does this while
+# migrating).
+JOURNAL_PROFILES = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",      # fsync on checkpoint only; still crash-safe in WAL
+        "busy_timeout": 5000,         # ms to wait on a lock before "database is locked"
+        "wal_autocheckpoint": 1000,   # pages; keeps the -wal file bounded while running
+    },
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+JOURNAL_PROFILE = "wal"
+
+# Applied once to every pooled connection when it is opened
+CONNECTION_PRAGMAS = {
+    "cache_size": -8000,      # ~8 MB page cache, kept warm between calls
+    "temp_store": "MEMORY",   # sorts and temp indexes stay off disk
+}
+
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool = []          # every connection handed out, so they can be closed on exit
+_generation = 0     # bumped by close_all() so threads notice their connection is gone
+
+
+def _open_connection():
+    # isolation_level=None puts the connection in autocommit mode; writes are
+    # grouped explicitly through transaction() instead of implicit BEGINs.
+    profile = JOURNAL_PROFILES[JOURNAL_PROFILE]
+    con = sqlite3.connect(DB_PATH, timeout=profile["busy_timeout"] / 1000, isolation_level=None, check_same_thread=False)
+    for name, value in CONNECTION_PRAGMAS.items():
+        con.execute(f"PRAGMA {name} = {value}")
+    # journal_mode is stored in the database file and set by apply_journal_mode()
+    for name, value in profile.items():
+        if name != "journal_mode":
+            con.execute(f"PRAGMA {name} = {value}")
+    with _pool_lock:
+        _pool.append(con)
+    return con
+
+
+def get_connection():
+    """Returns the calling thread's long-lived connection, opening it on first use."""
+    con = getattr(_local, "con", None)
+    if con is None or _local.generation != _generation:
+        con = _open_connection()
+        _local.con = con
+        _local.generation = _generation
+        _local.depth = 0
+    return con
+
+
+@contextmanager
+def transaction():
+    """Runs the enclosed statements in one transaction and yields a cursor.
+
+    Commits on normal exit and rolls back if an exception escapes. Nested
+    calls on the same thread join the outermost transaction, so helpers that
+    write can be composed without committing part-way through.
+    """
+    con = get_connection()
+    cur = con.cursor()
+    if _local.depth:
+        _local.depth += 1
+        try:
+            yield cur
+        finally:
+            _local.depth -= 1
+        return
+
+    con.execute("BEGIN IMMEDIATE")
+    _local.depth = 1
+    try:
+        yield cur
+        con.commit()
+    except BaseException:
+        con.rollback()
+        raise
+    finally:
+        _local.depth = 0
+
+
+def apply_journal_mode():
+    """Switches the database file to the configured journal mode and returns the mode now in effect.
+
+    The mode persists in the file, so this only needs to run once at start-up,
+    outside any transaction.
+    """
+    mode = JOURNAL_PROFILES[JOURNAL_PROFILE]["journal_mode"]
+    return get_connection().execute(f"PRAGMA journal_mode = {mode}").fetchone()[0]
+
+
+def checkpoint(mode="TRUNCATE"):
+    """Copies the WAL back into the main database file. Returns (busy, wal_pages, checkpointed_pages)."""
+    return get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+
+def shutdown():
+    """Exit policy: fold the WAL into the database and truncate it, then close every connection."""
+    if JOURNAL_PROFILES[JOURNAL_PROFILE]["journal_mode"] == "WAL":
+        try:
+            checkpoint("TRUNCATE")
+        except sqlite3.Error as e:
+            print(f"Database error during checkpoint: {e}")
+    close_all()
+
+
+def close_all():
+    """Closes every pooled connection. Threads reconnect lazily on next use."""
+    global _generation
+    with _pool_lock:
+        for con in _pool:
+            try:
+                con.close()
+            except sqlite3.Error:
+                pass
+        _pool.clear()
+        _generation += 1
+
+
+def set_db_path(path):
+    """Points the pool at a different database file (used by scripts and benchmarks)."""
+    global DB_PATH
+    close_all()
+    DB_PATH = path
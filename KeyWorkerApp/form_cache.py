@@ -0,0 +1,117 @@
+"""In-memory LRU cache of forms and their appointments.
+
+Entries are keyed by (service_user_id, YYYY-MM period) and hold whatever the
+loader returned, a missing form included, so flipping back and forth between
+months for one service user reads each month from the database once.
+prefetch() loads keys on a background thread ahead of being asked for.
+
+Writers must call invalidate() (or invalidate_matching()) after changing a
+form. Every invalidation bumps a generation counter, and a load that started
+before an invalidation does not store its result, so a prefetch racing a save
+cannot put the pre-save row back into the cache.
+
+Only writers in this process invalidate, so callers pass a `validate` callable
+that empties the cache when the database changed behind its back (another
+session, another key worker) before an entry is served.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_SIZE = 64
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_generation = 0
+_counters = {"hits": 0, "misses": 0, "prefetched": 0}
+_executor = None
+
+
+def _copy(value):
+    # Entries are form rows (dicts of scalars) and lists of appointment tuples: copying the containers is enough
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    if isinstance(value, (dict, list)):
+        return value.copy()
+    return value
+
+
+def _store(key, value, generation):
+    with _lock:
+        if generation != _generation:
+            return
+        _entries[key] = value
+        _entries.move_to_end(key)
+        while len(_entries) > CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def get(key, loader, validate=None, refresh=False):
+    """Returns loader(*key), from the cache if it is there. Callers get their own copy to modify.
+
+    `validate` runs first and may clear() the cache. With `refresh` the entry
+    is always loaded again (and the cache updated), never served from the cache.
+    """
+    if validate is not None:
+        validate()
+    with _lock:
+        if key in _entries and not refresh:
+            _entries.move_to_end(key)
+            _counters["hits"] += 1
+            return _copy(_entries[key])
+        _counters["misses"] += 1
+        generation = _generation
+    value = loader(*key)
+    _store(key, value, generation)
+    return _copy(value)
+
+
+def _prefetch(keys, loader, validate):
+    if validate is not None:
+        validate()
+    for key in keys:
+        with _lock:
+            if key in _entries:
+                continue
+            generation = _generation
+        _store(key, loader(*key), generation)
+        with _lock:
+            _counters["prefetched"] += 1
+
+
+def prefetch(keys, loader, validate=None):
+    """Loads any of `keys` not already cached on the background prefetch thread. Returns a Future straight away.
+
+    `validate` runs on the prefetch thread before anything is looked up, as for get().
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="form-prefetch")
+    return _executor.submit(_prefetch, list(keys), loader, validate)
+
+
+def invalidate(key):
+    global _generation
+    with _lock:
+        _generation += 1
+        _entries.pop(key, None)
+
+
+def invalidate_matching(predicate):
+    """Drops every entry for which predicate(key, value) is true."""
+    global _generation
+    with _lock:
+        _generation += 1
+        for key in [key for key, value in _entries.items() if predicate(key, value)]:
+            del _entries[key]
+
+
+def clear():
+    invalidate_matching(lambda key, value: True)
+
+
+def stats():
+    """Returns the hit, miss and prefetch counts, the hit rate and the number of cached entries."""
+    with _lock:
+        lookups = _counters["hits"] + _counters["misses"]
+        return dict(_counters, hit_rate=_counters["hits"] / lookups if lookups else 0.0, size=len(_entries))
@@ -0,0 +1,86 @@
+"""Autosaved drafts of key worker forms.
+
+FormWindow hands its current contents to save_draft() shortly after the user
+stops editing. The JSON encoding and the database write happen on a single
+background thread, so typing never waits on the database, and drafts are
+written in the order they were queued. A form has at most one draft, in
+form_drafts, keyed like forms by service user and YYYY-MM period. An explicit save deletes it in the same transaction, so a draft
+that is still there when the form is next opened holds work that was never
+saved (the app crashed or the window was closed) and can be offered back.
+"""
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from db_connection import get_connection, transaction
+
+_UPSERT_SQL = (
+    "INSERT INTO form_drafts (service_user_id, period, saved_at, saved_by, data) "
+    "VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?) "
+    "ON CONFLICT(service_user_id, period) DO UPDATE SET "
+    "saved_at = excluded.saved_at, saved_by = excluded.saved_by, data = excluded.data"
+)
+
+_executor = None
+
+
+def _writer():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="form-drafts")
+    return _executor
+
+
+def _write_draft(service_user_id, period, saved_by, form_data, appointments):
+    try:
+        data = json.dumps({"form": form_data, "appointments": appointments}, ensure_ascii=False)
+        with transaction() as cur:
+            cur.execute(_UPSERT_SQL, (service_user_id, period, saved_by, data))
+    except sqlite3.Error as e:
+        print(f"Database error saving form draft: {e}")
+
+
+def _delete_draft(service_user_id, period):
+    try:
+        with transaction() as cur:
+            cur.execute("DELETE FROM form_drafts WHERE service_user_id = ? AND period = ?", (service_user_id, period))
+    except sqlite3.Error as e:
+        print(f"Database error discarding form draft: {e}")
+
+
+def save_draft(service_user_id, period, saved_by, form_data, appointments):
+    """Queues `form_data` (a forms row as FormWindow saves it) and its appointment tuples as the draft of the
+    service user's form for `period` (YYYY-MM)."""
+    _writer().submit(_write_draft, service_user_id, period, saved_by, dict(form_data), list(appointments))
+
+
+def discard_draft(service_user_id, period):
+    """Queues deletion of the form's draft, after any draft writes already queued."""
+    _writer().submit(_delete_draft, service_user_id, period)
+
+
+def flush():
+    """Waits until every queued draft write and deletion has finished."""
+    if _executor is not None:
+        _executor.submit(lambda: None).result()
+
+
+def get_draft(service_user_id, period):
+    """Returns the form's draft as a dict of 'form', 'appointments', 'saved_at' (UTC) and 'saved_by', or None."""
+    try:
+        row = get_connection().execute(
+            "SELECT saved_at, saved_by, data FROM form_drafts WHERE service_user_id = ? AND period = ?",
+            (service_user_id, period)
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Database error reading form draft: {e}")
+        return None
+    if not row:
+        return None
+    data = json.loads(row[2])
+    return {
+        "form": data["form"],
+        "appointments": [tuple(appt) for appt in data["appointments"]],
+        "saved_at": row[0],
+        "saved_by": row[1],
+    }
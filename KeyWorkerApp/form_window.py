@@ -4,14 +4,62 @@ import datetime
 import database_utils as db_manager
 from CTkMessagebox import CTkMessagebox
 import pdf_generator
-from PIL import Image
-import os
+import icon_assets
+import form_drafts
 
 class FormWindow(ctk.CTkToplevel):
-    def __init__(self, parent, service_user_id, service_user_name, dob, month, year, form_data=None, current_user=None):
+    # How often the window checks on a PDF being built in the background (ms)
+    PDF_POLL_MS = 100
+    # Quiet time after the last edit before the form is autosaved as a draft (ms)
+    AUTOSAVE_DELAY_MS = 1500
+
+    # Fields on the tabs that are only built when first selected: (form data key, widget attribute, kind).
+    # Until a tab is built its values are held as plain data, so loading, clearing and reading
+    # the form work the same whether or not the worker has opened the tab.
+    LAZY_TAB_FIELDS = {
+        "My Finances": [
+            ("finance_cash_box", "finance_cash_box_entry", "entry"),
+            ("finance_top_up", "finance_top_up_switch", "switch"),
+            ("finance_take_out", "finance_take_out_entry", "entry"),
+            ("finance_diary_datetime", "finance_diary_datetime_entry", "entry"),
+            ("finance_diary_staff", "finance_diary_staff_entry", "entry"),
+        ],
+        "Personal Shopping": [
+            ("shop_q1_toiletries", "shop_q1_switch", "switch"),
+            ("shop_q1_comments", "shop_q1_comments", "entry"),
+            ("shop_q2_clothes", "shop_q2_switch", "switch"),
+            ("shop_q2_comments", "shop_q2_comments", "entry"),
+            ("shop_q3_personal_items", "shop_q3_switch", "switch"),
+            ("shop_q3_comments", "shop_q3_comments", "entry"),
+        ],
+        "Support Plans": [
+            ("caredocs_contacts", "caredocs_contacts_switch", "switch"),
+            ("caredocs_careplan", "caredocs_careplan_switch", "switch"),
+            ("caredocs_meds", "caredocs_meds_switch", "switch"),
+            ("caredocs_bodymap", "caredocs_bodymap_switch", "switch"),
+            ("caredocs_charts", "caredocs_charts_switch", "switch"),
+            ("health_plan_file", "health_plan_switch", "switch"),
+            ("actions_required", "actions_required_textbox", "text"),
+            ("family_comm_made", "family_comm_switch", "switch"),
+            ("family_comm_datetime", "family_comm_datetime_entry", "entry"),
+            ("family_comm_reason", "family_comm_reason_textbox", "text"),
+            ("family_comm_issues", "family_comm_issues_textbox", "text"),
+        ],
+        "Goals & Feelings": [
+            ("current_goal", "current_goal_textbox", "text"),
+            ("last_goal_progress", "last_goal_textbox", "text"),
+            ("feeling_response", "feeling_response_textbox", "text"),
+            ("happy_response", "happy_response_textbox", "text"),
+            ("other_notes", "other_notes_textbox", "text"),
+        ],
+    }
+
+    def __init__(self, parent, service_user_id, service_user_name, dob, month, year, form_data=None, current_user=None, pool=None):
         super().__init__(parent)
         self.parent = parent 
         self.current_user = current_user
+        # FormWindowPool this window goes back to when closed, if any
+        self.pool = pool
         
         self.service_user_id = service_user_id
         self.service_user_name = service_user_name
@@ -37,8 +85,26 @@ class FormWindow(ctk.CTkToplevel):
         self.feeling_icon_buttons = []
         self.care_icon_buttons = []
 
+        # Background PDF build in progress, if any, and the after() id polling it
+        self.pdf_job = None
+        self.pdf_poll_id = None
+
+        # Pending autosave after() id, and the form as last written to its draft
+        self.autosave_id = None
+        self.last_draft = None
+        # after() id of a pending "restore draft?" question
+        self.draft_offer_id = None
+
         self.family_comm_reason_placeholder = "If NO... PLEASE STATE REASON:"
         self.family_comm_issues_placeholder = "ISSUES/CONCERNS/ACTIONS:"
+        self.textbox_placeholders = {
+            "family_comm_reason_textbox": self.family_comm_reason_placeholder,
+            "family_comm_issues_textbox": self.family_comm_issues_placeholder,
+        }
+
+        # Tabs in LAZY_TAB_FIELDS that have been built, and the values waiting for those that have not
+        self.built_tabs = set()
+        self.pending_tab_values = {}
 
         self._create_header()
         self._create_tabs()
@@ -46,10 +112,64 @@ class FormWindow(ctk.CTkToplevel):
         
         if self.form_data:
             self._load_form_data(self.form_data)
-        else:
-            self.family_comm_reason_textbox.insert("0.0", self.family_comm_reason_placeholder)
-            self.family_comm_issues_textbox.insert("0.0", self.family_comm_issues_placeholder)
+        self._remember_loaded_form()
+        self._check_for_draft()
+        # Workers often flip to the months either side next; have them cached by then
+        db_manager.prefetch_adjacent_forms(self.service_user_id, self.month, self.year)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        # Key and click events from every widget in the window reach these bindings
+        self.bind("<KeyRelease>", self._schedule_autosave, add="+")
+        self.bind("<ButtonRelease-1>", self._schedule_autosave, add="+")
 
+    def reopen(self, service_user_id, service_user_name, dob, month, year, form_data=None, current_user=None):
+        """Shows this (closed) window again for another form, resetting everything the last one left behind."""
+        # Nothing scheduled for the last form may run against this one
+        self._stop_pdf_job()
+        self._cancel_pending_draft_work()
+        self.current_user = current_user
+        self.service_user_id = service_user_id
+        self.service_user_name = service_user_name
+        self.dob = dob
+        self.month = month
+        self.year = year
+        self.form_data = form_data
+        self.form_id = form_data['id'] if form_data else None
+
+        self.title(f"Key Worker Form - {self.service_user_name} - {month} {year}")
+        self.service_user_label.configure(text=self.service_user_name)
+        self.dob_label.configure(text=self.dob)
+        self._set_session_date(datetime.datetime.now())
+        self.selected_feeling_icons.clear()
+        self.selected_care_icons.clear()
+        self._update_feeling_button_colors()
+        self._update_care_button_colors()
+        self._clear_form()
+        if self.form_data:
+            self._load_form_data(self.form_data)
+        self._remember_loaded_form()
+        self.last_draft = None
+        self.tab_view.set("My Health")
+
+        self.deiconify()
+        self.lift()
+        self.grab_set()
+        self._check_for_draft()
+        db_manager.prefetch_adjacent_forms(self.service_user_id, self.month, self.year)
+
+    def close(self):
+        """Closes the form, handing the window back to its pool to be reused if the pool wants it."""
+        self._stop_pdf_job()
+        # Edits made just before closing still go to the draft
+        if self.autosave_id is not None:
+            self.after_cancel(self.autosave_id)
+            self._autosave()
+        self._cancel_pending_draft_work()
+        if self.pool and self.pool.release(self):
+            self.grab_release()
+            self.withdraw()
+        else:
+            self.destroy()
 
     def _create_header(self):
         header_frame = ctk.CTkFrame(self)
@@ -57,9 +177,11 @@ class FormWindow(ctk.CTkToplevel):
         header_frame.grid_columnconfigure((1, 3), weight=1)
         
         ctk.CTkLabel(header_frame, text="Service User:", font=self.label_font).grid(row=0, column=0, padx=10, pady=5, sticky="w")
-        ctk.CTkLabel(header_frame, text=self.service_user_name, font=self.main_font).grid(row=0, column=1, padx=10, pady=5, sticky="w")
+        self.service_user_label = ctk.CTkLabel(header_frame, text=self.service_user_name, font=self.main_font)
+        self.service_user_label.grid(row=0, column=1, padx=10, pady=5, sticky="w")
         ctk.CTkLabel(header_frame, text="Date of Birth:", font=self.label_font).grid(row=0, column=2, padx=10, pady=5, sticky="w")
-        ctk.CTkLabel(header_frame, text=self.dob, font=self.main_font).grid(row=0, column=3, padx=10, pady=5, sticky="w")
+        self.dob_label = ctk.CTkLabel(header_frame, text=self.dob, font=self.main_font)
+        self.dob_label.grid(row=0, column=3, padx=10, pady=5, sticky="w")
         ctk.CTkLabel(header_frame, text="Key Worker:", font=self.label_font).grid(row=1, column=0, padx=10, pady=5, sticky="w")
         self.key_worker_entry = ctk.CTkEntry(header_frame, placeholder_text="Enter your name", font=self.main_font, height=35)
         self.key_worker_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
@@ -72,15 +194,17 @@ class FormWindow(ctk.CTkToplevel):
         self.session_day.pack(side="left", padx=2, expand=True, fill="x")
         self.session_month.pack(side="left", padx=2, expand=True, fill="x")
         self.session_year.pack(side="left", padx=2, expand=True, fill="x")
-        now = datetime.datetime.now()
-        self.session_day.set(now.strftime("%d"))
-        self.session_month.set(now.strftime("%b"))
-        self.session_year.set(str(now.year))
+        self._set_session_date(datetime.datetime.now())
         self.load_prev_button = ctk.CTkButton(header_frame, text="Load Previous Month's Data", font=self.button_font, command=self._load_previous_month_data)
         self.load_prev_button.grid(row=2, column=0, columnspan=4, padx=10, pady=(10,5), sticky="ew")
 
+    def _set_session_date(self, date):
+        self.session_day.set(date.strftime("%d"))
+        self.session_month.set(date.strftime("%b"))
+        self.session_year.set(str(date.year))
+
     def _create_tabs(self):
-        self.tab_view = ctk.CTkTabview(self, width=860)
+        self.tab_view = ctk.CTkTabview(self, width=860, command=self._on_tab_selected)
         self.tab_view.pack(padx=20, pady=10, fill="both", expand=True)
         self.health_tab = self.tab_view.add("My Health")
         self.finances_tab = self.tab_view.add("My Finances")
@@ -88,12 +212,16 @@ class FormWindow(ctk.CTkToplevel):
         self.plans_tab = self.tab_view.add("Support Plans")
         self.goals_tab = self.tab_view.add("Goals & Feelings")
 
+        self.tab_builders = {
+            "My Finances": self.create_finances_tab,
+            "Personal Shopping": self.create_shopping_tab,
+            "Support Plans": self.create_support_plans_tab,
+            "Goals & Feelings": self.create_goals_feelings_tab,
+        }
+
     def _create_main_widgets(self):
+        # Only the tab shown on opening is built now; the rest are built the first time they are selected
         self.create_health_tab()
-        self.create_finances_tab()
-        self.create_shopping_tab()
-        self.create_support_plans_tab()
-        self.create_goals_feelings_tab()
         button_frame = ctk.CTkFrame(self)
         button_frame.pack(padx=20, pady=(10, 20), fill="x")
         button_frame.grid_columnconfigure((0, 1, 2), weight=1)
@@ -101,8 +229,10 @@ class FormWindow(ctk.CTkToplevel):
         self.save_button.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
         self.print_button = ctk.CTkButton(button_frame, text="Print to PDF", font=self.button_font, height=40, command=self._print_to_pdf)
         self.print_button.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
-        self.close_button = ctk.CTkButton(button_frame, text="Close Window", font=self.button_font, height=40, fg_color="gray50", command=self.destroy)
+        self.close_button = ctk.CTkButton(button_frame, text="Close Window", font=self.button_font, height=40, fg_color="gray50", command=self.close)
         self.close_button.grid(row=0, column=2, padx=5, pady=5, sticky="ew")
+        # Shown under the buttons only while a PDF is being built
+        self.pdf_progress = ctk.CTkProgressBar(button_frame)
 
     def create_health_tab(self):
         self.appointment_rows = [] 
@@ -170,10 +300,13 @@ class FormWindow(ctk.CTkToplevel):
     def add_new_appointment_row(self, data=None):
         row_index = len(self.appointment_rows)
         name_entry = ctk.CTkEntry(self.appointment_frame, placeholder_text="Appointment Name", font=self.main_font, height=35)
-        last_seen_var = ctk.StringVar(value="Last Seen")
-        last_seen_button = ctk.CTkButton(self.appointment_frame, textvariable=last_seen_var, font=self.main_font, height=35, width=120, command=lambda var=last_seen_var: self.open_date_picker(var))
-        next_due_var = ctk.StringVar(value="Next Due")
-        next_due_button = ctk.CTkButton(self.appointment_frame, textvariable=next_due_var, font=self.main_font, height=35, width=120, command=lambda var=next_due_var: self.open_date_picker(var))
+        # The variables hold only a picked DD/MM/YYYY date (or ""); the buttons show a placeholder until there is one
+        last_seen_var = ctk.StringVar(value="")
+        last_seen_button = ctk.CTkButton(self.appointment_frame, text="Last Seen", font=self.main_font, height=35, width=120, command=lambda var=last_seen_var: self.open_date_picker(var))
+        last_seen_var.trace_add("write", lambda *_: last_seen_button.configure(text=last_seen_var.get() or "Last Seen"))
+        next_due_var = ctk.StringVar(value="")
+        next_due_button = ctk.CTkButton(self.appointment_frame, text="Next Due", font=self.main_font, height=35, width=120, command=lambda var=next_due_var: self.open_date_picker(var))
+        next_due_var.trace_add("write", lambda *_: next_due_button.configure(text=next_due_var.get() or "Next Due"))
         booked_menu = ctk.CTkOptionMenu(self.appointment_frame, values=["Yes", "No", "N/A"], font=self.main_font, height=35, width=80)
         delete_button = ctk.CTkButton(self.appointment_frame, text="Delete", fg_color="red", hover_color="#c40000", width=80, height=35, font=self.main_font)
         
@@ -196,8 +329,8 @@ class FormWindow(ctk.CTkToplevel):
         if data:
             name, last_seen, next_due, booked = data
             name_entry.insert(0, name or "")
-            last_seen_var.set(last_seen or "Last Seen")
-            next_due_var.set(next_due or "Next Due")
+            last_seen_var.set(db_manager.display_date(last_seen or ""))
+            next_due_var.set(db_manager.display_date(next_due or ""))
             booked_menu.set(booked or "N/A")
 
     def create_finances_tab(self):
@@ -391,18 +524,14 @@ class FormWindow(ctk.CTkToplevel):
             row = i // 2
             col = i % 2
             
-            icon_path = os.path.join(os.path.dirname(__file__), "images", icon_file)
-            
             # Create button frame (1 inch = 72 pixels)
             btn_frame = ctk.CTkFrame(parent_frame, width=72, height=72, fg_color="transparent")
             btn_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
             btn_frame.pack_propagate(False)
             
             try:
-                # Load and resize image to 1 inch (72 pixels)
-                img = Image.open(icon_path)
-                img = img.resize((60, 60), Image.Resampling.LANCZOS)
-                photo = ctk.CTkImage(light_image=img, dark_image=img, size=(60, 60))
+                # 60px icon in a 1-inch (72 pixel) button, shared with every other form window
+                photo = icon_assets.ctk_icon(icon_file, (60, 60))
                 
                 # Create 1-inch clickable button
                 btn = ctk.CTkButton(
@@ -459,18 +588,14 @@ class FormWindow(ctk.CTkToplevel):
         
         # Create horizontal row
         for i, (icon_file, label) in enumerate(care_icons):
-            icon_path = os.path.join(os.path.dirname(__file__), "images", icon_file)
-            
             # Create button frame (1 inch = 72 pixels)
             btn_frame = ctk.CTkFrame(parent_frame, width=72, height=72, fg_color="transparent")
             btn_frame.grid(row=0, column=i, padx=3, pady=5, sticky="nsew")
             btn_frame.pack_propagate(False)
             
             try:
-                # Load and resize image to 1 inch
-                img = Image.open(icon_path)
-                img = img.resize((60, 60), Image.Resampling.LANCZOS)
-                photo = ctk.CTkImage(light_image=img, dark_image=img, size=(60, 60))
+                # 60px icon in a 1-inch (72 pixel) button, shared with every other form window
+                photo = icon_assets.ctk_icon(icon_file, (60, 60))
                 
                 # Create 1-inch clickable button
                 btn = ctk.CTkButton(
@@ -570,6 +695,78 @@ class FormWindow(ctk.CTkToplevel):
             else:
                 btn.configure(fg_color="transparent", hover_color="lightgray")
 
+    def _on_tab_selected(self):
+        self._build_tab(self.tab_view.get())
+
+    def _build_tab(self, tab_name):
+        """Builds a lazily created tab the first time it is needed and fills in the values held for it."""
+        if tab_name not in self.tab_builders or tab_name in self.built_tabs:
+            return
+        self.tab_builders[tab_name]()
+        self.built_tabs.add(tab_name)
+        self._apply_tab_values(tab_name, self.pending_tab_values.pop(tab_name, {}))
+        if tab_name == "Goals & Feelings":
+            self._update_feeling_button_colors()
+            self._update_care_button_colors()
+
+    def _field_value(self, attr, kind, value):
+        """Returns `value` as the field would read back after being loaded into its widget."""
+        if kind == "switch":
+            return "Yes" if value == "Yes" else "No"
+        if kind == "entry":
+            return "" if value is None else str(value)
+        text = str(value) if value is not None else ""
+        placeholder = self.textbox_placeholders.get(attr)
+        if not text.strip() or text.strip() == placeholder:
+            return ""
+        return text.strip() if placeholder else text
+
+    def _apply_tab_values(self, tab_name, values):
+        for key, attr, kind in self.LAZY_TAB_FIELDS[tab_name]:
+            widget = getattr(self, attr)
+            value = self._field_value(attr, kind, values.get(key))
+            if kind == "switch":
+                if value == "Yes":
+                    widget.select()
+                else:
+                    widget.deselect()
+            elif kind == "entry":
+                widget.delete(0, "end")
+                if value:
+                    widget.insert(0, value)
+            else:
+                widget.delete("1.0", "end")
+                if value:
+                    widget.insert("1.0", value)
+                elif attr in self.textbox_placeholders:
+                    widget.insert("1.0", self.textbox_placeholders[attr])
+
+    def _set_tab_values(self, tab_name, values):
+        """Loads `values` (form data keys, missing ones blank) into a lazy tab, or holds them until it is built."""
+        if tab_name in self.built_tabs:
+            self._apply_tab_values(tab_name, values)
+        else:
+            self.pending_tab_values[tab_name] = values
+
+    def _get_tab_values(self, tab_name):
+        """Returns a lazy tab's fields as form data, reading the widgets only if the tab has been built."""
+        fields = self.LAZY_TAB_FIELDS[tab_name]
+        if tab_name not in self.built_tabs:
+            values = self.pending_tab_values.get(tab_name, {})
+            return {key: self._field_value(attr, kind, values.get(key)) for key, attr, kind in fields}
+        result = {}
+        for key, attr, kind in fields:
+            widget = getattr(self, attr)
+            if kind == "text":
+                text = widget.get("1.0", "end-1c")
+                if attr in self.textbox_placeholders:
+                    text = text.strip()
+                    text = "" if text == self.textbox_placeholders[attr] else text
+                result[key] = text
+            else:
+                result[key] = widget.get()
+        return result
+
     def _clear_form(self):
         self.key_worker_entry.delete(0, "end");
         for widget in self.appointment_frame.winfo_children():
@@ -582,34 +779,21 @@ class FormWindow(ctk.CTkToplevel):
         self.nails_comments_entry.delete(0, "end")
         self.hair_check.deselect(); self.hair_date_var.set("Select Date"); self.hair_comments_entry.delete(0, "end")
         self.mar_sheets_check.deselect(); self.mar_sheets_comments_entry.delete(0, "end")
-        self.finance_cash_box_entry.delete(0, "end"); self.finance_top_up_switch.deselect(); self.finance_take_out_entry.delete(0, "end")
-        self.finance_diary_datetime_entry.delete(0, "end"); self.finance_diary_staff_entry.delete(0, "end")
-        self.shop_q1_switch.deselect(); self.shop_q1_comments.delete(0, "end")
-        self.shop_q2_switch.deselect(); self.shop_q2_comments.delete(0, "end") 
-        self.shop_q3_switch.deselect(); self.shop_q3_comments.delete(0, "end")
-        self.caredocs_contacts_switch.deselect(); self.caredocs_careplan_switch.deselect(); self.caredocs_meds_switch.deselect()
-        self.caredocs_bodymap_switch.deselect(); self.caredocs_charts_switch.deselect(); self.health_plan_switch.deselect()
-        
-        self.actions_required_textbox.delete("1.0", "end")
-        self.family_comm_switch.deselect()
-        self.family_comm_datetime_entry.delete(0, "end")
-        self.family_comm_reason_textbox.delete("1.0", "end")
-        self.family_comm_reason_textbox.insert("0.0", self.family_comm_reason_placeholder)
-        self.family_comm_issues_textbox.delete("1.0", "end")
-        self.family_comm_issues_textbox.insert("0.0", self.family_comm_issues_placeholder)
-        
-        self.current_goal_textbox.delete("1.0", "end"); self.last_goal_textbox.delete("1.0", "end"); self.feeling_response_textbox.delete("1.0", "end")
-        self.happy_response_textbox.delete("1.0", "end"); self.other_notes_textbox.delete("1.0", "end")
+        for tab_name in self.LAZY_TAB_FIELDS:
+            self._set_tab_values(tab_name, {})
+
+    def _period(self):
+        """The YYYY-MM period of the month this window shows."""
+        return db_manager.form_period(f"{self.month} {self.year}")
 
     def _load_previous_month_data(self):
         try:
-            current_date = datetime.datetime.strptime(f"01-{self.month}-{self.year}", "%d-%B-%Y")
-            prev_month_date = (current_date.replace(day=1) - datetime.timedelta(days=1))
-            prev_month_name = prev_month_date.strftime("%B")
-            prev_year = str(prev_month_date.year)
-            prev_form_month_year = f"{prev_month_name} {prev_year}"
+            period = self._period()
+            if period is None:
+                raise ValueError(f"{self.month} {self.year}")
+            prev_form_month_year = db_manager.period_label(db_manager.shift_period(period, -1))
             
-            previous_data = db_manager.get_form_data(self.service_user_id, prev_form_month_year)
+            previous_data, _ = db_manager.get_form_with_appointments(self.service_user_id, prev_form_month_year)
             
             if previous_data:
                 msg = CTkMessagebox(title="Confirm Load", message=f"Found data for {prev_form_month_year}. Load it? This will overwrite unsaved changes.", icon="question", option_1="Cancel", option_2="Load Data")
@@ -621,23 +805,16 @@ class FormWindow(ctk.CTkToplevel):
         except ValueError: 
             CTkMessagebox(title="Error", message="Invalid current month or year.", icon="cancel")
             
-    def _load_form_data(self, data, carry_over=False):
+    def _load_form_data(self, data, carry_over=False, appointments=None):
         self._clear_form()
         form_id_to_load = data.get('id')
-        if not form_id_to_load: return
+        if not form_id_to_load and appointments is None: return
 
         def _set(widget, value):
             if value is not None:
                 widget.delete(0, "end")
                 widget.insert(0, str(value))
 
-        def _set_txt(widget, value, placeholder=""):
-            widget.delete("1.0", "end")
-            if value and str(value).strip() and str(value).strip() != placeholder:
-                widget.insert("1.0", value)
-            elif placeholder:
-                widget.insert("1.0", placeholder)
-
         def _set_sw(widget, value):
             if value == "Yes":
                 widget.select()
@@ -648,13 +825,13 @@ class FormWindow(ctk.CTkToplevel):
         if not carry_over and data.get('session_datetime'):
             try:
                 dt = datetime.datetime.strptime(data['session_datetime'], '%Y-%m-%d')
-                self.session_day.set(dt.strftime('%d'))
-                self.session_month.set(dt.strftime('%b'))
-                self.session_year.set(str(dt.year))
+                self._set_session_date(dt)
             except (ValueError, TypeError):
                 pass
 
-        for appt in db_manager.get_appointments(form_id_to_load):
+        if appointments is None:
+            _, appointments = db_manager.get_form_with_appointments(data['service_user_id'], data['form_month_year'])
+        for appt in appointments:
             self.add_new_appointment_row(data=appt)
         _set(self.weight_entry, data.get('weight'))
         _set(self.bp_entry, data.get('bp'))
@@ -670,40 +847,14 @@ class FormWindow(ctk.CTkToplevel):
         _set_sw(self.mar_sheets_check, data.get('mar_sheets_check'))
         _set(self.mar_sheets_comments_entry, data.get('mar_sheets_comments'))
 
-        _set(self.finance_cash_box_entry, data.get('finance_cash_box'))
-        _set_sw(self.finance_top_up_switch, data.get('finance_top_up'))
-        _set(self.finance_take_out_entry, data.get('finance_take_out'))
-        _set(self.finance_diary_datetime_entry, data.get('finance_diary_datetime'))
-        _set(self.finance_diary_staff_entry, data.get('finance_diary_staff'))
-
-        _set_sw(self.shop_q1_switch, data.get('shop_q1_toiletries'))
-        _set(self.shop_q1_comments, data.get('shop_q1_comments'))
-        _set_sw(self.shop_q2_switch, data.get('shop_q2_clothes'))
-        _set(self.shop_q2_comments, data.get('shop_q2_comments'))
-        _set_sw(self.shop_q3_switch, data.get('shop_q3_personal_items'))
-        _set(self.shop_q3_comments, data.get('shop_q3_comments'))
-
-        _set_sw(self.caredocs_contacts_switch, data.get('caredocs_contacts'))
-        _set_sw(self.caredocs_careplan_switch, data.get('caredocs_careplan'))
-        _set_sw(self.caredocs_meds_switch, data.get('caredocs_meds'))
-        _set_sw(self.caredocs_bodymap_switch, data.get('caredocs_bodymap'))
-        _set_sw(self.caredocs_charts_switch, data.get('caredocs_charts'))
-        _set_sw(self.health_plan_switch, data.get('health_plan_file'))
-        _set_txt(self.actions_required_textbox, data.get('actions_required'))
-        _set_sw(self.family_comm_switch, data.get('family_comm_made'))
-        _set(self.family_comm_datetime_entry, data.get('family_comm_datetime'))
-        _set_txt(self.family_comm_reason_textbox, data.get('family_comm_reason'), self.family_comm_reason_placeholder)
-        _set_txt(self.family_comm_issues_textbox, data.get('family_comm_issues'), self.family_comm_issues_placeholder)
-
+        for tab_name, fields in self.LAZY_TAB_FIELDS.items():
+            self._set_tab_values(tab_name, {key: data.get(key) for key, _, _ in fields})
         if carry_over:
-            self.last_goal_textbox.insert("1.0", data.get('current_goal', ''))
-        else:
-            _set_txt(self.current_goal_textbox, data.get('current_goal'))
-            _set_txt(self.last_goal_textbox, data.get('last_goal_progress'))
-            _set_txt(self.feeling_response_textbox, data.get('feeling_response'))
-            _set_txt(self.happy_response_textbox, data.get('happy_response'))
-
-        _set_txt(self.other_notes_textbox, data.get('other_notes'))
+            # Last month's goal becomes this month's "was it accomplished?" prompt; feelings start blank
+            self._set_tab_values("Goals & Feelings", {
+                "last_goal_progress": data.get('current_goal'),
+                "other_notes": data.get('other_notes'),
+            })
 
     def open_date_picker(self, date_variable):
         date_picker_win = ctk.CTkToplevel(self)
@@ -731,6 +882,7 @@ class FormWindow(ctk.CTkToplevel):
         
         def on_date_select(): 
             date_variable.set(cal.get_date())
+            self._schedule_autosave()
             date_picker_win.destroy()
             
         button_frame = ctk.CTkFrame(date_picker_win)
@@ -748,10 +900,6 @@ class FormWindow(ctk.CTkToplevel):
         session_datetime_db = f"{self.session_year.get()}-{session_month_num}-{self.session_day.get()}"
         session_datetime_pdf = f"{self.session_day.get()}/{session_month_num}/{self.session_year.get()}"
 
-        def get_clean_text(textbox, placeholder):
-            text = textbox.get("1.0", "end-1c").strip()
-            return "" if text == placeholder else text
-
         def get_clean_date(date_var, default_text):
             date_val = date_var.get()
             return "" if date_val == default_text else date_val
@@ -776,33 +924,10 @@ class FormWindow(ctk.CTkToplevel):
             "hair_comments": self.hair_comments_entry.get(),
             "mar_sheets_check": self.mar_sheets_check.get(),
             "mar_sheets_comments": self.mar_sheets_comments_entry.get(),
-            "finance_cash_box": self.finance_cash_box_entry.get(),
-            "finance_top_up": self.finance_top_up_switch.get(),
-            "finance_take_out": self.finance_take_out_entry.get(),
-            "finance_diary_datetime": self.finance_diary_datetime_entry.get(),
-            "finance_diary_staff": self.finance_diary_staff_entry.get(),
-            "shop_q1_toiletries": self.shop_q1_switch.get(),
-            "shop_q1_comments": self.shop_q1_comments.get(),
-            "shop_q2_clothes": self.shop_q2_switch.get(),
-            "shop_q2_comments": self.shop_q2_comments.get(),
-            "shop_q3_personal_items": self.shop_q3_switch.get(),
-            "shop_q3_comments": self.shop_q3_comments.get(),
-            "caredocs_contacts": self.caredocs_contacts_switch.get(),
-            "caredocs_careplan": self.caredocs_careplan_switch.get(),
-            "caredocs_meds": self.caredocs_meds_switch.get(),
-            "caredocs_bodymap": self.caredocs_bodymap_switch.get(),
-            "caredocs_charts": self.caredocs_charts_switch.get(),
-            "health_plan_file": self.health_plan_switch.get(),
-            "actions_required": self.actions_required_textbox.get("1.0", "end-1c"),
-            "family_comm_made": self.family_comm_switch.get(),
-            "family_comm_datetime": self.family_comm_datetime_entry.get(),
-            "family_comm_reason": get_clean_text(self.family_comm_reason_textbox, self.family_comm_reason_placeholder),
-            "family_comm_issues": get_clean_text(self.family_comm_issues_textbox, self.family_comm_issues_placeholder),
-            "current_goal": self.current_goal_textbox.get("1.0", "end-1c"),
-            "last_goal_progress": self.last_goal_textbox.get("1.0", "end-1c"),
-            "feeling_response": self.feeling_response_textbox.get("1.0", "end-1c"),
-            "happy_response": self.happy_response_textbox.get("1.0", "end-1c"),
-            "other_notes": self.other_notes_textbox.get("1.0", "end-1c"),
+            **self._get_tab_values("My Finances"),
+            **self._get_tab_values("Personal Shopping"),
+            **self._get_tab_values("Support Plans"),
+            **self._get_tab_values("Goals & Feelings"),
             "feeling_icons_selected": ",".join(self.selected_feeling_icons),
             "care_icons_selected": ",".join(self.selected_care_icons),
             "appointments": []
@@ -812,8 +937,8 @@ class FormWindow(ctk.CTkToplevel):
             if name := name_entry.get():
                 data["appointments"].append({
                     "name": name,
-                    "last_seen": get_clean_date(last_seen_var, "Last Seen"),
-                    "next_due": get_clean_date(next_due_var, "Next Due"),
+                    "last_seen": last_seen_var.get(),
+                    "next_due": next_due_var.get(),
                     "booked": booked_menu.get()
                 })
         return data
@@ -825,33 +950,182 @@ class FormWindow(ctk.CTkToplevel):
         if self.form_id:
             appointments_from_db = db_manager.get_appointments(self.form_id)
             form_data_for_pdf['appointments'] = [
-                {'name': a[0], 'last_seen': a[1], 'next_due': a[2], 'booked': a[3]} for a in appointments_from_db
+                {'name': a[0], 'last_seen': db_manager.display_date(a[1]), 'next_due': db_manager.display_date(a[2]), 'booked': a[3]}
+                for a in appointments_from_db
             ]
 
-        success, error_message = pdf_generator.generate_pdf(form_data_for_pdf)
+        # ReportLab layout and image decoding run on a worker thread; the window polls for the result
+        self.pdf_job = pdf_generator.PdfJob(form_data_for_pdf)
+        self.print_button.configure(text="Cancel PDF", command=self._cancel_pdf)
+        self.pdf_progress.set(0)
+        self.pdf_progress.grid(row=1, column=0, columnspan=3, padx=5, pady=(0, 5), sticky="ew")
+        self.pdf_poll_id = self.after(self.PDF_POLL_MS, self._poll_pdf_job)
+
+    def _cancel_pdf(self):
+        if self.pdf_job:
+            self.pdf_job.cancel()
+            self.print_button.configure(text="Cancelling...", state="disabled")
+
+    def _poll_pdf_job(self):
+        self.pdf_poll_id = None
+        self.pdf_progress.set(self.pdf_job.progress)
+        if self.pdf_job.result is None:
+            self.pdf_poll_id = self.after(self.PDF_POLL_MS, self._poll_pdf_job)
+            return
+
+        success, error_message = self.pdf_job.result
+        self.pdf_job = None
+        self.pdf_progress.grid_remove()
+        self.print_button.configure(text="Print to PDF", command=self._print_to_pdf, state="normal")
         if success:
             CTkMessagebox(title="Success", message="PDF generated in Downloads and should open automatically.", icon="check")
-        else:
+        elif error_message != "Cancelled":
             CTkMessagebox(title="PDF Error", message=f"Failed to generate PDF: {error_message}", icon="cancel")
 
-    def save_form(self, show_success_message=True):
-        form_data_to_save = self._get_form_data_as_dict()
-        db_data = form_data_to_save.copy()
-        
+    def _stop_pdf_job(self):
+        # Stop a PDF still being built and the poll that would touch this window once it is closed
+        if self.pdf_poll_id is not None:
+            self.after_cancel(self.pdf_poll_id)
+            self.pdf_poll_id = None
+        if self.pdf_job:
+            self.pdf_job.cancel()
+            self.pdf_job = None
+            self.pdf_progress.grid_remove()
+            self.print_button.configure(text="Print to PDF", command=self._print_to_pdf, state="normal")
+
+    def destroy(self):
+        self._stop_pdf_job()
+        super().destroy()
+
+    def _form_snapshot(self):
+        """Returns the form as it would be saved: (forms row data, appointment tuples)."""
+        db_data = self._get_form_data_as_dict()
         db_data["session_datetime"] = db_data.pop("session_datetime_db")
         appointments_list = db_data.pop('appointments', [])
 
-        saved_form_id = db_manager.save_form_data(db_data, self.current_user['username'])
+        # The database keeps appointment dates as YYYY-MM-DD
+        appointments_for_db = [
+            (a['name'], db_manager.iso_date(a['last_seen']), db_manager.iso_date(a['next_due']), a['booked']) for a in appointments_list
+        ]
+        return db_data, appointments_for_db
+
+    def _remember_loaded_form(self):
+        # The form as loaded or last saved (blank for a new form), so saves and autosaves can tell what has changed
+        db_data, appointments_for_db = self._form_snapshot()
+        if self.form_id:
+            # The header shows today's date when the stored one is missing or unreadable; saving should still store it
+            db_data["session_datetime"] = self.form_data.get("session_datetime")
+        self.saved_form = (db_data, appointments_for_db)
+
+    def _changes_since_saved(self, db_data, appointments_for_db):
+        """Returns (changed forms columns, whether the appointments changed) against the form as loaded or last saved."""
+        saved_data, saved_appointments = self.saved_form
+        changed_columns = [col for col in db_manager.FORM_COLUMNS if db_data.get(col) != saved_data.get(col)]
+        return changed_columns, appointments_for_db != saved_appointments
+
+    def _schedule_autosave(self, event=None):
+        # Debounce: each edit pushes the autosave back, so it runs once the user pauses
+        if self.autosave_id is not None:
+            self.after_cancel(self.autosave_id)
+        self.autosave_id = self.after(self.AUTOSAVE_DELAY_MS, self._autosave)
+
+    def _autosave(self):
+        self.autosave_id = None
+        snapshot = self._form_snapshot()
+        if snapshot == self.last_draft:
+            return
+        if self.last_draft is None and self._changes_since_saved(*snapshot) == ([], False):
+            return
+        # Only the snapshot is taken here; encoding and writing the draft happen on the drafts thread
+        form_drafts.save_draft(self.service_user_id, self._period(), self.current_user['username'], *snapshot)
+        self.last_draft = snapshot
+
+    def _cancel_pending_draft_work(self):
+        if self.autosave_id is not None:
+            self.after_cancel(self.autosave_id)
+            self.autosave_id = None
+        if self.draft_offer_id is not None:
+            self.after_cancel(self.draft_offer_id)
+            self.draft_offer_id = None
+
+    def _check_for_draft(self):
+        draft = form_drafts.get_draft(self.service_user_id, self._period())
+        if draft:
+            # Asked once the window is showing rather than while it is being built
+            self.draft_offer_id = self.after(100, lambda: self._offer_draft(draft))
+
+    def _offer_draft(self, draft):
+        self.draft_offer_id = None
+        saved_at = datetime.datetime.strptime(draft["saved_at"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=datetime.timezone.utc).astimezone()
+        msg = CTkMessagebox(title="Unsaved Draft Found",
+                            message=f"This form has unsaved changes autosaved at {saved_at.strftime('%d/%m/%Y %H:%M')} by {draft['saved_by'] or 'unknown'}. Restore them?",
+                            icon="question", option_1="Discard Draft", option_2="Restore Draft")
+        if msg.get() != "Restore Draft":
+            form_drafts.discard_draft(self.service_user_id, self._period())
+            return
+        self._load_form_data(dict(draft["form"], id=self.form_id), appointments=draft["appointments"])
+        self.selected_feeling_icons[:] = [i for i in (draft["form"].get("feeling_icons_selected") or "").split(",") if i]
+        self.selected_care_icons[:] = [i for i in (draft["form"].get("care_icons_selected") or "").split(",") if i]
+        self._update_feeling_button_colors()
+        self._update_care_button_colors()
+        self.last_draft = self._form_snapshot()
+
+    def save_form(self, show_success_message=True):
+        if self.autosave_id is not None:
+            self.after_cancel(self.autosave_id)
+            self.autosave_id = None
+        # A draft write still queued must not land after the save that deletes the draft
+        form_drafts.flush()
+        db_data, appointments_for_db = self._form_snapshot()
+
+        if self.form_id and self.saved_form:
+            # Only write the columns and appointments that differ from what was loaded or last saved
+            changed_columns, appointments_changed = self._changes_since_saved(db_data, appointments_for_db)
+            if not changed_columns and not appointments_changed:
+                if self.last_draft is not None:
+                    # Edited and then changed back: the draft has nothing worth offering
+                    form_drafts.discard_draft(self.service_user_id, self._period())
+                    self.last_draft = None
+                if show_success_message:
+                    CTkMessagebox(title="No Changes", message="There are no changes to save.", icon="info")
+                return
+            saved_form_id = db_manager.save_form_changes(
+                self.form_id, db_data, changed_columns, appointments_for_db if appointments_changed else None,
+                self.current_user['username']
+            )
+        else:
+            saved_form_id = db_manager.save_complete_form(db_data, appointments_for_db, self.current_user['username'])
         
         if saved_form_id:
             self.form_id = saved_form_id 
-            
-            appointments_for_db = [
-                (a['name'], a['last_seen'], a['next_due'], a['booked']) for a in appointments_list
-            ]
-            db_manager.save_appointments(saved_form_id, appointments_for_db)
+            self.saved_form = (db_data, appointments_for_db)
+            self.last_draft = None
 
             if show_success_message: 
                 CTkMessagebox(title="Success", message="Form saved successfully!", icon="check")
         elif show_success_message:
             CTkMessagebox(title="Error", message="There was an error saving the form.", icon="cancel")
+
+
+class FormWindowPool:
+    """Keeps one closed FormWindow hidden so the next form opens by reloading it rather than rebuilding it."""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.idle_window = None
+
+    def open(self, service_user_id, service_user_name, dob, month, year, form_data=None, current_user=None):
+        """Returns a FormWindow showing the given form, reusing the idle window if there is one."""
+        window, self.idle_window = self.idle_window, None
+        if window is not None and window.winfo_exists():
+            window.reopen(service_user_id, service_user_name, dob, month, year, form_data, current_user)
+            return window
+        return FormWindow(self.parent, service_user_id, service_user_name, dob, month, year,
+                          form_data=form_data, current_user=current_user, pool=self)
+
+    def release(self, window):
+        """Takes back a closing window. Returns False if one is already idle, in which case it should be destroyed."""
+        if self.idle_window is not None and self.idle_window.winfo_exists():
+            return False
+        self.idle_window = window
+        return True
@@ -0,0 +1,89 @@
+"""Pre-scaled copies of the icons in images/.
+
+The source images are photos and large PNGs (Healthy-Food-Choices.png alone is
+1.6 MB) but are only ever drawn as small icons. prescaled_icon() returns a
+copy resized to the pixel size actually needed, written once to icon_cache/
+and named after a hash of the source file's contents and the target size, so
+an edited image gets a fresh copy and stale ones are never reused.
+ctk_icon() builds on it to hand FormWindow one shared CTkImage per icon and
+size for the life of the process.
+"""
+import hashlib
+import os
+import sys
+
+from PIL import Image
+
+_script_dir = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(_script_dir, "images")
+CACHE_DIR = os.path.join(os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else _script_dir, "icon_cache")
+
+# Resolution icons are rendered at for PDFs; well above what 0.4-0.8 inch icons need on paper
+PDF_DPI = 150
+
+_digests = {}  # (path, mtime_ns, size) -> content hash, so each source file is hashed once per process
+_ctk_images = {}  # (icon_filename, size) -> CTkImage shared by every window
+
+
+def _content_digest(path):
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        with open(path, "rb") as f:
+            _digests[key] = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _digests[key]
+
+
+def pdf_pixel_size(points):
+    """Pixels needed to draw `points` (1/72 inch) at PDF_DPI."""
+    return max(1, round(points / 72 * PDF_DPI))
+
+
+def prescaled_icon(icon_filename, width_px, height_px):
+    """Returns the path of `icon_filename` resized to width_px x height_px, creating it on first use.
+
+    Images with transparency are cached as PNG and the rest as JPEG. Returns
+    None if the source image does not exist, and the original path if the
+    cache folder cannot be written.
+    """
+    source_path = os.path.join(IMAGES_DIR, icon_filename)
+    if not os.path.exists(source_path):
+        return None
+    with Image.open(source_path) as source:
+        has_alpha = source.mode in ("RGBA", "LA", "P")
+        extension = "png" if has_alpha else "jpg"
+        cached_path = os.path.join(CACHE_DIR, f"{_content_digest(source_path)}_{width_px}x{height_px}.{extension}")
+        if os.path.exists(cached_path):
+            return cached_path
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            resized = source.convert("RGBA" if has_alpha else "RGB").resize((width_px, height_px), Image.Resampling.LANCZOS)
+            # Write-then-rename so a half-written file is never picked up by another process
+            tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+            if has_alpha:
+                resized.save(tmp_path, "PNG", optimize=True)
+            else:
+                resized.save(tmp_path, "JPEG", quality=90)
+            os.replace(tmp_path, cached_path)
+        except OSError as e:
+            print(f"Could not cache icon {icon_filename}: {e}")
+            return source_path
+    return cached_path
+
+
+def ctk_icon(icon_filename, size=(60, 60)):
+    """Returns a CTkImage of `icon_filename` at `size`, loading it from the icon cache on first use.
+
+    The same CTkImage is shared by every window, so opening another form costs
+    no image decoding. Raises FileNotFoundError if the icon does not exist.
+    """
+    key = (icon_filename, size)
+    if key not in _ctk_images:
+        import customtkinter as ctk  # PDF worker processes use this module without a GUI
+        path = prescaled_icon(icon_filename, *size)
+        if path is None:
+            raise FileNotFoundError(os.path.join(IMAGES_DIR, icon_filename))
+        with Image.open(path) as cached:
+            image = cached.copy()
+        _ctk_images[key] = ctk.CTkImage(light_image=image, dark_image=image, size=size)
+    return _ctk_images[key]
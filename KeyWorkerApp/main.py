@@ -7,13 +7,27 @@ else:
 
 import customtkinter as ctk
 import datetime
+import multiprocessing
+import sqlite3
+import threading
+from tkinter import filedialog
+import tkinter.simpledialog as simpledialog
 import database
+import db_connection
+import activity_log_archive
+import audit_writer
+import form_drafts
+import batch_export
+import compliance_report
+import database_archive
 import database_utils as db_manager
-from form_window import FormWindow
+from form_window import FormWindowPool
 from user_management_window import UserManagementWindow
 from login_window import LoginWindow
 from app_user_management_window import AppUserManagementWindow
 from activity_log_window import ActivityLogWindow
+from appointments_panel import AppointmentsPanel
+from dashboard_window import ResidentDashboardWindow
 from force_password_change_window import ForcePasswordChangeWindow # Import new window
 from CTkMessagebox import CTkMessagebox
 
@@ -23,7 +37,7 @@ class App(ctk.CTk):
         
         # Set up window properties immediately
         self.title("Key Worker App - Main Menu")
-        self.geometry("400x450")
+        self.geometry("1000x650")
         self.resizable(False, False)
         self.grid_columnconfigure(0, weight=1)
         
@@ -35,6 +49,9 @@ class App(ctk.CTk):
             self.destroy()
             return
             
+        # Forms reuse one hidden FormWindow instead of building a new one each time
+        self.form_pool = FormWindowPool(self)
+
         # Build and show main window
         self.setup_main_window()
         self.deiconify()
@@ -45,6 +62,12 @@ class App(ctk.CTk):
         # Ensure the window is actually mapped/visible
         self.update_idletasks()
         
+    def destroy(self):
+        # Every audited action and autosaved draft must reach the database before the app goes away
+        audit_writer.flush()
+        form_drafts.flush()
+        super().destroy()
+
     def handle_login(self):
         """Handle the login process and return True if successful"""
         login = LoginWindow(self)
@@ -94,15 +117,37 @@ class App(ctk.CTk):
         self.main_action_button = ctk.CTkButton(self, text="View / Create Form", command=self.process_form_request)
         self.main_action_button.grid(row=5, column=0, columnspan=2, padx=20, pady=(20, 5), sticky="ew")
         
+        self.dashboard_button = ctk.CTkButton(self, text="Weight & BP Dashboard", command=self.open_dashboard)
+        self.dashboard_button.grid(row=6, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+
         self.manage_users_button = ctk.CTkButton(self, text="Manage Service Users", command=self.open_user_management)
-        self.manage_users_button.grid(row=6, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+        self.manage_users_button.grid(row=7, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
         
         if self.current_user['role'] == 'supervisor':
             self.manage_app_users_button = ctk.CTkButton(self, text="Manage App Users", command=self.open_app_user_management)
-            self.manage_app_users_button.grid(row=7, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+            self.manage_app_users_button.grid(row=8, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
             
             self.view_log_button = ctk.CTkButton(self, text="View Activity Log", command=self.open_activity_log)
-            self.view_log_button.grid(row=8, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+            self.view_log_button.grid(row=9, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+
+            self.batch_export_button = ctk.CTkButton(self, text="Export Month's PDFs", command=self.open_batch_export)
+            self.batch_export_button.grid(row=10, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+
+            self.compliance_report_button = ctk.CTkButton(self, text="Compliance Report", command=self.open_compliance_report)
+            self.compliance_report_button.grid(row=11, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+
+            self.data_archive_button = ctk.CTkButton(self, text="Export / Restore Data", command=self.open_data_archive)
+            self.data_archive_button.grid(row=12, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+
+        # Overdue and upcoming appointments for every service user, beside the menu
+        self.grid_columnconfigure(0, weight=0, minsize=180)
+        self.grid_columnconfigure(1, minsize=180)
+        self.grid_columnconfigure(2, weight=1)
+        self.grid_rowconfigure(13, weight=1)
+        self.appointments_panel = AppointmentsPanel(self)
+        self.appointments_panel.grid(row=0, column=2, rowspan=14, padx=(0, 20), pady=20, sticky="nsew")
+        # Forms are modal, so the menu regaining focus is when a save may have changed what is due
+        self.bind("<FocusIn>", lambda event: self.appointments_panel.refresh() if event.widget is self else None)
 
         self.user_data_map = {}
         self.update_user_dropdown()
@@ -135,9 +180,169 @@ class App(ctk.CTk):
         self.wait_window(app_user_window)
 
     def open_activity_log(self):
+        audit_writer.flush()
         log_window = ActivityLogWindow(self)
         self.wait_window(log_window)
 
+    def open_dashboard(self):
+        user_info = self.user_data_map.get(self.user_dropdown.get())
+        if not user_info:
+            CTkMessagebox(title="Error", message="Please add a service user first via the 'Manage Users' screen.", icon="cancel")
+            return
+        dashboard = ResidentDashboardWindow(self, user_info["id"], self.user_dropdown.get())
+        self.wait_window(dashboard)
+
+    def open_batch_export(self):
+        month = self.month_dropdown.get()
+        year = self.year_dropdown.get()
+        output_folder = filedialog.askdirectory(parent=self, title=f"Choose a folder for the {month} {year} PDFs")
+        if not output_folder:
+            return
+        choice = CTkMessagebox(title="Export Month's PDFs",
+                               message=f"Export every {month} {year} form as separate PDFs or as one merged PDF?",
+                               icon="question", option_1="Cancel", option_2="One Merged PDF", option_3="Separate PDFs").get()
+        if choice not in ("One Merged PDF", "Separate PDFs"):
+            return
+
+        forms = batch_export.collect_month_forms(month, year)
+        if not forms:
+            CTkMessagebox(title="Nothing to Export", message=f"No forms have been saved for {month} {year}.", icon="info")
+            return
+
+        # Rendering runs on a process pool driven from a worker thread; the button shows progress via after() polling
+        self.batch_export_state = {"done": 0, "total": len(forms), "result": None}
+        def run_export():
+            def on_progress(done, total):
+                self.batch_export_state["done"] = done
+            try:
+                self.batch_export_state["result"] = batch_export.export_month(
+                    month, year, output_folder, merged=(choice == "One Merged PDF"), forms=forms, progress=on_progress
+                )
+            except Exception as e:
+                self.batch_export_state["result"] = ([], [("the export", str(e))])
+        threading.Thread(target=run_export, name="batch-export", daemon=True).start()
+        self.batch_export_button.configure(state="disabled")
+        self._poll_batch_export(month, year, output_folder)
+
+    def _poll_batch_export(self, month, year, output_folder):
+        state = self.batch_export_state
+        if state["result"] is None:
+            self.batch_export_button.configure(text=f"Exporting {state['done']}/{state['total']}...")
+            self.after(200, self._poll_batch_export, month, year, output_folder)
+            return
+
+        written, failures = state["result"]
+        self.batch_export_button.configure(text="Export Month's PDFs", state="normal")
+        db_manager.log_activity(self.current_user['username'], "BATCH EXPORT",
+                                f"Exported {month} {year} forms ({len(written)} PDF(s), {len(failures)} failed)")
+        if failures:
+            failed_names = ", ".join(name for name, _ in failures)
+            CTkMessagebox(title="Export Finished With Errors", message=f"Wrote {len(written)} PDF(s) to {output_folder}.\nFailed for: {failed_names}", icon="warning")
+        else:
+            CTkMessagebox(title="Export Complete", message=f"Wrote {len(written)} PDF(s) to {output_folder}.", icon="check")
+
+    def open_compliance_report(self):
+        month = self.month_dropdown.get()
+        year = self.year_dropdown.get()
+        choice = CTkMessagebox(title="Compliance Report",
+                               message=f"Report on {month} {year} only, or on the 12 months up to it?",
+                               icon="question", option_1="Cancel", option_2="12 Months", option_3=f"{month} {year}").get()
+        if choice not in ("12 Months", f"{month} {year}"):
+            return
+        period_to = db_manager.form_period(f"{month} {year}")
+        period_from = db_manager.shift_period(period_to, -11) if choice == "12 Months" else period_to
+        output = filedialog.asksaveasfilename(parent=self, title="Save Compliance Report", defaultextension=".xlsx",
+                                              initialfile=f"Compliance_{period_from}_to_{period_to}.xlsx",
+                                              filetypes=[("Excel workbook", "*.xlsx"), ("CSV files", "*.csv")])
+        if not output:
+            return
+
+        reports = compliance_report.build_reports(period_from, period_to)
+        if not reports:
+            CTkMessagebox(title="Error", message="Could not read the forms for the report.", icon="cancel")
+            return
+        try:
+            written = compliance_report.export_reports(reports, output)
+        except OSError as e:
+            CTkMessagebox(title="Error", message=f"Could not write the report: {e}", icon="cancel")
+            return
+        first, last = db_manager.period_label(period_from), db_manager.period_label(period_to)
+        db_manager.log_activity(self.current_user['username'], "COMPLIANCE REPORT", f"Exported compliance reports for {first} to {last}")
+        summary = "\n".join(f"{report.title}: {len(report.rows)} row(s)" for report in reports)
+        CTkMessagebox(title="Report Saved", message=f"{summary}\n\nSaved to {', '.join(written)}", icon="check")
+
+    def open_data_archive(self):
+        choice = CTkMessagebox(title="Export / Restore Data",
+                               message="Export every record to an archive file, or replace all current data with an archive?",
+                               icon="question", option_1="Cancel", option_2="Restore", option_3="Export").get()
+        if choice == "Export":
+            path = filedialog.asksaveasfilename(parent=self, title="Save Database Archive", defaultextension=".zip",
+                                                initialfile=f"alyson_house_{datetime.date.today().isoformat()}.zip",
+                                                filetypes=[("Database archive", "*.zip")])
+            if not path:
+                return
+            task = lambda: database_archive.export_archive(path, progress=on_progress)
+        elif choice == "Restore":
+            path = filedialog.askopenfilename(parent=self, title="Choose a Database Archive", filetypes=[("Database archive", "*.zip")])
+            if not path:
+                return
+            try:
+                summary = database_archive.describe_manifest(database_archive.read_manifest(path))
+            except database_archive.ArchiveError as e:
+                CTkMessagebox(title="Error", message=f"Could not restore: {e}", icon="cancel")
+                return
+            confirm = CTkMessagebox(title="Confirm Restore",
+                                    message=f"Replace ALL current data with this archive?\n\n{summary}\n\nThis cannot be undone.",
+                                    icon="warning", option_1="Cancel", option_2="Restore").get()
+            if confirm != "Restore":
+                return
+            password = simpledialog.askstring("Password Required", "Enter your password to confirm the restore:", show="*")
+            if not password or not db_manager.verify_user(self.current_user['username'], password):
+                CTkMessagebox(title="Error", message="Incorrect password. Restore cancelled.", icon="cancel")
+                return
+            # Queued log entries and drafts belong to the data being replaced
+            audit_writer.flush()
+            form_drafts.flush()
+            task = lambda: database_archive.restore_archive(path, progress=on_progress)
+        else:
+            return
+
+        # Large databases take a while, so the work runs on a worker thread; the button shows progress via after() polling
+        self.data_archive_state = {"table": "", "result": None}
+        def on_progress(table, rows):
+            self.data_archive_state["table"] = table
+        def run_task():
+            try:
+                self.data_archive_state["result"] = task()
+            except (OSError, sqlite3.Error, database_archive.ArchiveError) as e:
+                self.data_archive_state["result"] = e
+        threading.Thread(target=run_task, name="data-archive", daemon=True).start()
+        self.data_archive_button.configure(state="disabled")
+        self._poll_data_archive(choice, path)
+
+    def _poll_data_archive(self, choice, path):
+        state = self.data_archive_state
+        result = state["result"]
+        if result is None:
+            verb = "Exporting" if choice == "Export" else "Restoring"
+            self.data_archive_button.configure(text=f"{verb} {state['table']}...")
+            self.after(200, self._poll_data_archive, choice, path)
+            return
+
+        self.data_archive_button.configure(text="Export / Restore Data", state="normal")
+        if isinstance(result, Exception):
+            CTkMessagebox(title="Error", message=f"Could not {choice.lower()} the database: {result}", icon="cancel")
+            return
+        summary = database_archive.describe_manifest(result)
+        if choice == "Export":
+            db_manager.log_activity(self.current_user['username'], "EXPORT DATABASE", f"Exported the database to {os.path.basename(path)}")
+            CTkMessagebox(title="Export Finished", message=f"{summary}\n\nSaved to {path}", icon="check")
+        else:
+            db_manager.log_activity(self.current_user['username'], "RESTORE DATABASE", f"Restored the database from {os.path.basename(path)}")
+            self.update_user_dropdown()
+            self.appointments_panel.refresh()
+            CTkMessagebox(title="Restore Finished", message=f"Restored {summary}", icon="check")
+
     def process_form_request(self):
         selected_user_name = self.user_dropdown.get()
         if selected_user_name == "No users found":
@@ -167,10 +372,9 @@ class App(ctk.CTk):
         
         form_month_year = f"{selected_month_str} {selected_year_int}"
         
-        existing_form_data = db_manager.get_form_data(user_info["id"], form_month_year)
+        existing_form_data, _ = db_manager.get_form_with_appointments(user_info["id"], form_month_year, fresh=True)
         
-        form = FormWindow(
-            self, 
+        form = self.form_pool.open(
             service_user_id=user_info["id"],
             service_user_name=selected_user_name, 
             dob=user_info["dob"],
@@ -182,7 +386,17 @@ class App(ctk.CTk):
         form.grab_set()
 
 if __name__ == "__main__":
+    # Batch PDF export uses worker processes, which a frozen (PyInstaller) build must opt in to
+    multiprocessing.freeze_support()
     # Initialize DB against the proper path
     database.initialize_db()
+    audit_writer.start()
     app = App()
     app.mainloop()
+    audit_writer.stop()
+    # Move entries past the retention period into the compressed archive (at most once a day)
+    try:
+        activity_log_archive.archive_old_entries()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Activity log archiving skipped: {e}")
+    db_connection.shutdown()
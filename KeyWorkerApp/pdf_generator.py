@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 import webbrowser
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -8,6 +9,7 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+import icon_assets
 
 # ==============================================================================
 # FONT REGISTRATION FOR EMOJIS
@@ -62,18 +64,29 @@ class Checkbox(Paragraph):
             self.canv.drawCentredString(4.5, 2, "✓")
         self.canv.restoreState()
 
+class PdfCancelled(Exception):
+    pass
+
 # ==============================================================================
 # MAIN PDF GENERATION FUNCTION
 # ==============================================================================
-def generate_pdf(data):
+def pdf_file_name(data):
+    user_name = data.get('service_user_name', 'user').replace(' ', '_')
+    month = data.get('month', 'month')
+    year = data.get('year', 'year')
+    return f"Key_Worker_Form_{user_name}_{month}_{year}.pdf"
+
+def generate_pdf(data, progress=None, cancel_event=None, file_path=None, open_when_done=True):
+    """Builds the form PDF (in Downloads unless `file_path` is given) and opens it. Returns (success, error_message).
+
+    `progress` is called with a fraction between 0 and 1 as the layout advances;
+    setting `cancel_event` stops the build and removes the partial file.
+    """
     try:
-        downloads_folder = os.path.join(os.path.expanduser('~'), 'Downloads')
-        os.makedirs(downloads_folder, exist_ok=True)
-        user_name = data.get('service_user_name', 'user').replace(' ', '_')
-        month = data.get('month', 'month')
-        year = data.get('year', 'year')
-        file_name = f"Key_Worker_Form_{user_name}_{month}_{year}.pdf"
-        file_path = os.path.join(downloads_folder, file_name)
+        if file_path is None:
+            downloads_folder = os.path.join(os.path.expanduser('~'), 'Downloads')
+            os.makedirs(downloads_folder, exist_ok=True)
+            file_path = os.path.join(downloads_folder, pdf_file_name(data))
 
         doc = SimpleDocTemplate(
             file_path, pagesize=A4,
@@ -81,6 +94,18 @@ def generate_pdf(data):
             topMargin=0.75*inch, bottomMargin=0.75*inch
         )
 
+        # ReportLab reports the number of top-level flowables up front and then how many
+        # have been laid out after each one; every callback is also a chance to cancel.
+        layout = {"total": 0}
+        def on_layout_progress(kind, value):
+            if cancel_event is not None and cancel_event.is_set():
+                raise PdfCancelled()
+            if kind == 'SIZE_EST':
+                layout["total"] = value
+            elif kind == 'PROGRESS' and layout["total"] and progress:
+                progress(min(value / layout["total"], 1.0))
+        doc.setProgressCallBack(on_layout_progress)
+
         story = []
         styles = getSampleStyleSheet()
         p_style = styles['BodyText']
@@ -324,25 +349,55 @@ def generate_pdf(data):
 
         # Build the document
         doc.build(story)
+        if progress:
+            progress(1.0)
 
-        if sys.platform == "darwin":
-            os.system(f'open "{file_path}"')
-        else:
-            webbrowser.open(file_path)
+        if open_when_done:
+            if sys.platform == "darwin":
+                os.system(f'open "{file_path}"')
+            else:
+                webbrowser.open(file_path)
 
         return True, None
+    except PdfCancelled:
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        return False, "Cancelled"
     except Exception as e:
         print(f"Error in PDF generation: {e}")
         return False, str(e)
 
+class PdfJob:
+    """Runs generate_pdf on a worker thread so the window that started it stays responsive.
+
+    The UI polls `progress` and `result` with after(); `result` stays None until
+    the worker finishes and then holds generate_pdf's (success, error_message).
+    """
+
+    def __init__(self, data):
+        self.progress = 0.0
+        self.result = None
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(data,), name="pdf-job", daemon=True)
+        self._thread.start()
+
+    def _run(self, data):
+        self.result = generate_pdf(data, progress=self._set_progress, cancel_event=self._cancel_event)
+
+    def _set_progress(self, fraction):
+        self.progress = fraction
+
+    def cancel(self):
+        self._cancel_event.set()
+
 def _create_icon_image(icon_filename, selected_icons, icon_label, width=0.8*inch, height=0.8*inch):
     """Create an image with selection highlight if the icon was selected"""
     try:
-        # Get the directory where this script is located  
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        icon_path = os.path.join(script_dir, "images", icon_filename)
+        # Embed a copy scaled to the printed size rather than the full-size original
+        icon_path = icon_assets.prescaled_icon(icon_filename, icon_assets.pdf_pixel_size(width), icon_assets.pdf_pixel_size(height))
         
-        if os.path.exists(icon_path):
+        if icon_path:
+            # The pre-scaled copy is a few KB, so ReportLab reads it lazily when the page is drawn
             img = Image(icon_path, width=width, height=height)
             
             # If this icon was selected, we'll highlight it in the table styling
@@ -0,0 +1,39 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import database  # noqa: E402
+import db_connection  # noqa: E402
+import form_cache  # noqa: E402
+
+LEGACY_DB = os.path.join(APP_DIR, "alyson_house.db")
+
+
+def _use_database(path):
+    db_connection.set_db_path(path)
+    form_cache.clear()
+    database.initialize_db()
+    return path
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A freshly created, fully migrated database; yields its path."""
+    original = db_connection.DB_PATH
+    yield _use_database(str(tmp_path / "test.db"))
+    db_connection.set_db_path(original)
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """A migrated copy of the bundled (pre-versioning) alyson_house.db; yields its path."""
+    original = db_connection.DB_PATH
+    path = str(tmp_path / "legacy.db")
+    shutil.copyfile(LEGACY_DB, path)
+    yield _use_database(path)
+    db_connection.set_db_path(original)
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+import activity_log_archive
+from db_connection import get_connection, transaction
+
+OLD_ENTRIES = [("2020-01-05 10:00:00", "Kim", "SAVE FORM", "January"),
+               ("2020-02-05 10:00:00", "Kim", "SAVE FORM", "February")]
+
+
+def _archive_old_entries():
+    with transaction() as cur:
+        cur.executemany("INSERT INTO activity_log (timestamp, user, action, details) VALUES (?, ?, ?, ?)", OLD_ENTRIES)
+    assert activity_log_archive.archive_old_entries(force=True) == len(OLD_ENTRIES)
+
+
+def test_archived_entries_leave_the_database_and_read_back_newest_first(db):
+    _archive_old_entries()
+    assert get_connection().execute("SELECT count(*) FROM activity_log WHERE timestamp < '2021'").fetchone()[0] == 0
+    assert [row[1:] for row in activity_log_archive.iter_archived_entries()] == OLD_ENTRIES[::-1]
+    assert activity_log_archive.verify_archive() == []
+
+
+def test_missing_segment_raises_value_error(db):
+    _archive_old_entries()
+    os.remove(os.path.join(activity_log_archive.archive_dir(), "activity_log_2020-01_0001.jsonl.gz"))
+
+    assert activity_log_archive.verify_archive() == ["activity_log_2020-01_0001.jsonl.gz"]
+    entries = activity_log_archive.iter_archived_entries()
+    assert next(entries)[4] == "February"
+    with pytest.raises(ValueError, match="activity_log_2020-01_0001.jsonl.gz is missing"):
+        next(entries)
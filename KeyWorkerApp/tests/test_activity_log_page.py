@@ -0,0 +1,90 @@
+import datetime
+
+import pytest
+
+import database_utils as db_manager
+import db_connection
+from db_connection import transaction
+
+USERS = ["kim", "lee", "sam"]
+ACTIONS = ["SAVE FORM", "LOGIN", "DELETE SERVICE USER"]
+DETAILS = ["Saved form for Alice, chiropody booked", "Saved form for Bob, chiropractor visit",
+           "Logged in", "Deleted Carol", "Saved form for Alice, optician"]
+
+
+@pytest.fixture
+def entries(db):
+    """About three days of log entries in timestamp order, pairs sharing a second, with rows on the date boundaries."""
+    start = datetime.datetime(2025, 3, 30)
+    stamps = [start + datetime.timedelta(minutes=30 * (n // 2)) for n in range(300)]
+    stamps += [datetime.datetime(2025, 3, 31, 23, 59, 59), datetime.datetime(2025, 4, 1)]
+    rows = [(stamp.strftime("%Y-%m-%d %H:%M:%S"), USERS[n % 3], ACTIONS[n // 3 % 3],
+             DETAILS[n % len(DETAILS)]) for n, stamp in enumerate(sorted(stamps))]
+    with transaction() as cur:
+        cur.execute("DELETE FROM activity_log")
+        ids = [cur.execute("INSERT INTO activity_log (timestamp, user, action, details) VALUES (?, ?, ?, ?)", row).lastrowid
+               for row in rows]
+    return [(row_id, *row) for row_id, row in zip(ids, rows)]
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def fts(request, db, monkeypatch):
+    """Runs a test through the FTS5 search and again through the LIKE fallback used when SQLite lacks FTS5."""
+    if request.param:
+        assert db_manager._has_activity_log_fts(db_connection.get_connection())
+    monkeypatch.setitem(db_manager._fts_available, db_connection.DB_PATH, request.param)
+    return request.param
+
+
+def _all_pages(limit=7, **filters):
+    shown, before = [], None
+    while True:
+        page = db_manager.get_activity_log_page(before=before, limit=limit, **filters)
+        shown.extend(page)
+        if len(page) < limit:
+            return shown
+        before = (page[-1][1], page[-1][0])
+
+
+def _expected(entries, user=None, action=None, date_from=None, date_to=None, text=None):
+    return sorted((entry for entry in entries
+                   if (user is None or entry[2] == user) and (action is None or entry[3] == action)
+                   and (date_from is None or entry[1] >= date_from) and (date_to is None or entry[1][:10] <= date_to)
+                   and (text is None or text in entry[4].lower())),
+                  key=lambda entry: (entry[1], entry[0]), reverse=True)
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"user": "kim"},
+    {"action": "LOGIN"},
+    {"date_from": "2025-03-31", "date_to": "2025-03-31"},
+    {"user": "lee", "date_to": "2025-04-01"},
+    {"text": "bob"},
+    # Longer than FTS_MAX_PREFIX: a short FTS prefix narrowed by LIKE, which must drop "chiropractor"
+    {"text": "chiropody"},
+    {"text": "chiro"},
+    {"text": "alice", "user": "sam"},
+    {"text": "alice", "user": "kim", "action": "SAVE FORM", "date_from": "2025-03-31"},
+], ids=repr)
+def test_pages_hold_exactly_the_matching_entries(entries, fts, filters):
+    expected = _expected(entries, **filters)
+    assert expected
+    shown = _all_pages(**filters)
+    assert [entry[0] for entry in shown] == [entry[0] for entry in expected]
+    assert shown == expected
+
+
+def test_date_to_includes_the_whole_day(entries):
+    shown = _all_pages(limit=500, date_from="2025-03-31", date_to="2025-03-31")
+    assert {entry[1] for entry in shown} >= {"2025-03-31 00:00:00", "2025-03-31 23:59:59"}
+    assert all(entry[1].startswith("2025-03-31") for entry in shown)
+
+
+def test_text_search_order_matches_the_timestamp_order(entries, monkeypatch):
+    # The FTS path pages by rowid alone, which is only right while ids follow timestamps
+    by_fts = _all_pages(limit=500, text="saved")
+    monkeypatch.setitem(db_manager._fts_available, db_connection.DB_PATH, False)
+    by_timestamp = _all_pages(limit=500, text="saved")
+    assert by_fts == by_timestamp
+    assert len(by_fts) == len(_expected(entries, text="saved"))
@@ -0,0 +1,98 @@
+import contextlib
+import itertools
+import os
+import sqlite3
+
+import pytest
+
+import audit_writer
+from db_connection import get_connection, transaction
+
+
+@pytest.fixture
+def writer(db):
+    audit_writer.start()
+    yield
+    audit_writer.stop()
+
+
+@pytest.fixture
+def locked(monkeypatch):
+    """Makes every activity_log write fail as if the database stayed locked, until the returned callable is called."""
+    @contextlib.contextmanager
+    def locked_transaction():
+        raise sqlite3.OperationalError("database is locked")
+        yield
+
+    monkeypatch.setattr(audit_writer, "transaction", locked_transaction)
+    return lambda: monkeypatch.setattr(audit_writer, "transaction", transaction)
+
+
+def _entries():
+    return get_connection().execute(
+        "SELECT timestamp, user, action, details FROM activity_log WHERE action = 'TEST' ORDER BY id"
+    ).fetchall()
+
+
+def _journal():
+    path = audit_writer._journal_path()
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_entries_are_written_in_order_with_their_log_time(writer, monkeypatch):
+    seconds = itertools.count()
+    monkeypatch.setattr(audit_writer, "_timestamp", lambda: f"2020-01-01 00:00:{next(seconds):02d}")
+
+    for n in range(5):
+        assert audit_writer.log("Kim", "TEST", f"entry {n}")
+    audit_writer.flush()
+
+    assert _entries() == [(f"2020-01-01 00:00:{n:02d}", "Kim", "TEST", f"entry {n}") for n in range(5)]
+
+
+def test_stop_drains_the_queue(writer):
+    count = audit_writer.BATCH_SIZE * 2 + 1
+    for n in range(count):
+        audit_writer.log("Kim", "TEST", str(n))
+    audit_writer.stop()
+
+    assert not audit_writer.is_running()
+    assert [details for *_, details in _entries()] == [str(n) for n in range(count)]
+
+
+def test_failed_batch_goes_to_the_journal(writer, locked):
+    audit_writer.log("Kim", "TEST", "while locked")
+    audit_writer.flush()
+
+    assert _entries() == []
+    assert len(_journal()) == 1 and "while locked" in _journal()[0]
+
+
+def test_journal_is_replayed_once_by_the_next_batch(writer, locked):
+    audit_writer.log("Kim", "TEST", "first")
+    audit_writer.flush()
+    locked()
+
+    audit_writer.log("Kim", "TEST", "second")
+    audit_writer.flush()
+    audit_writer.log("Kim", "TEST", "third")
+    audit_writer.flush()
+
+    assert [details for *_, details in _entries()] == ["first", "second", "third"]
+    assert _journal() == []
+
+
+def test_journal_is_replayed_once_on_start(writer, locked):
+    audit_writer.log("Kim", "TEST", "before restart")
+    audit_writer.stop()
+    locked()
+
+    audit_writer.start()
+    audit_writer.stop()
+    audit_writer.start()
+
+    assert [details for *_, details in _entries()] == ["before restart"]
+    assert _journal() == []
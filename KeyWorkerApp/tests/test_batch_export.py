@@ -0,0 +1,55 @@
+import pytest
+
+import batch_export
+import database_utils as db_manager
+import icon_assets
+import pdf_generator
+
+
+@pytest.fixture(autouse=True)
+def icon_cache(tmp_path, monkeypatch):
+    # Worker processes are forked from this one, so they see the patched folder too
+    monkeypatch.setattr(icon_assets, "CACHE_DIR", str(tmp_path / "icon_cache"))
+
+
+@pytest.fixture
+def month_forms(db):
+    """Three service users with a March 2025 form (one long enough to run over a page) and one with only February's."""
+    for name in ("Alice Smith", "Bob Jones", "Carol White", "Dan Brown"):
+        db_manager.add_service_user_db(name, "01/01/1950")
+    users = {name: service_user_id for service_user_id, name, _ in db_manager.get_all_service_users()}
+    for name, month in [("Alice Smith", "March 2025"), ("Bob Jones", "March 2025"), ("Carol White", "March 2025"),
+                        ("Dan Brown", "February 2025"), ("Alice Smith", "February 2025")]:
+        form = {"service_user_id": users[name], "service_user_name": name, "form_month_year": month,
+                "key_worker_name": "Kim"}
+        appointments = [(f"Clinic {n}", "2025-02-01", "2025-08-01", "No") for n in range(80 if name == "Bob Jones" else 1)]
+        db_manager.save_complete_form(form, appointments, "Kim")
+    return ["Alice Smith", "Bob Jones", "Carol White"]
+
+
+def _page_count(path):
+    import pymupdf
+    with pymupdf.open(path) as pdf:
+        return pdf.page_count
+
+
+def test_per_user_export_writes_one_pdf_per_form(month_forms, tmp_path):
+    output = tmp_path / "per_user"
+    assert batch_export.main(["march", "2025", str(output), "--workers", "1"]) == 0
+
+    expected = {pdf_generator.pdf_file_name({"service_user_name": name, "month": "March", "year": "2025"})
+                for name in month_forms}
+    assert {path.name for path in output.iterdir()} == expected
+    assert all(path.read_bytes().startswith(b"%PDF") for path in output.iterdir())
+
+
+def test_merged_export_holds_every_users_pages(month_forms, tmp_path):
+    pytest.importorskip("pymupdf")
+    per_user, merged = tmp_path / "per_user", tmp_path / "merged"
+    assert batch_export.main(["March", "2025", str(per_user), "--workers", "1"]) == 0
+    assert batch_export.main(["March", "2025", str(merged), "--merged", "--workers", "1"]) == 0
+
+    assert [path.name for path in merged.iterdir()] == ["Key_Worker_Forms_March_2025.pdf"]
+    page_counts = [_page_count(path) for path in per_user.iterdir()]
+    assert max(page_counts) > min(page_counts)
+    assert _page_count(merged / "Key_Worker_Forms_March_2025.pdf") == sum(page_counts)
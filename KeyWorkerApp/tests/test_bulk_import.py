@@ -0,0 +1,116 @@
+import csv
+import zipfile
+
+import pytest
+
+import bulk_import
+import database_utils as db_manager
+from db_connection import get_connection
+
+
+def test_imports_service_user_with_form_and_appointment(db, tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text("Service User Name,DOB,Month,weight,appointment_1_name,appointment_1_next_due\n"
+                    "Alice,01/01/1950,March 2025,70kg,Dentist,01/05/2025\n", encoding="utf-8")
+
+    result = bulk_import.import_file(str(path))
+
+    assert (result.rows, result.service_users_added, result.forms, result.appointments, result.bad_rows) == (1, 1, 1, 1, 0)
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    form, appointments = db_manager.get_form_with_appointments(service_user_id, "March 2025")
+    assert form["weight"] == "70kg"
+    assert appointments == [("Dentist", "", "2025-05-01", "N/A")]
+
+
+def _not_a_zip(path):
+    path.write_bytes(b"service_user_name\nAlice\n")
+
+
+def _truncated_zip(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("xl/workbook.xml", "<workbook/>" * 100)
+    path.write_bytes(path.read_bytes()[:40])
+
+
+def _zip_without_workbook(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("readme.txt", "not a workbook")
+
+
+@pytest.mark.parametrize("make_file", [_not_a_zip, _truncated_zip, _zip_without_workbook])
+def test_corrupt_workbook_raises_value_error(db, tmp_path, make_file):
+    path = tmp_path / "corrupt.xlsx"
+    make_file(path)
+    with pytest.raises(ValueError, match="not a readable Excel workbook"):
+        bulk_import.import_file(str(path))
+
+
+def test_unparseable_csv_raises_value_error(db, tmp_path):
+    path = tmp_path / "corrupt.csv"
+    path.write_text("service_user_name\n\"" + "x" * (csv.field_size_limit() + 1) + "\"\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="not a readable CSV file"):
+        bulk_import.import_file(str(path))
+
+
+def test_command_line_reports_corrupt_file(db, tmp_path, capsys):
+    path = tmp_path / "corrupt.xlsx"
+    _not_a_zip(path)
+    assert bulk_import.main([str(path)]) == 1
+    assert "Could not import" in capsys.readouterr().out
+
+
+MULTI_BATCH_CSV = """\
+name,DOB,Month,weight,appointment_1_name,appointment_1_next_due,appointment_1_booked
+Alice,01/01/1950,January 2025,70kg,GP,01/05/2025,Yes
+Bob,02/02/1950,January 2025,80kg,,,
+,03/03/1950,January 2025,,,,
+Carol,,,,,,
+Alice,01/01/1950,February 2025,71kg,Dentist,01/06/2025,No
+Dan,04/04/1950,Smarch 2025,60kg,,,
+Bob,02/02/1950,February 2025,81kg,GP,,maybe
+Alice,01/01/1951,January 2025,70.5kg,Optician,,
+Alice,01/01/1951,February 2025,72kg,Chiropodist,,No
+Eve,05/05/1950,March 2025,55kg,GP,01/07/2025,No
+"""
+
+
+def test_multi_batch_import_counts_rows_and_reports_invalid_ones(db, tmp_path, monkeypatch):
+    path, errors_path = tmp_path / "history.csv", tmp_path / "errors.csv"
+    path.write_text(MULTI_BATCH_CSV, encoding="utf-8")
+    clears = []
+    monkeypatch.setattr(bulk_import.form_cache, "clear", lambda: clears.append(True))
+
+    # Seven valid rows in batches of three: Alice's January form is replaced across batches,
+    # her February form twice within the second batch
+    result = bulk_import.import_file(str(path), errors_path=str(errors_path), batch_size=3)
+
+    assert len(clears) == 3
+    assert (result.rows, result.service_users_added, result.service_users_updated) == (10, 4, 1)
+    assert (result.forms, result.appointments, result.bad_rows) == (6, 5, 3)
+    assert result.errors == [
+        (4, "service_user_name is empty"),
+        (7, "form_month_year 'Smarch 2025' is not a month like 'March 2025'"),
+        (8, "appointment 1 booked must be Yes, No or N/A"),
+    ]
+    with open(errors_path, newline="", encoding="utf-8-sig") as f:
+        report = list(csv.reader(f))
+    assert report[0] == ["row", "error", "name", "DOB", "Month", "weight",
+                         "appointment_1_name", "appointment_1_next_due", "appointment_1_booked"]
+    assert [row[:2] for row in report[1:]] == [[str(number), message] for number, message in result.errors]
+    assert report[2][2:] == ["Dan", "04/04/1950", "Smarch 2025", "60kg", "", "", ""]
+
+    users = {name: (service_user_id, dob) for service_user_id, name, dob in db_manager.get_all_service_users()}
+    assert sorted(users) == ["Alice", "Bob", "Carol", "Eve"]
+    assert users["Alice"][1] == "1951-01-01"
+    forms = {(name, month): db_manager.get_form_with_appointments(users[name][0], month)
+             for name, month in [("Alice", "January 2025"), ("Alice", "February 2025"), ("Bob", "January 2025"),
+                                 ("Eve", "March 2025")]}
+    assert {key: (form["weight"], appointments) for key, (form, appointments) in forms.items()} == {
+        ("Alice", "January 2025"): ("70.5kg", [("Optician", "", "", "N/A")]),
+        ("Alice", "February 2025"): ("72kg", [("Chiropodist", "", "", "No")]),
+        ("Bob", "January 2025"): ("80kg", []),
+        ("Eve", "March 2025"): ("55kg", [("GP", "", "2025-07-01", "No")]),
+    }
+    con = get_connection()
+    assert con.execute("SELECT count(*) FROM forms").fetchone()[0] == 4
+    assert con.execute("SELECT count(*) FROM appointments").fetchone()[0] == 3
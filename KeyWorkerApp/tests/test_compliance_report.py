@@ -0,0 +1,38 @@
+import pytest
+
+import compliance_report
+import database_utils as db_manager
+from db_connection import transaction
+
+ALL_DONE = {"nails_check": "No", "hair_check": "No", "mar_sheets_check": "Yes",
+            "health_plan_file": "Yes", "family_comm_made": "Yes"}
+
+
+def _save_march_form(**answers):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    answers = dict(ALL_DONE, **answers)
+    with transaction() as cur:
+        cur.execute(f"INSERT INTO forms (service_user_id, form_month_year, {', '.join(answers)}) "
+                    f"VALUES (?, 'March 2025', {', '.join('?' * len(answers))})", [service_user_id, *answers.values()])
+
+
+def test_form_with_nothing_outstanding_is_not_listed(db):
+    _save_march_form()
+    assert compliance_report.missed_checks("2025-03", "2025-03").rows == []
+
+
+@pytest.mark.parametrize("column, label, outstanding", [
+    ("nails_check", "Nails cut needed", "Yes"),
+    ("hair_check", "Hair cut needed", "Yes"),
+    ("mar_sheets_check", "MAR sheets", "No"),
+    ("health_plan_file", "Health plan", "No"),
+    ("family_comm_made", "Family contact", "No"),
+])
+def test_each_check_is_flagged_on_its_outstanding_answer(db, column, label, outstanding):
+    _save_march_form(**{column: outstanding})
+    assert compliance_report.missed_checks("2025-03", "2025-03").rows == [("March 2025", "Alice", label)]
+
+    summary = compliance_report.check_summary("2025-03", "2025-03")
+    counts = dict(zip(summary.headers, summary.rows[0]))
+    assert counts[next(header for header in summary.headers if header.startswith(label))] == 0
@@ -0,0 +1,89 @@
+import sqlite3
+import zipfile
+
+import pytest
+
+import database
+import database_archive
+import database_utils as db_manager
+import db_connection
+import form_cache
+
+
+def _populate():
+    for name in ("Alice", "Bob"):
+        db_manager.add_service_user_db(name, "01/01/1950")
+    for service_user_id, name, *_ in db_manager.get_all_service_users():
+        for month in ("January 2025", "February 2025"):
+            form = {"service_user_id": service_user_id, "service_user_name": name, "form_month_year": month,
+                    "key_worker_name": "Kim", "weight": "70kg", "bp": "120/80", "other_notes": f"{name} – café visit"}
+            db_manager.save_complete_form(form, [("GP", "", "2025-04-01", "No"), ("Dentist", "", "", "N/A")], "Kim")
+    db_manager.log_activity("Kim", "TEST", "chiropody appointment booked")
+
+
+def _dump(path):
+    """Every row of every table that an archive carries, keyed by table name."""
+    con = sqlite3.connect(path)
+    try:
+        _, tables = database_archive._schema_objects(con)
+        return {table: con.execute(f'SELECT * FROM "{table}" ORDER BY rowid').fetchall() for table in tables}
+    finally:
+        con.close()
+
+
+@pytest.fixture
+def archive(db, tmp_path):
+    _populate()
+    path = str(tmp_path / "archive.zip")
+    database_archive.export_archive(path)
+    return path
+
+
+def test_restore_into_a_fresh_database_round_trips_every_row(db, archive, tmp_path):
+    exported = _dump(db)
+    assert exported["forms"] and exported["appointments"] and exported["activity_log"]
+
+    fresh = str(tmp_path / "fresh.db")
+    db_connection.set_db_path(fresh)
+    form_cache.clear()
+    database.initialize_db()
+    database_archive.restore_archive(archive)
+
+    assert _dump(fresh) == exported
+    # The full-text index is rebuilt, and searched, in the restored database
+    entries = db_manager.get_activity_log_page(text="chiropody")
+    assert [details for *_, details in entries] == ["chiropody appointment booked"]
+
+
+def _rewrite_member(path, member, change):
+    with zipfile.ZipFile(path) as source:
+        contents = {name: source.read(name) for name in source.namelist()}
+    contents[member] = change(contents[member])
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as target:
+        for name, data in contents.items():
+            target.writestr(name, data)
+
+
+def _edit_member(path):
+    _rewrite_member(path, "tables/forms.jsonl", lambda data: data.replace(b"70kg", b"90kg", 1))
+
+
+def _truncate_member(path):
+    _rewrite_member(path, "tables/appointments.jsonl", lambda data: data[:len(data) // 2])
+
+
+def _truncate_file(path):
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) // 2)
+
+
+@pytest.mark.parametrize("damage", [_edit_member, _truncate_member, _truncate_file])
+def test_damaged_archive_is_refused_and_leaves_the_live_database_alone(db, archive, damage):
+    damage(archive)
+    db_manager.log_activity("Kim", "TEST", "after the export")
+    before = _dump(db)
+
+    with pytest.raises(database_archive.ArchiveError):
+        database_archive.restore_archive(archive)
+
+    assert _dump(db) == before
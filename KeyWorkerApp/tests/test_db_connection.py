@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+
+import pytest
+
+import db_connection
+from db_connection import get_connection, transaction
+
+
+def _log_count(path):
+    # A separate connection only ever sees what has been committed
+    other = sqlite3.connect(path)
+    try:
+        return other.execute("SELECT count(*) FROM activity_log").fetchone()[0]
+    finally:
+        other.close()
+
+
+def _insert(cur, action):
+    cur.execute("INSERT INTO activity_log (user, action) VALUES ('test', ?)", (action,))
+
+
+def test_nested_transaction_commits_only_when_the_outermost_exits(db):
+    with transaction() as outer:
+        _insert(outer, "outer")
+        with transaction() as inner:
+            _insert(inner, "inner")
+        assert _log_count(db) == 0
+        assert get_connection().in_transaction
+    assert _log_count(db) == 2
+
+
+def test_exception_in_nested_transaction_rolls_back_the_outer_one(db):
+    with pytest.raises(RuntimeError):
+        with transaction() as outer:
+            _insert(outer, "outer")
+            with transaction() as inner:
+                _insert(inner, "inner")
+                raise RuntimeError("inner failed")
+    assert _log_count(db) == 0
+    assert not get_connection().in_transaction
+    # The next transaction starts afresh rather than joining the failed one
+    with transaction() as cur:
+        _insert(cur, "after")
+    assert _log_count(db) == 1
+
+
+def _connection_in_thread(result, key):
+    result[key] = get_connection()
+
+
+def test_each_thread_gets_its_own_connection(db):
+    assert get_connection() is get_connection()
+    connections = {}
+    threads = [threading.Thread(target=_connection_in_thread, args=(connections, n)) for n in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(con) for con in [get_connection(), *connections.values()]}) == 3
+
+
+def test_close_all_replaces_every_threads_stale_connection(db):
+    asked, answered, connections = threading.Event(), threading.Event(), []
+
+    def worker():
+        connections.append(get_connection())
+        answered.set()
+        asked.wait()
+        connections.append(get_connection())
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    answered.wait()
+    main_before = get_connection()
+
+    db_connection.close_all()
+    asked.set()
+    thread.join()
+
+    assert get_connection() is not main_before
+    assert connections[1] is not connections[0]
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+    assert connections[1].execute("SELECT count(*) FROM activity_log").fetchone()
+
+
+def test_set_db_path_reconnects_to_the_new_file(db, tmp_path):
+    before = get_connection()
+    other_path = str(tmp_path / "other.db")
+    db_connection.set_db_path(other_path)
+
+    con = get_connection()
+    assert con is not before
+    assert con.execute("PRAGMA database_list").fetchone()[2] == other_path
@@ -0,0 +1,39 @@
+import datetime
+
+import pytest
+
+import compliance_report
+import database_utils as db_manager
+
+appointments_panel = pytest.importorskip("appointments_panel")
+
+
+def _latest_form_with_appointments(appointments):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    db_manager.save_complete_form({"service_user_id": service_user_id, "service_user_name": "Alice",
+                                   "form_month_year": "March 2025"}, appointments, "supervisor")
+
+
+def test_free_text_next_due_is_not_listed_as_due(db):
+    # Left as-is by the DD/MM/YYYY migration, and '1/6/2025' sorts between '0000-01-01' and any ISO date
+    _latest_form_with_appointments([("GP", "", "2025-04-01", "No"), ("Dentist", "", "1/6/2025", "No"),
+                                    ("Optician", "", "after Easter", "No")])
+
+    rows = db_manager.get_due_appointments("2025-12-31")
+    assert [(row[3], row[5]) for row in rows] == [("GP", "2025-04-01")]
+
+    overdue = compliance_report.overdue_appointments("2025-03", as_of="2025-06-01")
+    assert [row[2] for row in overdue.rows] == ["GP"]
+
+
+def test_due_status():
+    today = datetime.date(2025, 3, 10)
+    assert appointments_panel.due_status("2025-03-10", today) == "Due today"
+    assert appointments_panel.due_status("2025-03-09", today) == "Overdue 1 day"
+    assert appointments_panel.due_status("2025-03-22", today) == "In 12 days"
+
+
+@pytest.mark.parametrize("next_due", ["1/6/2025", "after Easter", "", None])
+def test_due_status_of_free_text_is_invalid_date(next_due):
+    assert appointments_panel.due_status(next_due, datetime.date(2025, 3, 10)) == "Invalid date"
@@ -0,0 +1,46 @@
+import sqlite3
+
+import database_utils as db_manager
+import form_cache
+
+
+def _add_service_user(name="Alice"):
+    db_manager.add_service_user_db(name, "01/01/1950")
+    return next(row[0] for row in db_manager.get_all_service_users() if row[1] == name)
+
+
+def test_cached_missing_month_sees_form_saved_by_another_connection(db):
+    service_user_id = _add_service_user()
+    db_manager.prefetch_adjacent_forms(service_user_id, "March", "2025").result()
+    assert db_manager.get_form_with_appointments(service_user_id, "April 2025") == (None, [])
+
+    # Another key worker's session saves April while this one has it cached as missing
+    other = sqlite3.connect(db)
+    with other:
+        other.execute("INSERT INTO forms (service_user_id, form_month_year, key_worker_name) VALUES (?, 'April 2025', 'Bob')",
+                      (service_user_id,))
+        form_id = other.execute("SELECT id FROM forms WHERE form_month_year = 'April 2025'").fetchone()[0]
+        other.execute("INSERT INTO appointments (form_id, name, next_due) VALUES (?, 'Dentist', '2025-05-01')", (form_id,))
+    other.close()
+
+    form, appointments = db_manager.get_form_with_appointments(service_user_id, "April 2025")
+    assert form["key_worker_name"] == "Bob"
+    assert appointments == [("Dentist", None, "2025-05-01", None)]
+
+
+def test_fresh_read_skips_the_cache(db):
+    service_user_id = _add_service_user()
+    db_manager.get_form_with_appointments(service_user_id, "April 2025")
+    hits = form_cache.stats()["hits"]
+
+    assert db_manager.get_form_with_appointments(service_user_id, "April 2025", fresh=True) == (None, [])
+    assert form_cache.stats()["hits"] == hits
+
+
+def test_unchanged_database_is_served_from_the_cache(db):
+    service_user_id = _add_service_user()
+    db_manager.get_form_with_appointments(service_user_id, "April 2025")
+    hits = form_cache.stats()["hits"]
+
+    db_manager.get_form_with_appointments(service_user_id, "April 2025")
+    assert form_cache.stats()["hits"] == hits + 1
@@ -0,0 +1,109 @@
+import sqlite3
+
+import pytest
+
+import database
+import database_utils as db_manager
+import db_connection
+import form_drafts
+from db_connection import get_connection, transaction
+
+APPOINTMENTS = [("GP", "2025-02-01", "2025-08-01", "No")]
+
+
+@pytest.fixture
+def alice(db):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    return db_manager.get_all_service_users()[0][0]
+
+
+def _form(service_user_id, **fields):
+    return dict({"service_user_id": service_user_id, "service_user_name": "Alice", "form_month_year": "March 2025",
+                 "key_worker_name": "Kim", "weight": "70kg"}, **fields)
+
+
+def _draft_count():
+    return get_connection().execute("SELECT count(*) FROM form_drafts").fetchone()[0]
+
+
+def test_saved_draft_is_read_back(alice):
+    form_drafts.save_draft(alice, "2025-03", "kim", _form(alice), APPOINTMENTS)
+    form_drafts.flush()
+
+    draft = form_drafts.get_draft(alice, "2025-03")
+    assert draft["form"] == _form(alice)
+    assert draft["appointments"] == APPOINTMENTS
+    assert draft["saved_by"] == "kim"
+    assert len(draft["saved_at"]) == len("2025-03-01 12:00:00")
+    assert form_drafts.get_draft(alice, "2025-04") is None
+
+
+def test_later_draft_replaces_the_earlier_one(alice):
+    form_drafts.save_draft(alice, "2025-03", "kim", _form(alice), APPOINTMENTS)
+    form_drafts.save_draft(alice, "2025-03", "lee", _form(alice, weight="72kg"), [])
+    form_drafts.save_draft(alice, "2025-04", "kim", _form(alice, form_month_year="April 2025"), [])
+    form_drafts.flush()
+
+    draft = form_drafts.get_draft(alice, "2025-03")
+    assert (draft["saved_by"], draft["form"]["weight"], draft["appointments"]) == ("lee", "72kg", [])
+    assert form_drafts.get_draft(alice, "2025-04")["form"]["form_month_year"] == "April 2025"
+    assert _draft_count() == 2
+
+
+def test_discard_runs_after_queued_writes(alice):
+    form_drafts.save_draft(alice, "2025-03", "kim", _form(alice), APPOINTMENTS)
+    form_drafts.discard_draft(alice, "2025-03")
+    form_drafts.flush()
+
+    assert form_drafts.get_draft(alice, "2025-03") is None
+
+
+def test_unsaved_draft_is_found_after_a_restart_until_the_form_is_saved(alice):
+    form_drafts.save_draft(alice, "2025-03", "kim", _form(alice, weight="72kg"), APPOINTMENTS)
+    form_drafts.flush()
+    # What a crash leaves behind: the next session opens fresh connections and looks the draft up again
+    db_connection.close_all()
+    draft = form_drafts.get_draft(alice, "2025-03")
+    assert draft["form"]["weight"] == "72kg"
+
+    form_id = db_manager.save_complete_form(draft["form"], draft["appointments"], "kim")
+    assert form_id
+    assert form_drafts.get_draft(alice, "2025-03") is None
+
+    form_drafts.save_draft(alice, "2025-03", "kim", _form(alice, weight="73kg"), APPOINTMENTS)
+    form_drafts.flush()
+    db_manager.save_form_changes(form_id, _form(alice, weight="73kg"), ["weight"], None, "kim")
+    assert form_drafts.get_draft(alice, "2025-03") is None
+
+
+def test_migration_rekeys_label_keyed_drafts_by_period(tmp_path, monkeypatch):
+    original = db_connection.DB_PATH
+    db_connection.set_db_path(str(tmp_path / "version8.db"))
+    try:
+        with monkeypatch.context() as patch:
+            patch.setattr(database, "MIGRATIONS", database.MIGRATIONS[:8])
+            patch.setattr(database, "SCHEMA_VERSION", 8)
+            database.initialize_db()
+        with transaction() as cur:
+            cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES ('Alice', '01/01/1950')")
+            alice = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO form_drafts (service_user_id, form_month_year, saved_at, saved_by, data) VALUES (?, ?, ?, ?, ?)",
+                [(alice, "March 2025", "2025-03-02 10:00:00", "kim", '{"form": {"weight": "70kg"}, "appointments": []}'),
+                 (alice, "march 2025", "2025-03-03 10:00:00", "lee", '{"form": {"weight": "71kg"}, "appointments": []}'),
+                 (alice, "April 2025", "2025-04-02 10:00:00", "kim", '{"form": {"weight": "72kg"}, "appointments": []}'),
+                 (alice, "Spring", "2025-04-03 10:00:00", "kim", '{"form": {}, "appointments": []}')]
+            )
+
+        database.initialize_db()
+
+        assert database.get_schema_version() == database.SCHEMA_VERSION
+        assert get_connection().execute(
+            "SELECT period, saved_by FROM form_drafts ORDER BY period"
+        ).fetchall() == [("2025-03", "lee"), ("2025-04", "kim")]
+        assert form_drafts.get_draft(alice, "2025-03")["form"] == {"weight": "71kg"}
+        with pytest.raises(sqlite3.IntegrityError):
+            with transaction() as cur:
+                cur.execute("INSERT INTO form_drafts (service_user_id, period, data) VALUES (?, '2025-04', '{}')", (alice,))
+    finally:
+        db_connection.set_db_path(original)
@@ -0,0 +1,95 @@
+import pytest
+
+import database
+import database_utils as db_manager
+import db_connection
+from db_connection import get_connection, transaction
+
+# Free-text weight and BP as typed into legacy forms, with the typed columns migration 7 should derive
+VITALS = [
+    ("70kg", "120/80", 70.0, 120, 80),
+    ("70.5", "120 / 80 mmHg", 70.5, 120, 80),
+    ("11st 4lb", "135/85", 71.7, 135, 85),
+    ("11 st", "bp 120/80", 69.9, None, None),
+    ("154 lbs", "n/a", 69.9, None, None),
+    ("n/a", "", None, None, None),
+    ("", "refused", None, None, None),
+    ("0", "0/0", None, None, None),
+]
+
+
+def _months(count):
+    return [db_manager.period_label(db_manager.shift_period("2025-01", offset)) for offset in range(count)]
+
+
+def _typed(form_id):
+    return get_connection().execute(
+        "SELECT weight_kg, bp_systolic, bp_diastolic FROM forms WHERE id = ?", (form_id,)
+    ).fetchone()
+
+
+@pytest.fixture
+def version_6_db(tmp_path, monkeypatch):
+    """A database migrated only as far as version 6, the last one without the typed vitals columns."""
+    original = db_connection.DB_PATH
+    db_connection.set_db_path(str(tmp_path / "version6.db"))
+    with monkeypatch.context() as patch:
+        patch.setattr(database, "MIGRATIONS", database.MIGRATIONS[:6])
+        patch.setattr(database, "SCHEMA_VERSION", 6)
+        database.initialize_db()
+    yield
+    db_connection.set_db_path(original)
+
+
+def test_migration_parses_legacy_free_text_vitals(version_6_db):
+    with transaction() as cur:
+        cur.execute("INSERT INTO service_users (name, date_of_birth) VALUES ('Alice', '01/01/1950')")
+        service_user_id = cur.lastrowid
+        form_ids = []
+        for month, (weight, bp, *_) in zip(_months(len(VITALS)), VITALS):
+            cur.execute("INSERT INTO forms (service_user_id, form_month_year, weight, bp) VALUES (?, ?, ?, ?)",
+                        (service_user_id, month, weight, bp))
+            form_ids.append(cur.lastrowid)
+
+    database.initialize_db()
+
+    assert database.get_schema_version() == database.SCHEMA_VERSION
+    assert [list(_typed(form_id)) for form_id in form_ids] == [typed for _, _, *typed in VITALS]
+
+
+def test_triggers_keep_the_typed_columns_in_step(db):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    form = {"service_user_id": service_user_id, "service_user_name": "Alice", "form_month_year": "January 2025",
+            "weight": "70kg", "bp": "120/80"}
+    form_id = db_manager.save_form_data_db(form)
+    assert tuple(_typed(form_id)) == (70.0, 120, 80)
+
+    for weight, bp, *typed in VITALS:
+        with transaction() as cur:
+            cur.execute("UPDATE forms SET weight = ?, bp = ? WHERE id = ?", (weight, bp, form_id))
+        assert list(_typed(form_id)) == typed, (weight, bp)
+
+    # Updating only one of the two leaves the other's typed value alone
+    with transaction() as cur:
+        cur.execute("UPDATE forms SET weight = '80kg' WHERE id = ?", (form_id,))
+    with transaction() as cur:
+        cur.execute("UPDATE forms SET bp = '110/70' WHERE id = ?", (form_id,))
+    assert tuple(_typed(form_id)) == (80.0, 110, 70)
+
+
+def test_vitals_trend_is_ordered_and_skips_forms_without_readings(db):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    db_manager.add_service_user_db("Bob", "01/01/1950")
+    alice, bob = [row[0] for row in db_manager.get_all_service_users()]
+    months = _months(len(VITALS))
+    # Saved newest first, so the order has to come from the query
+    for month, (weight, bp, *_) in reversed(list(zip(months, VITALS))):
+        db_manager.save_form_data_db({"service_user_id": alice, "form_month_year": month, "weight": weight, "bp": bp})
+    db_manager.save_form_data_db({"service_user_id": bob, "form_month_year": months[0], "weight": "99kg", "bp": "99/99"})
+
+    periods = [db_manager.form_period(month) for month in months]
+    expected = [(period, *typed) for period, (_, _, *typed) in zip(periods, VITALS) if any(v is not None for v in typed)]
+    assert db_manager.get_vitals_trend(alice, periods[0], periods[-1]) == expected
+    # Both ends of the range are inclusive
+    assert db_manager.get_vitals_trend(alice, periods[1], periods[2]) == expected[1:3]
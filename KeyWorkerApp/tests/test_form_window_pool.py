@@ -0,0 +1,129 @@
+import tkinter
+
+import pytest
+
+ctk = pytest.importorskip("customtkinter")
+
+import database_utils as db_manager  # noqa: E402
+import form_drafts  # noqa: E402
+from form_window import FormWindow, FormWindowPool  # noqa: E402
+
+USER = {"id": 1, "username": "supervisor", "role": "supervisor"}
+BLANK_ANSWERS = ("", "No")
+
+
+@pytest.fixture
+def root(monkeypatch):
+    try:
+        window = ctk.CTk()
+    except tkinter.TclError as e:
+        pytest.skip(f"no display: {e}")
+    window.withdraw()
+    # X11 refuses a grab on a window that has not been mapped yet, which it may not be without an event loop
+    monkeypatch.setattr(FormWindow, "grab_set", lambda self: None)
+    yield window
+    window.destroy()
+
+
+def _service_user(name):
+    db_manager.add_service_user_db(name, "01/01/1950")
+    return next(row[0] for row in db_manager.get_all_service_users() if row[1] == name)
+
+
+def _saved_form(service_user_id, name, form_month_year, appointments=(), **fields):
+    db_manager.save_complete_form(
+        dict(fields, service_user_id=service_user_id, service_user_name=name, form_month_year=form_month_year),
+        list(appointments), "supervisor"
+    )
+    form, _ = db_manager.get_form_with_appointments(service_user_id, form_month_year, fresh=True)
+    return form
+
+
+def _open_alice_march_and_close(root):
+    """Opens Alice's March form in a pooled window, leaves every kind of state behind, and closes it."""
+    alice = _service_user("Alice")
+    form = _saved_form(alice, "Alice", "March 2025", [("Dentist", "", "2025-05-01", "No")],
+                       key_worker_name="Kim", weight="70kg", nails_check="Yes", nails_date="01/03/2025",
+                       finance_cash_box="20.00", shop_q1_toiletries="Yes", current_goal="Walk daily",
+                       feeling_icons_selected="Happy", care_icons_selected="Bath")
+    # An autosaved draft makes the window schedule its "restore draft?" question
+    form_drafts.save_draft(alice, "2025-03", "supervisor", dict(form, weight="71kg"), [])
+    form_drafts.flush()
+
+    pool = FormWindowPool(root)
+    window = pool.open(alice, "Alice", "01/01/1950", "March", "2025", form_data=form, current_user=USER)
+    assert window.draft_offer_id is not None
+    window._build_tab("My Finances")
+    window.tab_view.set("My Finances")
+    window.weight_entry.insert("end", "!")
+    window._schedule_autosave()
+    window.close()
+    assert pool.idle_window is window
+    return pool, window
+
+
+def _assert_loaded_cleanly(window):
+    assert window.autosave_id is None
+    assert window.draft_offer_id is None
+    assert window.last_draft is None
+    assert window.pdf_job is None
+    assert window.tab_view.get() == "My Health"
+    # What was loaded is what would be saved: nothing counts as changed yet
+    assert window._changes_since_saved(*window._form_snapshot()) == ([], False)
+
+
+def test_reopen_for_a_new_form_leaves_nothing_from_the_last_one(db, root):
+    pool, window = _open_alice_march_and_close(root)
+    bob = _service_user("Bob")
+
+    reused = pool.open(bob, "Bob", "02/02/1960", "April", "2025", current_user=USER)
+
+    assert reused is window
+    assert pool.idle_window is None
+    assert window.form_id is None and window.form_data is None
+    assert window.title() == "Key Worker Form - Bob - April 2025"
+    _assert_loaded_cleanly(window)
+    data, appointments = window._form_snapshot()
+    assert (data["service_user_id"], data["form_month_year"]) == (bob, "April 2025")
+    leftovers = {col: data[col] for col in db_manager.FORM_COLUMNS
+                 if col not in ("service_user_id", "form_month_year", "session_datetime") and data[col] not in BLANK_ANSWERS}
+    assert leftovers == {}
+    assert appointments == [] and window.appointment_rows == []
+    assert window.saved_form == (data, appointments)
+    # The built tab keeps its widgets, emptied; the rest hold blank values until they are built
+    assert "My Finances" in window.built_tabs and window.finance_cash_box_entry.get() == ""
+    assert window.pending_tab_values == {tab: {} for tab in window.LAZY_TAB_FIELDS if tab not in window.built_tabs}
+
+
+def test_reopen_for_another_month_shows_only_that_form(db, root):
+    pool, window = _open_alice_march_and_close(root)
+    alice = window.service_user_id
+    april = _saved_form(alice, "Alice", "April 2025", [("GP", "", "2025-06-01", "Yes")],
+                        key_worker_name="Lee", session_datetime="2025-04-10", weight="68kg", hair_check="Yes")
+
+    reused = pool.open(alice, "Alice", "01/01/1950", "April", "2025", form_data=april, current_user=USER)
+
+    assert reused is window and window.form_id == april["id"]
+    _assert_loaded_cleanly(window)
+    data, appointments = window._form_snapshot()
+    assert (data["key_worker_name"], data["weight"], data["hair_check"], data["session_datetime"]) == ("Lee", "68kg", "Yes", "2025-04-10")
+    # Set on March's form but not on April's
+    assert (data["nails_check"], data["nails_date"], data["finance_cash_box"], data["shop_q1_toiletries"], data["current_goal"]) == ("No", "", "", "No", "")
+    assert (data["feeling_icons_selected"], data["care_icons_selected"]) == ("", "")
+    assert appointments == [("GP", "", "2025-06-01", "Yes")]
+
+
+def test_saving_a_reused_window_writes_the_new_form(db, root):
+    pool, window = _open_alice_march_and_close(root)
+    bob = _service_user("Bob")
+    pool.open(bob, "Bob", "02/02/1960", "April", "2025", current_user=USER)
+
+    window.weight_entry.insert(0, "80kg")
+    window.save_form(show_success_message=False)
+
+    form = db_manager.get_form_data(bob, "April 2025")
+    assert form is not None and form["id"] == window.form_id
+    assert (form["weight"], form["key_worker_name"], form["finance_cash_box"]) == ("80kg", "", "")
+    # Alice's March form is untouched by anything the window held for it
+    alice = next(row[0] for row in db_manager.get_all_service_users() if row[1] == "Alice")
+    assert db_manager.get_form_data(alice, "March 2025")["weight"] == "70kg"
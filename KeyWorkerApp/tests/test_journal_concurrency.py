@@ -0,0 +1,104 @@
+"""Readers in other processes against a writer holding a long transaction, per journal profile."""
+import multiprocessing
+import time
+
+import pytest
+
+import database
+import db_connection
+
+HOLD_SECONDS = 1.5
+READERS = 3
+# A read that waits on the writer takes about HOLD_SECONDS; one that does not takes well under a millisecond
+MAX_WAL_READ_SECONDS = 0.5
+
+
+def _writer(path, profile, started, spilled, committing):
+    db_connection.JOURNAL_PROFILE = profile
+    db_connection.set_db_path(path)
+    # A tiny page cache makes the batch spill to disk mid-transaction, which is when a
+    # rollback-journal writer takes the exclusive lock, as a large save does in the app
+    db_connection.get_connection().execute("PRAGMA cache_size = 50")
+    started.wait()
+    with db_connection.transaction() as cur:
+        cur.executemany("INSERT INTO activity_log (user, action, details) VALUES (?, ?, ?)",
+                        [("writer", "SAVE FORM", "x" * 500)] * 5000)
+        spilled.set()
+        time.sleep(HOLD_SECONDS)
+        committing.set()
+
+
+def _reader(path, profile, started, spilled, committing, results):
+    db_connection.JOURNAL_PROFILE = profile
+    db_connection.set_db_path(path)
+    con = db_connection.get_connection()
+    con.execute("SELECT 1 FROM activity_log LIMIT 1").fetchone()
+    started.wait()
+    spilled.wait()
+    reads = []
+    while not committing.is_set():
+        start = time.perf_counter()
+        con.execute("SELECT count(*) FROM activity_log").fetchone()
+        # (latency, finished while the writer still held its transaction)
+        reads.append((time.perf_counter() - start, not committing.is_set()))
+    results.put(reads)
+
+
+def _run(tmp_path, monkeypatch, profile):
+    """Runs one writer and READERS reader processes; returns each reader's (latency, during_write) reads."""
+    path = str(tmp_path / f"{profile}.db")
+    original = db_connection.DB_PATH
+    monkeypatch.setattr(db_connection, "JOURNAL_PROFILE", profile)
+    db_connection.set_db_path(path)
+    try:
+        database.initialize_db()
+        mode = db_connection.get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        db_connection.set_db_path(original)
+
+    # Spawned, not forked, so no process inherits this one's open connections
+    context = multiprocessing.get_context("spawn")
+    # Every process has started and connected before the writer begins
+    started = context.Barrier(READERS + 1)
+    spilled, committing, results = context.Event(), context.Event(), context.Queue()
+    procs = [context.Process(target=_writer, args=(path, profile, started, spilled, committing))]
+    procs += [context.Process(target=_reader, args=(path, profile, started, spilled, committing, results))
+              for _ in range(READERS)]
+    for proc in procs:
+        proc.start()
+    try:
+        reads = [results.get(timeout=60) for _ in range(READERS)]
+    finally:
+        for proc in procs:
+            proc.join(timeout=60)
+    assert all(proc.exitcode == 0 for proc in procs)
+    return mode, reads
+
+
+def test_wal_readers_are_not_blocked_by_a_writer(tmp_path, monkeypatch):
+    mode, reads = _run(tmp_path, monkeypatch, "wal")
+    assert mode == "wal"
+    for reader in reads:
+        assert sum(during for _, during in reader) > 10
+        assert max(latency for latency, _ in reader) < MAX_WAL_READ_SECONDS
+
+
+def test_rollback_readers_wait_for_the_writer(tmp_path, monkeypatch):
+    # The control: if this stops blocking, the test above is no longer measuring anything
+    mode, reads = _run(tmp_path, monkeypatch, "rollback")
+    assert mode == "delete"
+    for reader in reads:
+        assert sum(during for _, during in reader) == 0
+        assert max(latency for latency, _ in reader) > HOLD_SECONDS / 2
+
+
+@pytest.mark.parametrize("profile, expected", [("wal", "wal"), ("rollback", "delete")])
+def test_initialize_db_applies_the_profile_journal_mode(tmp_path, monkeypatch, profile, expected):
+    original = db_connection.DB_PATH
+    monkeypatch.setattr(db_connection, "JOURNAL_PROFILE", profile)
+    db_connection.set_db_path(str(tmp_path / "mode.db"))
+    try:
+        database.initialize_db()
+        assert db_connection.get_connection().execute("PRAGMA journal_mode").fetchone()[0] == expected
+    finally:
+        db_connection.set_db_path(original)
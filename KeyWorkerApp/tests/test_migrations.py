@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+import database
+import db_connection
+from db_connection import get_connection
+
+TABLES = {"users", "service_users", "forms", "appointments", "activity_log", "form_drafts"}
+INDEXES = {"idx_appointments_form_id", "idx_activity_log_timestamp", "idx_activity_log_user", "idx_activity_log_action",
+           "idx_forms_user_period", "idx_forms_period", "idx_forms_user_vitals", "idx_appointments_form_next_due"}
+FORM_COLUMNS = {"shop_q1_comments", "feeling_icons_selected", "care_icons_selected",
+                "period", "weight_kg", "bp_systolic", "bp_diastolic"}
+
+
+def _schema():
+    return sorted(get_connection().execute("SELECT type, name, sql FROM sqlite_master").fetchall(), key=repr)
+
+
+def _assert_current_schema():
+    con = get_connection()
+    assert con.execute("PRAGMA user_version").fetchone()[0] == len(database.MIGRATIONS) == database.SCHEMA_VERSION
+    names = {row[0] for row in con.execute("SELECT name FROM sqlite_master")}
+    assert TABLES | INDEXES <= names
+    assert FORM_COLUMNS <= {row[1] for row in con.execute("PRAGMA table_info(forms)")}
+    # Form saves UPSERT on this pair, so it must be covered by a unique index
+    unique_indexes = [row[1] for row in con.execute("PRAGMA index_list(forms)") if row[2]]
+    assert ["service_user_id", "form_month_year"] in [
+        [row[2] for row in con.execute(f"PRAGMA index_info({name})")] for name in unique_indexes
+    ]
+    assert con.execute("SELECT 1 FROM users WHERE username = 'supervisor' AND role = 'supervisor'").fetchone()
+
+
+def test_empty_file_is_migrated_to_the_current_schema(tmp_path):
+    path = tmp_path / "empty.db"
+    path.touch()
+    original = db_connection.DB_PATH
+    db_connection.set_db_path(str(path))
+    try:
+        database.initialize_db()
+        _assert_current_schema()
+    finally:
+        db_connection.set_db_path(original)
+
+
+def test_fresh_database_is_at_the_current_schema(db):
+    _assert_current_schema()
+
+
+def test_legacy_database_is_upgraded_and_keeps_its_forms(legacy_db):
+    _assert_current_schema()
+    con = get_connection()
+    assert con.execute("SELECT count(*) FROM forms").fetchone()[0] == 5
+    assert con.execute("SELECT count(*) FROM forms WHERE period IS NULL").fetchone()[0] == 0
+    assert con.execute("SELECT period FROM forms WHERE form_month_year = 'January 2025'").fetchone()[0] == "2025-01"
+
+
+def test_second_run_on_a_current_database_is_a_no_op(legacy_db, monkeypatch):
+    schema = _schema()
+
+    def must_not_run(cur):
+        raise AssertionError("migration ran on a current database")
+
+    monkeypatch.setattr(database, "MIGRATIONS", [(number, must_not_run) for number, _ in database.MIGRATIONS])
+    database.initialize_db()
+    assert _schema() == schema
+    assert database.get_schema_version() == database.SCHEMA_VERSION
+
+
+def test_partly_migrated_database_runs_only_pending_migrations(legacy_db, monkeypatch):
+    get_connection().execute("PRAGMA user_version = 5")
+    ran = []
+    monkeypatch.setattr(database, "MIGRATIONS", [
+        (number, lambda cur, number=number, migration=migration: (ran.append(number), migration(cur)))
+        for number, migration in database.MIGRATIONS
+    ])
+    database.initialize_db()
+    assert ran == [number for number, _ in database.MIGRATIONS if number > 5]
+    _assert_current_schema()
+
+
+def test_failed_migration_leaves_the_database_unchanged(tmp_path, monkeypatch):
+    path = tmp_path / "failing.db"
+    original = db_connection.DB_PATH
+    db_connection.set_db_path(str(path))
+
+    def fail(cur):
+        raise sqlite3.OperationalError("boom")
+
+    monkeypatch.setattr(database, "MIGRATIONS", database.MIGRATIONS[:-1] + [(database.SCHEMA_VERSION, fail)])
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            database.initialize_db()
+        assert database.get_schema_version() == 0
+        assert get_connection().execute("SELECT count(*) FROM sqlite_master WHERE name = 'forms'").fetchone()[0] == 0
+    finally:
+        db_connection.set_db_path(original)
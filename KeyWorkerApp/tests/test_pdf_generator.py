@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+import icon_assets
+import pdf_generator
+from reportlab.lib.units import inch
+
+
+@pytest.fixture(autouse=True)
+def icon_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(icon_assets, "CACHE_DIR", str(tmp_path / "icon_cache"))
+
+
+def test_icon_image_embeds_the_prescaled_copy():
+    img = pdf_generator._create_icon_image("Happy Emoji.png", ["Happy"], "Happy", width=0.8 * inch, height=0.8 * inch)
+    size = icon_assets.pdf_pixel_size(0.8 * inch)
+    assert img.filename == icon_assets.prescaled_icon("Happy Emoji.png", size, size)
+    assert img.filename.startswith(icon_assets.CACHE_DIR)
+    assert (img.drawWidth, img.drawHeight) == (0.8 * inch, 0.8 * inch)
+
+
+def test_missing_icon_falls_back_to_its_label():
+    assert pdf_generator._create_icon_image("no such icon.png", [], "Happy") == "Happy"
+
+
+def test_generate_pdf_with_icons(tmp_path):
+    path = tmp_path / "form.pdf"
+    data = {"service_user_name": "Alice", "month": "March", "year": "2025", "feeling_icons_selected": "Happy"}
+    success, error = pdf_generator.generate_pdf(data, file_path=str(path), open_when_done=False)
+    assert (success, error) == (True, None)
+    assert path.read_bytes().startswith(b"%PDF")
+
+
+def _long_form():
+    appointments = [{"name": f"Appointment {n}", "last_seen": "01/02/2025", "next_due": "01/08/2025", "booked": "No"}
+                    for n in range(80)]
+    return {"service_user_name": "Alice", "month": "March", "year": "2025", "appointments": appointments,
+            "other_notes": "Settled month. " * 200}
+
+
+def test_progress_rises_and_finishes_at_one(tmp_path):
+    seen = []
+    success, _ = pdf_generator.generate_pdf(_long_form(), progress=seen.append, file_path=str(tmp_path / "form.pdf"),
+                                            open_when_done=False)
+    assert success
+    assert len(seen) > 2
+    assert seen == sorted(seen)
+    assert 0 < seen[0] and seen[-1] == 1.0
+
+
+def test_cancel_mid_build_stops_and_leaves_no_file(tmp_path):
+    path = tmp_path / "form.pdf"
+    cancel = threading.Event()
+    seen = []
+
+    def progress(fraction):
+        seen.append(fraction)
+        if fraction >= 0.3:
+            cancel.set()
+
+    result = pdf_generator.generate_pdf(_long_form(), progress=progress, cancel_event=cancel, file_path=str(path),
+                                        open_when_done=False)
+    assert result == (False, "Cancelled")
+    assert 0.3 <= seen[-1] < 1.0
+    assert not path.exists()
+    assert not list(tmp_path.glob("*.pdf*"))
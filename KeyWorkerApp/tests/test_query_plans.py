@@ -0,0 +1,102 @@
+"""Query-plan regression test for database_utils.
+
+Calls every database_utils function against a temporary database, captures
+the SQL each one runs and fails if EXPLAIN QUERY PLAN shows a full table
+scan or a temporary B-tree for sorting. Add new database functions to
+_exercise_database_utils().
+"""
+import re
+
+import activity_log_archive
+import bulk_import
+import compliance_report
+import database_utils as db_manager
+import form_drafts
+from db_connection import get_connection
+
+
+def _exercise_database_utils():
+    """Runs each database_utils function, then the activity log archiver, once. Add new functions here."""
+    db_manager.log_activity("check", "CHECK", "query plan check")
+    db_manager.get_activity_log()
+    first_page = db_manager.get_activity_log_page()
+    cursor = (first_page[-1][1], first_page[-1][0])
+    db_manager.get_activity_log_page(before=cursor)
+    db_manager.get_activity_log_page(before=cursor, user="check")
+    db_manager.get_activity_log_page(before=cursor, action="CHECK")
+    db_manager.get_activity_log_page(before=cursor, date_from="2025-01-01", date_to="2025-12-31")
+    db_manager.get_activity_log_page(before=cursor, text="query plan")
+    db_manager.get_activity_log_filter_values("user")
+    db_manager.get_activity_log_filter_values("action")
+    db_manager.verify_user("supervisor", "password")
+    db_manager.get_all_app_users()
+    db_manager.add_app_user("plan_check", "password", "staff")
+    user_id = db_manager.verify_user("plan_check", "password")["id"]
+    db_manager.reset_app_user_password(user_id, "password")
+    db_manager.change_user_password(user_id, "password")
+    db_manager.delete_app_user(user_id)
+    db_manager.add_service_user("Plan Check", "01/01/1960", "check")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    db_manager.update_service_user(service_user_id, "Plan Check", "02/01/1960", "check")
+    form = {"service_user_id": service_user_id, "service_user_name": "Plan Check", "form_month_year": "January 2025"}
+    form_id = db_manager.save_form_data(form, "check")
+    db_manager.save_appointments(form_id, [("GP", "01/01/2025", "01/07/2025", "Yes")])
+    db_manager.save_complete_form(form, [("GP", "01/01/2025", "01/07/2025", "Yes")], "check")
+    db_manager.save_form_changes(form_id, dict(form, weight="70kg"), ["weight"], [("Dentist", "", "", "No"), ("GP", "", "", "No")], "check")
+    db_manager.save_form_changes(form_id, form, [], [("Dentist", "", "", "No")], "check")
+    form_drafts._write_draft(service_user_id, "2025-01", "check", form, [])
+    form_drafts.get_draft(service_user_id, "2025-01")
+    form_drafts._delete_draft(service_user_id, "2025-01")
+    db_manager.get_form_data(service_user_id, "January 2025")
+    db_manager.get_form_with_appointments(service_user_id, "January 2025")
+    db_manager.get_service_user_forms(service_user_id, "2024-02", "2025-01")
+    db_manager.get_vitals_trend(service_user_id, "2024-02", "2025-01")
+    db_manager.get_appointments(form_id)
+    db_manager.get_due_appointments("2025-03-01")
+    db_manager.get_due_appointments("2025-03-01", "2025-01-01")
+    compliance_report.build_reports("2024-02", "2025-01", as_of="2025-03-01")
+    bulk_import._BatchWriter().write([
+        {"service_user_name": "Plan Check", "date_of_birth": "1960-01-03", "appointments": [("GP", "", "2025-07-01", "No")],
+         "form": {"form_month_year": "February 2025", "weight": "70kg"}},
+        {"service_user_name": "Plan Import", "date_of_birth": "", "form": None, "appointments": None},
+    ])
+    db_manager.delete_service_user(service_user_id, "check")
+    activity_log_archive.archive_old_entries(retention_days=0, force=True)
+
+
+def _is_bad_plan_row(detail, cte_names):
+    # "SCAN t" without "USING ... INDEX" reads the whole table; a temp B-tree means an unindexed sort.
+    # Scans of CTEs (and a recursive CTE's seed row) and of FTS virtual tables (which use their own
+    # index) are fine, as are FTS5's own reads of its small shadow tables, which show up once the
+    # schema changes.
+    if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE" not in detail and detail != "SCAN CONSTANT ROW":
+        table = detail.split()[1]
+        if re.search(r"_fts_(config|data|idx|docsize|content)$", table):
+            return False
+        return table not in cte_names | {"sqlite_master", "sqlite_schema"}
+    return "USE TEMP B-TREE" in detail
+
+
+def _cte_names(sql):
+    return set(re.findall(r"(?:WITH(?: RECURSIVE)?|,)\s*(\w+)\s*(?:\([^)]*\)\s*)?AS\s*(?:NOT\s+)?(?:MATERIALIZED\s*)?\(", sql, re.IGNORECASE))
+
+
+def test_no_statement_scans_a_table_or_sorts_in_a_temp_btree(db):
+    statements = []
+    con = get_connection()
+    con.set_trace_callback(statements.append)
+    try:
+        _exercise_database_utils()
+    finally:
+        con.set_trace_callback(None)
+
+    checked = [sql for sql in dict.fromkeys(statements)
+               if sql.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"))]
+    failures = {}
+    for sql in checked:
+        plan = [row[3] for row in con.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        bad = [detail for detail in plan if _is_bad_plan_row(detail, _cte_names(sql))]
+        if bad:
+            failures[sql] = bad
+    assert len(checked) > 50
+    assert failures == {}
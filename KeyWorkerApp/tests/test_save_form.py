@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+import database_utils as db_manager
+from db_connection import get_connection
+
+
+def _service_user_id():
+    return get_connection().execute("SELECT id FROM service_users ORDER BY id LIMIT 1").fetchone()[0]
+
+
+def _form(service_user_id, **fields):
+    return dict({"service_user_id": service_user_id, "service_user_name": "Alice",
+                 "form_month_year": "March 2025", "key_worker_name": "Bob", "weight": "70kg"}, **fields)
+
+
+def _round_trip(service_user_id):
+    form_id = db_manager.save_complete_form(_form(service_user_id), [("Dentist", "", "2025-05-01", "No")], "Bob")
+    assert form_id is not None
+    form, appointments = db_manager.get_form_with_appointments(service_user_id, "March 2025", fresh=True)
+    assert (form["id"], form["key_worker_name"], form["weight"]) == (form_id, "Bob", "70kg")
+    assert appointments == [("Dentist", "", "2025-05-01", "No")]
+
+    # Saving the same month again updates the row in place rather than adding another
+    assert db_manager.save_complete_form(_form(service_user_id, weight="72kg"), [], "Bob") == form_id
+    form, appointments = db_manager.get_form_with_appointments(service_user_id, "March 2025", fresh=True)
+    assert (form["id"], form["weight"], appointments) == (form_id, "72kg", [])
+    count = get_connection().execute(
+        "SELECT count(*) FROM forms WHERE service_user_id = ? AND form_month_year = 'March 2025'", (service_user_id,)
+    ).fetchone()[0]
+    assert count == 1
+
+
+def test_save_inserts_then_updates_form(db):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    _round_trip(_service_user_id())
+
+
+def test_save_inserts_then_updates_form_on_legacy_database(legacy_db):
+    _round_trip(_service_user_id())
+
+
+def test_save_updates_existing_legacy_form_in_place(legacy_db):
+    service_user_id, month, form_id = get_connection().execute(
+        "SELECT service_user_id, form_month_year, id FROM forms ORDER BY id LIMIT 1"
+    ).fetchone()
+    assert db_manager.save_form_data_db({"service_user_id": service_user_id, "form_month_year": month,
+                                         "other_notes": "updated"}) == form_id
+    assert db_manager.get_form_data(service_user_id, month)["other_notes"] == "updated"
+
+
+def _table_rows():
+    con = get_connection()
+    return {table: con.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+            for table in ("forms", "appointments", "activity_log")}
+
+
+def _make_save_fail(monkeypatch, step):
+    """Makes the next save fail part-way: writing the appointments, or the audit entry written last."""
+    if step == "appointments":
+        def save_appointments(form_id, appointments_list):
+            raise sqlite3.OperationalError("disk I/O error")
+        monkeypatch.setattr(db_manager, "save_appointments", save_appointments)
+    else:
+        get_connection().execute(
+            "CREATE TRIGGER fail_audit BEFORE INSERT ON activity_log BEGIN SELECT RAISE(ABORT, 'audit failed'); END"
+        )
+
+
+@pytest.mark.parametrize("fail", ["appointments", "audit"])
+def test_failed_new_form_save_leaves_nothing_behind(db, monkeypatch, fail):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    before = _table_rows()
+    _make_save_fail(monkeypatch, fail)
+
+    assert db_manager.save_complete_form(_form(_service_user_id()), [("Dentist", "", "2025-05-01", "No")], "Bob") is None
+    assert _table_rows() == before
+
+
+@pytest.mark.parametrize("fail", ["appointments", "audit"])
+def test_failed_resave_leaves_the_saved_form_unchanged(db, monkeypatch, fail):
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    service_user_id = _service_user_id()
+    db_manager.save_complete_form(_form(service_user_id), [("Dentist", "", "2025-05-01", "No")], "Bob")
+    before = _table_rows()
+    _make_save_fail(monkeypatch, fail)
+
+    assert db_manager.save_complete_form(_form(service_user_id, weight="90kg"), [("GP", "", "", "No")], "Bob") is None
+    assert _table_rows() == before
+    assert db_manager.get_form_with_appointments(service_user_id, "March 2025")[0]["weight"] == "70kg"
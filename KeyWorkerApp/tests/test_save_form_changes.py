@@ -0,0 +1,87 @@
+import sqlite3
+
+import database_utils as db_manager
+from db_connection import get_connection
+
+APPOINTMENTS = [("GP", "", "2025-04-01", "No"), ("Dentist", "", "2025-05-01", "No"), ("Optician", "", "", "N/A")]
+
+
+def _saved_form():
+    db_manager.add_service_user_db("Alice", "01/01/1950")
+    service_user_id = db_manager.get_all_service_users()[0][0]
+    form = {"service_user_id": service_user_id, "service_user_name": "Alice", "form_month_year": "March 2025",
+            "key_worker_name": "Kim", "weight": "70kg", "bp": "120/80", "other_notes": "settled"}
+    form_id = db_manager.save_complete_form(form, APPOINTMENTS, "Kim")
+    return form_id, form
+
+
+def _row(form_id):
+    cur = get_connection().cursor()
+    cur.row_factory = sqlite3.Row
+    return dict(cur.execute("SELECT * FROM forms WHERE id = ?", (form_id,)).fetchone())
+
+
+def _appointment_rows(form_id):
+    return get_connection().execute(
+        "SELECT id, name, last_seen, next_due, booked FROM appointments WHERE form_id = ? ORDER BY id", (form_id,)
+    ).fetchall()
+
+
+def _last_log_details():
+    return get_connection().execute("SELECT details FROM activity_log ORDER BY id DESC LIMIT 1").fetchone()[0]
+
+
+def test_save_without_changes_writes_nothing(db):
+    form_id, form = _saved_form()
+    changes = get_connection().total_changes
+    log_count = get_connection().execute("SELECT count(*) FROM activity_log").fetchone()[0]
+
+    assert db_manager.save_form_changes(form_id, form, [], None, "Kim") == form_id
+    assert get_connection().total_changes == changes
+    assert get_connection().execute("SELECT count(*) FROM activity_log").fetchone()[0] == log_count
+
+
+def test_changing_one_field_updates_only_that_column(db):
+    form_id, form = _saved_form()
+    # Another session changes a different field in the meantime; this save must not put the old value back
+    other = sqlite3.connect(db)
+    with other:
+        other.execute("UPDATE forms SET other_notes = 'moved rooms' WHERE id = ?", (form_id,))
+    other.close()
+    before = _row(form_id)
+
+    db_manager.save_form_changes(form_id, dict(form, key_worker_name="Lee"), ["key_worker_name"], None, "Lee")
+
+    after = _row(form_id)
+    assert after == dict(before, key_worker_name="Lee")
+    assert after["other_notes"] == "moved rooms"
+    assert _last_log_details() == "Saved form for Alice for month March 2025 (changed: key_worker_name)"
+
+
+def test_appointments_are_updated_by_diff_keeping_unchanged_ids(db):
+    form_id, form = _saved_form()
+    (gp_id, *gp), (dentist_id, *_), _ = _appointment_rows(form_id)
+
+    moved_dentist = ("Dentist", "", "2025-06-01", "Yes")
+    db_manager.save_form_changes(form_id, form, [], [APPOINTMENTS[0], moved_dentist], "Kim")
+
+    # GP untouched, Dentist updated in place, Optician deleted
+    assert _appointment_rows(form_id) == [(gp_id, *gp), (dentist_id, *moved_dentist)]
+    assert _last_log_details() == "Saved form for Alice for month March 2025 (changed: appointments)"
+
+    chiropodist = ("Chiropodist", "", "2025-07-01", "No")
+    db_manager.save_form_changes(form_id, form, [], [APPOINTMENTS[0], moved_dentist, chiropodist], "Kim")
+    rows = _appointment_rows(form_id)
+    assert rows[:2] == [(gp_id, *gp), (dentist_id, *moved_dentist)]
+    assert tuple(rows[2][1:]) == chiropodist and rows[2][0] > dentist_id
+
+
+def test_audit_detail_lists_exactly_the_changed_fields(db):
+    form_id, form = _saved_form()
+    changed = dict(form, weight="72kg", bp="118/76")
+
+    db_manager.save_form_changes(form_id, changed, ["weight", "bp"], [APPOINTMENTS[0]], "Kim")
+
+    assert _last_log_details() == "Saved form for Alice for month March 2025 (changed: weight, bp, appointments)"
+    row = _row(form_id)
+    assert (row["weight"], row["bp"], row["weight_kg"], row["bp_systolic"]) == ("72kg", "118/76", 72.0, 118)
@@ -2,7 +2,11 @@ import customtkinter as ctk
 import database_utils as db_manager
 from CTkMessagebox import CTkMessagebox
 import datetime
+import os
+import threading
+from tkinter import filedialog
 import tkinter.simpledialog as simpledialog
+import bulk_import
 
 class UserManagementWindow(ctk.CTkToplevel):
     def __init__(self, parent, current_user):
@@ -57,6 +61,9 @@ class UserManagementWindow(ctk.CTkToplevel):
         bottom_frame = ctk.CTkFrame(self)
         bottom_frame.pack(side="bottom", fill="x", padx=20, pady=(10, 20))
         
+        self.import_button = ctk.CTkButton(bottom_frame, text="Import From File", command=self.import_from_file, font=self.button_font, height=40)
+        self.import_button.pack(fill="x", pady=(0, 10))
+
         self.close_button = ctk.CTkButton(bottom_frame, text="Close Window", command=self.destroy, font=self.button_font, height=40, fg_color="gray20", border_width=2)
         self.close_button.pack(fill="x")
 
@@ -124,6 +131,50 @@ class UserManagementWindow(ctk.CTkToplevel):
         else:
             CTkMessagebox(title="Error", message=f"A user with the name '{name}' already exists.", icon="cancel", font=self.main_font)
 
+    def import_from_file(self):
+        path = filedialog.askopenfilename(parent=self, title="Choose a CSV or Excel file of service users and forms",
+                                          filetypes=[("CSV or Excel files", "*.csv *.xlsx"), ("All files", "*.*")])
+        if not path:
+            return
+        errors_path = f"{os.path.splitext(path)[0]}_errors.csv"
+
+        # Large files take a while, so the import runs on a worker thread; the button shows progress via after() polling
+        self.import_state = {"rows": 0, "fraction": 0.0, "result": None}
+        def run_import():
+            def on_progress(rows, fraction):
+                self.import_state["rows"], self.import_state["fraction"] = rows, fraction
+            try:
+                self.import_state["result"] = bulk_import.import_file(path, errors_path, progress=on_progress)
+            except Exception as e:
+                # Anything left unset here would leave _poll_import waiting (and the button disabled) for good
+                self.import_state["result"] = e
+        threading.Thread(target=run_import, name="bulk-import", daemon=True).start()
+        self.import_button.configure(state="disabled")
+        self._poll_import(path)
+
+    def _poll_import(self, path):
+        state = self.import_state
+        result = state["result"]
+        if result is None:
+            self.import_button.configure(text=f"Importing... {state['rows']} rows ({state['fraction']:.0%})")
+            self.after(200, self._poll_import, path)
+            return
+
+        self.import_button.configure(text="Import From File", state="normal")
+        if isinstance(result, Exception):
+            CTkMessagebox(title="Import Failed", message=f"Could not import {os.path.basename(path)}: {result}", icon="cancel", font=self.main_font)
+            return
+        summary = bulk_import.describe_result(result)
+        db_manager.log_activity(self.current_user['username'], "BULK IMPORT", f"Imported {os.path.basename(path)}: {summary}")
+        self.refresh_user_list()
+        if result.bad_rows:
+            first_errors = "\n".join(f"Row {number}: {message}" for number, message in result.errors[:5])
+            CTkMessagebox(title="Import Finished With Errors",
+                          message=f"{summary}.\n\n{first_errors}\n\nEvery skipped row is listed in {result.errors_path}",
+                          icon="warning", font=self.main_font)
+        else:
+            CTkMessagebox(title="Import Finished", message=f"{summary}.", icon="check", font=self.main_font)
+
     def delete_user(self, user_id):
         msg = CTkMessagebox(title="Confirm Delete", message="Are you sure you want to delete this user AND all their forms? This cannot be undone.",
                             icon="question", option_1="Cancel", option_2="Delete", font=self.main_font)